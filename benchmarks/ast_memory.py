@@ -0,0 +1,50 @@
+'''
+Measures how much memory the AST of a generated module needs, at the
+peak while parsing and at the end.
+Run from the repository root:
+    python -m benchmarks.ast_memory [functionAmount]
+'''
+
+import sys
+import gc
+import tracemalloc
+
+from cipp import parser, ast
+from . generated_sources import generateModule
+
+def countNodes(node):
+    '''shared nodes are counted once'''
+    amount = 0
+    stack = [node]
+    seen = set()
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, (str, int)) or node is None:
+            continue
+        elif id(node) not in seen:
+            seen.add(id(node))
+            amount += 1
+            stack.extend(value for _, value in ast.iterFields(node))
+    return amount
+
+def measure(shareExpressions):
+    tokens = parser.stringToTokenStream(source)
+    gc.collect()
+    tracemalloc.start()
+    interner = parser.ExpressionInterner() if shareExpressions else None
+    program = parser.parseProgram(tokens, interner)
+    del interner
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, peak, countNodes(program)
+
+functionAmount = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+source = generateModule(functionAmount)
+print(f"{functionAmount} functions")
+
+for name, shareExpressions in [("separate", False), ("shared", True)]:
+    size, peak, nodeAmount = measure(shareExpressions)
+    print(f"{name:<9} {nodeAmount:8} nodes {size / 2**20:8.2f} MiB {peak / 2**20:8.2f} MiB peak "
+          f"{size / nodeAmount:7.1f} bytes per node")
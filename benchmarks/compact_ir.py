@@ -0,0 +1,33 @@
+'''
+Compares the memory of the IR objects with the compact IR.
+Run from the repository root:
+    python -m benchmarks.compact_ir [functionAmount]
+'''
+
+import gc
+import sys
+import tracemalloc
+
+from cipp import fused_front_end
+from cipp.compact_ir import CompactModule
+from . generated_sources import generateModule
+
+def measure(create):
+    gc.collect()
+    tracemalloc.start()
+    result = create()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+functionAmount = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+source = generateModule(functionAmount)
+
+module, objectSize = measure(lambda: fused_front_end.transformToIR(source))
+compactModule, compactSize = measure(lambda: CompactModule.fromModule(module))
+instructionAmount = sum(len(function) for function in compactModule.functions)
+
+print(f"{functionAmount} functions, {instructionAmount} instructions and labels")
+print(f"objects {objectSize / 2**20:8.2f} MiB {objectSize / instructionAmount:7.1f} bytes per instruction")
+print(f"compact {compactSize / 2**20:8.2f} MiB {compactSize / instructionAmount:7.1f} bytes per instruction")
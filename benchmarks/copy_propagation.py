@@ -0,0 +1,39 @@
+'''
+Counts the moves before and after copy propagation, which includes
+move coalescing, and after coalescing on its own.
+Run from the repository root:
+    python -m benchmarks.copy_propagation [functionAmount]
+'''
+
+import sys
+import time
+
+from cipp import ir
+from cipp.fused_front_end import transformToIR
+from cipp.ir_to_x64 import compileModule
+from cipp.x64assembler import instructions as x64
+from cipp.optimizations import propagateCopies, coalesceMoves
+from . generated_sources import generateModule
+
+def countMoves(module):
+    irMoves = sum(isinstance(element, ir.MoveInstr)
+                  for function in module.functions for element in function.block)
+    x64Moves = sum(isinstance(element, (x64.MovRegToRegInstr, x64.MovMemToRegInstr, x64.MovRegToMemInstr))
+                   for element in compileModule(module).elements)
+    return irMoves, x64Moves
+
+functionAmount = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+module = transformToIR(generateModule(functionAmount))
+print(f"{functionAmount} functions")
+print("before:     {} ir moves, {} x64 movs".format(*countMoves(module)))
+
+start = time.perf_counter()
+for function in module.functions:
+    propagateCopies(function)
+print(f"propagated: {{}} ir moves, {{}} x64 movs  ({time.perf_counter() - start:.2f} s)".format(*countMoves(module)))
+
+module = transformToIR(generateModule(functionAmount))
+start = time.perf_counter()
+for function in module.functions:
+    coalesceMoves(function)
+print(f"coalesced:  {{}} ir moves, {{}} x64 movs  ({time.perf_counter() - start:.2f} s)".format(*countMoves(module)))
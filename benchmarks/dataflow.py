@@ -0,0 +1,25 @@
+'''
+Runs the dataflow analyses on one large function with many loop nests.
+Run from the repository root:
+    python -m benchmarks.dataflow [loopAmount]
+'''
+
+import sys
+import time
+
+from cipp.fused_front_end import transformToIR
+from cipp.cfg import ControlFlowGraph
+from cipp.dataflow import Liveness, ReachingDefinitions, AvailableExpressions
+from . generated_sources import generateLoopFunction
+
+loopAmount = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+function = transformToIR(generateLoopFunction(loopAmount)).functions[0]
+cfg = ControlFlowGraph.fromFunction(function)
+print(f"{loopAmount} loop nests, {len(cfg.blocks)} blocks")
+
+for analysis in (Liveness, ReachingDefinitions, AvailableExpressions):
+    start = time.perf_counter()
+    result = analysis(cfg)
+    duration = time.perf_counter() - start
+    passes = result.visits / len(cfg.blocks)
+    print(f"{analysis.__name__:<22} {duration:6.2f} s {passes:5.2f} passes")
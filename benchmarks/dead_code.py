@@ -0,0 +1,35 @@
+'''
+Measures the code size and the assembly time of generated code before
+and after dead code elimination. Constant propagation runs first, it
+leaves many unused initializations behind.
+Run from the repository root:
+    python -m benchmarks.dead_code [functionAmount]
+'''
+
+import sys
+import time
+
+from cipp import ir
+from cipp.fused_front_end import transformToIR
+from cipp.ir_to_x64 import compileModule
+from cipp.optimizations import propagateConstants, eliminateDeadCode
+from . generated_sources import generateConfiguredModule
+
+def measure(name, module):
+    instructionAmount = sum(isinstance(element, ir.Instruction)
+                            for function in module.functions for element in function.block)
+    start = time.perf_counter()
+    byteAmount = compileModule(module).toMachineCode().byteLength
+    duration = time.perf_counter() - start
+    print(f"{name:<12} {instructionAmount:7} instructions {byteAmount:8} bytes, assembled in {duration:.2f} s")
+
+functionAmount = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+module = transformToIR(generateConfiguredModule(functionAmount))
+for function in module.functions:
+    propagateConstants(function)
+measure("folded", module)
+
+start = time.perf_counter()
+removedAmount = sum(eliminateDeadCode(function) for function in module.functions)
+print(f"removed {removedAmount} instructions in {time.perf_counter() - start:.2f} s")
+measure("dead code", module)
@@ -0,0 +1,36 @@
+'''
+Compares the two phase front end (parse, then lower the AST) with the
+fused front end that emits IR while parsing.
+Run from the repository root:
+    python -m benchmarks.fused_front_end [functionAmount]
+'''
+
+import sys
+import tracemalloc
+
+from cipp import parser, ast_to_ir, fused_front_end
+from . generated_sources import generateModule
+from . timing import compare
+
+def transformInTwoPhases():
+    program = parser.parseProgram(parser.stringToTokenStream(source))
+    return ast_to_ir.transformProgramToIR(program)
+
+def transformFused():
+    return fused_front_end.transformTokensToIR(parser.stringToTokenStream(source))
+
+def measurePeakMemory(function):
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+functionAmount = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+source = generateModule(functionAmount)
+print(f"{functionAmount} functions")
+
+functionsByName = {"two phases" : transformInTwoPhases, "fused" : transformFused}
+compare(functionsByName)
+for name, function in functionsByName.items():
+    print(f"{name:<25} {measurePeakMemory(function) / 2**20:8.2f} MiB peak")
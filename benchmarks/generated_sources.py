@@ -0,0 +1,86 @@
+'''
+Creates large cipp sources that look like machine generated code.
+'''
+
+functionTemplate = '''
+def int @{name}(int base, int exponent) {{
+    # generated function {index}
+    let int result = 1;
+    let int step = {index} * 2 + 1;
+    while (exponent > 0) {{
+        result = @{callee}(base, result);
+        if (result > {index}) {{
+            result = result - step;
+        }} else {{
+            result = result + (step - 1) * 2;
+        }}
+        exponent = exponent - 1;
+    }}
+    return result;
+}}
+'''
+
+helperCode = '''
+def int @mul(int x, int y) {
+    let int result = 0;
+    while (x > 0) {
+        result = result + y;
+        x = x - 1;
+    }
+    return result;
+}
+'''
+
+def generateModule(functionAmount):
+    parts = [helperCode]
+    for i in range(functionAmount):
+        parts.append(functionTemplate.format(name = f"f{i}", index = i, callee = "mul"))
+    return "".join(parts)
+
+def generateNestedFunction(depth):
+    '''one function with `depth` nested loops, conditions and brackets'''
+    parts = ["def int @nested(int x) {\n"]
+    for i in range(depth):
+        if i % 2 == 0:
+            parts.append("while (x > 0) {\n")
+        else:
+            parts.append("if (x < 100) {\n")
+    parts.append("x = x - " + "(" * depth + "1" + ")" * depth + ";\n")
+    parts.append("}\n" * depth)
+    parts.append("return x;\n}\n")
+    return "".join(parts)
+
+def generateLoopFunction(loopAmount, depth = 3):
+    '''one function with `loopAmount` groups of `depth` nested counting loops'''
+    parts = ["def int @loops(int n, int m) {\n", "let int s = 0;\n"]
+    for i in range(loopAmount):
+        for k in range(depth):
+            parts.append(f"let int i{i}_{k} = 0;\n")
+            parts.append(f"while (i{i}_{k} < n) {{\n")
+        parts.append(f"if (s > m) {{ s = s - i{i}_0; }} else {{ s = s + m; }}\n")
+        for k in reversed(range(depth)):
+            parts.append(f"i{i}_{k} = i{i}_{k} + 1;\n}}\n")
+    parts.append("return s;\n}\n")
+    return "".join(parts)
+
+configuredTemplate = '''
+def int @{name}(int x) {{
+    let int debug = {debug};
+    let int scale = {index} * 4 + 2;
+    let int limit = scale * 8 - 1;
+    if (debug == 1) {{
+        x = @mul(x, scale);
+    }}
+    while (x < limit) {{
+        x = x + scale - 1;
+    }}
+    return x;
+}}
+'''
+
+def generateConfiguredModule(functionAmount):
+    '''functions that depend on constant configuration parameters'''
+    parts = [helperCode]
+    for i in range(functionAmount):
+        parts.append(configuredTemplate.format(name = f"g{i}", index = i, debug = int(i % 5 == 0)))
+    return "".join(parts)
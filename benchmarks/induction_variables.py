@@ -0,0 +1,47 @@
+'''
+Runs a loop that multiplies its counter before and after strength
+reduction. Both versions are cleaned up with copy propagation and
+dead code elimination. Needs Linux or Windows on x86-64.
+Run from the repository root:
+    python -m benchmarks.induction_variables
+'''
+
+from ctypes import CFUNCTYPE, c_longlong
+
+from cipp.fused_front_end import transformToIR
+from cipp.ir_to_x64 import compileModule
+from cipp.optimizations import reduceStrength, propagateCopies, eliminateDeadCode
+from exec_utils import createFunctionFromHex
+from . timing import compare
+
+kernelCode = '''
+    def int @kernel(int n, int a) {
+        let int s = 0;
+        let int i = 0;
+        while (i < n) {
+            s = s + i * 8 + i * a - (i + 2) * 5;
+            i = i + 1;
+        }
+        return s;
+    }
+'''
+
+def compileKernel(optimize, registerAllocation):
+    module = transformToIR(kernelCode)
+    if optimize:
+        for function in module.functions:
+            reduced, rewritten = reduceStrength(function)
+            print(f"reduced {reduced} multiplications, rewrote {rewritten} exit tests")
+    for function in module.functions:
+        propagateCopies(function)
+        eliminateDeadCode(function)
+    hexCode = compileModule(module, registerAllocation).toMachineCode().toHex()
+    kernel = createFunctionFromHex(CFUNCTYPE(c_longlong, c_longlong, c_longlong), hexCode)
+    return lambda: kernel(3000000, 7)
+
+compare({
+    "stack slots" : compileKernel(False, False),
+    "stack slots, reduced" : compileKernel(True, False),
+    "linear scan" : compileKernel(False, True),
+    "linear scan, reduced" : compileKernel(True, True),
+})
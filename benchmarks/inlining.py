@@ -0,0 +1,47 @@
+'''
+Runs a loop that calls a small helper function before and after inlining.
+Needs Linux or Windows on x86-64.
+Run from the repository root:
+    python -m benchmarks.inlining
+'''
+
+from ctypes import CFUNCTYPE, c_longlong
+
+from cipp.fused_front_end import transformToIR
+from cipp.ir_to_x64 import compileModule
+from cipp.optimizations import inlineFunctions
+from exec_utils import createFunctionFromHex
+from . timing import compare
+
+kernelCode = '''
+    def int @kernel(int n) {
+        let int s = 0;
+        let int i = 0;
+        while (i < n) {
+            s = s + @clamp(i - 1000, 0, 50);
+            i = i + 1;
+        }
+        return s;
+    }
+
+    def int @clamp(int x, int low, int high) {
+        if (x < low) return low;
+        if (x > high) return high;
+        return x;
+    }
+'''
+
+def compileKernel(optimize, registerAllocation):
+    module = transformToIR(kernelCode)
+    if optimize:
+        print(f"inlined {inlineFunctions(module)} calls")
+    hexCode = compileModule(module, registerAllocation).toMachineCode().toHex()
+    kernel = createFunctionFromHex(CFUNCTYPE(c_longlong, c_longlong), hexCode)
+    return lambda: kernel(3000000)
+
+compare({
+    "stack slots" : compileKernel(False, False),
+    "stack slots, inlined" : compileKernel(True, False),
+    "linear scan" : compileKernel(False, True),
+    "linear scan, inlined" : compileKernel(True, True),
+})
@@ -0,0 +1,39 @@
+'''
+Compares the recursive and the iterative parser and AST to IR lowering
+on ordinary code and shows that the iterative versions handle deep nesting.
+Run from the repository root:
+    python -m benchmarks.iterative_front_end [functionAmount [depth]]
+'''
+
+import sys
+
+from cipp import parser, iterative_parser
+from cipp import ast_to_ir, iterative_ast_to_ir
+from . generated_sources import generateModule, generateNestedFunction
+from . timing import compare
+
+functionAmount = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+depth = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+
+source = generateModule(functionAmount)
+program = parser.parse(source)
+print(f"ordinary code: {functionAmount} functions")
+compare({
+    "recursive parser" : lambda: parser.parseProgram(parser.stringToTokenStream(source)),
+    "iterative parser" : lambda: iterative_parser.parseProgram(parser.stringToTokenStream(source)),
+})
+compare({
+    "recursive lowering" : lambda: ast_to_ir.transformProgramToIR(program),
+    "iterative lowering" : lambda: iterative_ast_to_ir.transformProgramToIR(program),
+})
+
+print(f"nesting depth {depth}")
+source = generateNestedFunction(depth)
+try:
+    parser.parse(source)
+    print("recursive parser          ok")
+except RecursionError:
+    print("recursive parser          RecursionError")
+compare({"iterative parser" : lambda: iterative_parser.parseProgram(parser.stringToTokenStream(source))}, 1)
+program = iterative_parser.parseProgram(parser.stringToTokenStream(source))
+compare({"iterative lowering" : lambda: iterative_ast_to_ir.transformProgramToIR(program)}, 1)
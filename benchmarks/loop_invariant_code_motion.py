@@ -0,0 +1,46 @@
+'''
+Runs a numerical kernel with loop invariant computations before and
+after loop invariant code motion. Needs Linux or Windows on x86-64.
+Run from the repository root:
+    python -m benchmarks.loop_invariant_code_motion
+'''
+
+from ctypes import CFUNCTYPE, c_longlong
+
+from cipp.fused_front_end import transformToIR
+from cipp.ir_to_x64 import compileModule
+from cipp.optimizations import hoistLoopInvariants
+from exec_utils import createFunctionFromHex
+from . timing import compare
+
+kernelCode = '''
+    def int @kernel(int n, int a, int b) {
+        let int s = 0;
+        let int i = 0;
+        while (i < n) {
+            let int j = 0;
+            while (j < n) {
+                s = s + (a * b - a) * (b - 3) + j;
+                j = j + 1;
+            }
+            i = i + 1;
+        }
+        return s;
+    }
+'''
+
+def compileKernel(optimize, registerAllocation):
+    module = transformToIR(kernelCode)
+    if optimize:
+        for function in module.functions:
+            print(f"hoisted {hoistLoopInvariants(function)} instructions")
+    hexCode = compileModule(module, registerAllocation).toMachineCode().toHex()
+    kernel = createFunctionFromHex(CFUNCTYPE(c_longlong, c_longlong, c_longlong, c_longlong), hexCode)
+    return lambda: kernel(3000, 7, 11)
+
+compare({
+    "stack slots" : compileKernel(False, False),
+    "stack slots, licm" : compileKernel(True, False),
+    "linear scan" : compileKernel(False, True),
+    "linear scan, licm" : compileKernel(True, True),
+})
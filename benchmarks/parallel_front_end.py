@@ -0,0 +1,34 @@
+'''
+Compares the sequential and the parallel front end.
+Run from the repository root:
+    python -m benchmarks.parallel_front_end [functionAmount [workerAmount]]
+'''
+
+import os
+import sys
+import time
+
+from cipp.parser import parse
+from cipp.ast_to_ir import transformProgramToIR
+from cipp.parallel_front_end import parseParallel, transformToIRParallel
+from . generated_sources import generateModule
+
+def measure(name, function):
+    start = time.perf_counter()
+    function()
+    duration = time.perf_counter() - start
+    print(f"{name:<30} {duration:8.3f} s")
+    return duration
+
+functionAmount = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+source = generateModule(functionAmount)
+workerAmount = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+print(f"{functionAmount} functions, {len(source) / 1e6:.1f} MB, {workerAmount} workers")
+
+sequentialParse = measure("parse", lambda: parse(source))
+parallelParse = measure("parseParallel", lambda: parseParallel(source, workerAmount))
+sequentialIR = measure("parse + transformProgramToIR", lambda: transformProgramToIR(parse(source)))
+parallelIR = measure("transformToIRParallel", lambda: transformToIRParallel(source, workerAmount))
+
+print(f"speedup parse: {sequentialParse / parallelParse:.2f}x")
+print(f"speedup parse + IR: {sequentialIR / parallelIR:.2f}x")
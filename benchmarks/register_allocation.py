@@ -0,0 +1,38 @@
+'''
+Runs the play_with_compiler examples compiled with stack slots and with
+linear scan register allocation. Needs Linux or Windows on x86-64.
+Run from the repository root:
+    python -m benchmarks.register_allocation
+'''
+
+from ctypes import CFUNCTYPE, c_longlong
+
+from cipp.parser import parse
+from cipp.ast_to_ir import transformProgramToIR
+from cipp.ir_to_x64 import compileModule
+from cipp.x64assembler import instructions as x64
+from exec_utils import createFunctionFromHex
+from play_with_compiler import pow_code, fib_code
+from . timing import compare
+
+examples = [
+    ("pow", pow_code, (50, 200000)),
+    ("fib", fib_code, (30,)),
+]
+
+def compileExample(code, argumentAmount, registerAllocation):
+    block = compileModule(transformProgramToIR(parse(code)), registerAllocation)
+    memoryAccesses = sum(isinstance(element, (x64.MovMemToRegInstr, x64.MovRegToMemInstr))
+                         for element in block.elements)
+    functionType = CFUNCTYPE(c_longlong, *([c_longlong] * argumentAmount))
+    function = createFunctionFromHex(functionType, block.toMachineCode().toHex())
+    return function, memoryAccesses
+
+for name, code, arguments in examples:
+    functionsByName = {}
+    for registerAllocation in (False, True):
+        function, memoryAccesses = compileExample(code, len(arguments), registerAllocation)
+        mode = "linear scan" if registerAllocation else "stack slots"
+        print(f"{name} {mode:<12} {memoryAccesses:3} stack loads and stores")
+        functionsByName[f"{name}{arguments} {mode}"] = lambda function = function: function(*arguments)
+    compare(functionsByName)
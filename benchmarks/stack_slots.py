@@ -0,0 +1,28 @@
+'''
+Reports the frame size of every function with one stack slot per
+register and with shared stack slots.
+Run from the repository root:
+    python -m benchmarks.stack_slots [functionAmount]
+'''
+
+import sys
+
+from cipp.fused_front_end import transformToIR
+from cipp.stack_slots import compareFrameSizes
+from play_with_compiler import pow_code, fib_code
+from . generated_sources import generateModule, generateLoopFunction
+
+functionAmount = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+def report(source):
+    totalBefore = totalAfter = 0
+    for name, before, after in compareFrameSizes(transformToIR(source)):
+        print(f"{name:<10} {before:6} -> {after:4} bytes  {1 - after / before:6.1%} smaller")
+        totalBefore += before
+        totalAfter += after
+    print(f"{'total':<10} {totalBefore:6} -> {totalAfter:4} bytes  {1 - totalAfter / totalBefore:6.1%} smaller")
+    print()
+
+report(pow_code + fib_code)
+report(generateModule(functionAmount))
+report(generateLoopFunction(200))
@@ -0,0 +1,37 @@
+'''
+Runs recursive functions with plain calls, with tail jumps and with self
+tail calls turned into loops. Needs Linux or Windows on x86-64.
+Run from the repository root:
+    python -m benchmarks.tail_calls
+'''
+
+from ctypes import CFUNCTYPE, c_longlong
+
+from cipp.fused_front_end import transformToIR
+from cipp.ir_to_x64 import compileModule
+from cipp.optimizations import eliminateTailCalls
+from exec_utils import createFunctionFromHex
+from . timing import compare
+
+kernelCode = '''
+    def int @sum(int n, int acc) {
+        if (n == 0) return acc;
+        return @sum(n - 1, acc + n);
+    }
+'''
+
+def compileKernel(optimize, tailCalls):
+    module = transformToIR(kernelCode)
+    if optimize:
+        for function in module.functions:
+            print(f"replaced {eliminateTailCalls(function)} self calls")
+    hexCode = compileModule(module, registerAllocation = True, tailCalls = tailCalls).toMachineCode().toHex()
+    kernel = createFunctionFromHex(CFUNCTYPE(c_longlong, c_longlong, c_longlong), hexCode)
+    # the plain version needs a stack frame per step, so the depth is limited
+    return lambda: [kernel(100000, i) for i in range(30)]
+
+compare({
+    "calls" : compileKernel(False, False),
+    "tail jumps" : compileKernel(False, True),
+    "self calls eliminated" : compileKernel(True, False),
+})
@@ -0,0 +1,14 @@
+import gc
+import time
+
+def compare(functionsByName, repetitions = 5):
+    '''runs the functions alternately so that both see the same machine state'''
+    durations = {name : [] for name in functionsByName}
+    for _ in range(repetitions):
+        for name, function in functionsByName.items():
+            gc.collect()
+            start = time.perf_counter()
+            function()
+            durations[name].append(time.perf_counter() - start)
+    for name, values in durations.items():
+        print(f"{name:<25} {min(values):8.3f} s")
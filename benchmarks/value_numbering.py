@@ -0,0 +1,25 @@
+'''
+Reports how many redundant computations value numbering removes per
+function.
+Run from the repository root:
+    python -m benchmarks.value_numbering [functionAmount]
+'''
+
+import sys
+import time
+
+from cipp.fused_front_end import transformToIR
+from cipp.optimizations import numberValuesInModule
+from play_with_compiler import pow_code, fib_code
+from . generated_sources import generateModule
+
+functionAmount = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+for name, source in (("examples", pow_code + fib_code), ("generated", generateModule(functionAmount))):
+    module = transformToIR(source)
+    start = time.perf_counter()
+    removedAmounts = numberValuesInModule(module)
+    duration = time.perf_counter() - start
+    print(f"{name}: {sum(removedAmounts.values())} redundant computations removed in {duration:.2f} s")
+    for functionName, amount in list(removedAmounts.items())[:5]:
+        print(f"    {functionName:<8} {amount}")
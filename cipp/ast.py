@@ -1,8 +1,10 @@
 class Program:
+    __slots__ = ("functions",)
     def __init__(self, functions):
         self.functions = functions
 
 class Function:
+    __slots__ = ("name", "retType", "arguments", "statement")
     def __init__(self, name, retType, arguments, statement):
         self.name = name
         self.retType = retType
@@ -13,6 +15,7 @@ class Function:
         return f"<{self.retType} {self.name}({self.arguments})>"
 
 class Type:
+    __slots__ = ("name",)
     def __init__(self, name):
         self.name = name
 
@@ -20,6 +23,7 @@ class Type:
         return self.name
 
 class Argument:
+    __slots__ = ("name", "dataType")
     def __init__(self, name, dataType):
         self.name = name
         self.dataType = dataType
@@ -30,9 +34,10 @@ class Argument:
 
 
 class Statement:
-    pass
+    __slots__ = ()
 
 class BlockStmt(Statement):
+    __slots__ = ("statements",)
     def __init__(self, statements):
         self.statements = statements
 
@@ -40,6 +45,7 @@ class BlockStmt(Statement):
         return "\n".join(map(str, self.statements))
 
 class ReturnStmt(Statement):
+    __slots__ = ("expression",)
     def __init__(self, expression):
         self.expression = expression
 
@@ -47,6 +53,7 @@ class ReturnStmt(Statement):
         return f"return {self.expression}"
 
 class LetStmt(Statement):
+    __slots__ = ("name", "dataType", "expression")
     def __init__(self, name, dataType, expression):
         self.name = name
         self.dataType = dataType
@@ -56,6 +63,7 @@ class LetStmt(Statement):
         return f"let {self.dataType} {self.name} = {self.expression}"
 
 class WhileStmt(Statement):
+    __slots__ = ("condition", "statement")
     def __init__(self, condition, statement):
         self.condition = condition
         self.statement = statement
@@ -64,6 +72,7 @@ class WhileStmt(Statement):
         return f"while ({self.condition}) ..."
 
 class IfStmt(Statement):
+    __slots__ = ("condition", "thenStatement")
     def __init__(self, condition, thenStatement):
         self.condition = condition
         self.thenStatement = thenStatement
@@ -72,6 +81,7 @@ class IfStmt(Statement):
         return f"if ({self.condition}) ..."
 
 class IfElseStmt(Statement):
+    __slots__ = ("condition", "thenStatement", "elseStatement")
     def __init__(self, condition, thenStatement, elseStatement):
         self.condition = condition
         self.thenStatement = thenStatement
@@ -81,6 +91,7 @@ class IfElseStmt(Statement):
         return f"if ({self.condition}) ...\nelse ..."
 
 class AssignmentStmt(Statement):
+    __slots__ = ("target", "expression")
     def __init__(self, target, expression):
         self.target = target
         self.expression = expression
@@ -89,6 +100,7 @@ class AssignmentStmt(Statement):
         return f"{self.target} = {self.expression}"
 
 class ArrayAssignmentStmt(Statement):
+    __slots__ = ("target", "offset", "expression")
     def __init__(self, target, offset, expression):
         self.target = target
         self.offset = offset
@@ -100,9 +112,10 @@ class ArrayAssignmentStmt(Statement):
 
 
 class Expression:
-    pass
+    __slots__ = ()
 
 class ComparisonExpr(Expression):
+    __slots__ = ("operator", "left", "right")
     def __init__(self, operator, left, right):
         self.operator = operator
         self.left = left 
@@ -112,6 +125,7 @@ class ComparisonExpr(Expression):
         return f"{self.left}{self.operator}{self.right}"
 
 class AddSubExpr(Expression):
+    __slots__ = ("terms",)
     def __init__(self, termsWithType):
         self.terms = termsWithType
 
@@ -122,6 +136,7 @@ class AddSubExpr(Expression):
         return string
 
 class MulDivExpr(Expression):
+    __slots__ = ("terms",)
     def __init__(self, termsWithType):
         self.terms = termsWithType
 
@@ -132,6 +147,7 @@ class MulDivExpr(Expression):
         return string
 
 class Variable(Expression):
+    __slots__ = ("name",)
     def __init__(self, name):
         self.name = name
 
@@ -139,6 +155,7 @@ class Variable(Expression):
         return self.name
 
 class ConstInt(Expression):
+    __slots__ = ("value",)
     def __init__(self, value):
         self.value = value
 
@@ -146,6 +163,7 @@ class ConstInt(Expression):
         return str(self.value)
 
 class FunctionCall(Expression):
+    __slots__ = ("functionName", "arguments")
     def __init__(self, functionName, arguments):
         self.functionName = functionName
         self.arguments = arguments
@@ -156,21 +174,30 @@ class FunctionCall(Expression):
 
 
 class AddedTerm:
+    __slots__ = ("expr",)
     operation = "+"
     def __init__(self, expression):
         self.expr = expression
 
 class SubtractedTerm:
+    __slots__ = ("expr",)
     operation = "-"
     def __init__(self, expression):
         self.expr = expression
 
 class MultipliedTerm:
+    __slots__ = ("expr",)
     operation = "*"
     def __init__(self, expression):
         self.expr = expression
         
 class DividedTerm:
+    __slots__ = ("expr",)
     operation = "/"
     def __init__(self, expression):
-        self.expr = expression
\ No newline at end of file
+        self.expr = expression
+
+def iterFields(node):
+    '''yields (name, value) for all attributes of the node'''
+    for name in type(node).__slots__:
+        yield name, getattr(node, name)
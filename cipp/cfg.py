@@ -0,0 +1,337 @@
+'''
+Control flow graph of an ir.Function.
+
+The code block of the function is split into basic blocks at labels and
+after jumps and returns. The first block is an entry block without label,
+so that it never has predecessors. The order of the blocks is the order
+in the code block; a block that does not end with a jump continues in
+the next block. toCodeBlock() turns the blocks back into the flat layout
+that ir_to_x64.compileFunction expects.
+
+All algorithms use explicit stacks, so deeply nested code does not hit
+the recursion limit.
+'''
+
+from . import ir
+
+terminatorTypes = (ir.GotoInstr, ir.GotoIfZero, ir.ReturnInstr)
+
+class BasicBlock:
+    def __init__(self, label = None):
+        self.index = None
+        self.label = label
+        self.instructions = []
+        self.successors = []
+        self.predecessors = []
+        self.fallthrough = None
+
+    @property
+    def terminator(self):
+        if len(self.instructions) > 0 and isinstance(self.instructions[-1], terminatorTypes):
+            return self.instructions[-1]
+        return None
+
+    def __repr__(self):
+        if self.label is None:
+            return f"<Block {self.index}>"
+        return f"<Block {self.index}: {self.label.name}>"
+
+class ControlFlowGraph:
+    def __init__(self, function, blocks):
+        self.function = function
+        self.blocks = blocks
+        self.updateEdges()
+
+    @classmethod
+    def fromFunction(cls, function):
+        entry = BasicBlock()
+        blocks = [entry]
+        current = entry
+        for element in function.block:
+            if isinstance(element, ir.Label):
+                if current is not entry and current.label is None and len(current.instructions) == 0:
+                    current.label = element
+                else:
+                    current = BasicBlock(element)
+                    blocks.append(current)
+            else:
+                current.instructions.append(element)
+                if isinstance(element, terminatorTypes):
+                    current = BasicBlock()
+                    blocks.append(current)
+
+        if current is not entry and current.label is None and len(current.instructions) == 0:
+            blocks.pop()
+        return cls(function, blocks)
+
+    @property
+    def entry(self):
+        return self.blocks[0]
+
+    def updateEdges(self):
+        '''
+        Has to be called after blocks or terminators changed.
+        Successors of a GotoIfZero are the next block and the jump target.
+        '''
+        blockByLabel = {}
+        for index, block in enumerate(self.blocks):
+            block.index = index
+            block.successors = []
+            block.predecessors = []
+            if block.label is not None:
+                blockByLabel[block.label] = block
+
+        for index, block in enumerate(self.blocks):
+            nextBlock = self.blocks[index + 1] if index + 1 < len(self.blocks) else None
+            terminator = block.terminator
+            if isinstance(terminator, (ir.GotoInstr, ir.ReturnInstr)):
+                block.fallthrough = None
+            else:
+                block.fallthrough = nextBlock
+
+            if block.fallthrough is not None:
+                block.successors.append(block.fallthrough)
+            if isinstance(terminator, (ir.GotoInstr, ir.GotoIfZero)):
+                target = blockByLabel[terminator.label]
+                if target is not block.fallthrough:
+                    block.successors.append(target)
+
+            for successor in block.successors:
+                successor.predecessors.append(block)
+
+    def iterInstructions(self):
+        for block in self.blocks:
+            yield from block.instructions
+
+    def reversePostorder(self):
+        '''
+        Reachable blocks, every block comes before its successors unless there
+        is a back edge. Successors are visited in reverse, so that the body of
+        a loop comes before the code after the loop.
+        '''
+        visited = [False] * len(self.blocks)
+        postorder = []
+        visited[0] = True
+        stack = [(self.entry, reversed(self.entry.successors))]
+        while stack:
+            block, successors = stack[-1]
+            for successor in successors:
+                if not visited[successor.index]:
+                    visited[successor.index] = True
+                    stack.append((successor, reversed(successor.successors)))
+                    break
+            else:
+                stack.pop()
+                postorder.append(block)
+        postorder.reverse()
+        return postorder
+
+    def toCodeBlock(self):
+        codeBlock = ir.CodeBlock()
+        for block in self.blocks:
+            if block.label is not None:
+                codeBlock.add(block.label)
+            for instruction in block.instructions:
+                codeBlock.add(instruction)
+        return codeBlock
+
+    def writeBack(self):
+        '''replaces the code block of the function with the flattened blocks'''
+        self.function.block = self.toCodeBlock()
+
+    def __repr__(self):
+        lines = []
+        for block in self.blocks:
+            successors = ", ".join(str(successor.index) for successor in block.successors)
+            lines.append(f"{block} -> [{successors}]")
+            lines.extend(f"    {instruction}" for instruction in block.instructions)
+        return "\n".join(lines)
+
+
+class DominatorTree:
+    '''
+    Uses the algorithm from "A Simple, Fast Dominance Algorithm" by Cooper,
+    Harvey and Kennedy. It needs very few passes over the blocks for
+    structured control flow. Unreachable blocks have no dominator.
+    '''
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        blockAmount = len(cfg.blocks)
+        order = cfg.reversePostorder()
+        orderIndex = [-1] * blockAmount
+        for i, block in enumerate(order):
+            orderIndex[block.index] = i
+
+        idoms = [None] * blockAmount
+        idoms[0] = 0
+        changed = True
+        while changed:
+            changed = False
+            for block in order[1:]:
+                newIdom = None
+                for predecessor in block.predecessors:
+                    p = predecessor.index
+                    if idoms[p] is None:
+                        continue
+                    if newIdom is None:
+                        newIdom = p
+                        continue
+                    # walk up until both fingers meet
+                    a, b = p, newIdom
+                    while a != b:
+                        while orderIndex[a] > orderIndex[b]:
+                            a = idoms[a]
+                        while orderIndex[b] > orderIndex[a]:
+                            b = idoms[b]
+                    newIdom = a
+                if idoms[block.index] != newIdom:
+                    idoms[block.index] = newIdom
+                    changed = True
+
+        blocks = cfg.blocks
+        self.reachableBlocks = order
+        self.immediateDominators = [None] * blockAmount
+        self.children = [[] for _ in range(blockAmount)]
+        for block in order[1:]:
+            idom = blocks[idoms[block.index]]
+            self.immediateDominators[block.index] = idom
+            self.children[idom.index].append(block)
+        self.computeNumbering()
+
+    def computeNumbering(self):
+        '''pre- and postorder numbers of the tree make dominates() constant time'''
+        blockAmount = len(self.cfg.blocks)
+        self.preorder = [-1] * blockAmount
+        self.postorder = [-1] * blockAmount
+        counter = 0
+        stack = [(self.cfg.entry, False)]
+        while stack:
+            block, isFinished = stack.pop()
+            if isFinished:
+                self.postorder[block.index] = counter
+            else:
+                self.preorder[block.index] = counter
+                stack.append((block, True))
+                stack.extend((child, False) for child in reversed(self.children[block.index]))
+            counter += 1
+
+    def getImmediateDominator(self, block):
+        return self.immediateDominators[block.index]
+
+    def getChildren(self, block):
+        return self.children[block.index]
+
+    def isReachable(self, block):
+        return self.preorder[block.index] >= 0
+
+    def dominates(self, a, b):
+        '''every block dominates itself'''
+        if not self.isReachable(a) or not self.isReachable(b):
+            return False
+        return (self.preorder[a.index] <= self.preorder[b.index]
+                and self.postorder[b.index] <= self.postorder[a.index])
+
+    def iterPreorder(self):
+        '''parents come before their children'''
+        stack = [self.cfg.entry]
+        while stack:
+            block = stack.pop()
+            yield block
+            stack.extend(reversed(self.children[block.index]))
+
+
+class Loop:
+    def __init__(self, header):
+        self.header = header
+        self.parent = None
+        self.children = []
+        # blocks that are not in a nested loop, the header comes first
+        self.blocks = []
+        self.depth = 1
+
+    def iterBlocks(self):
+        '''all blocks of the loop including nested loops'''
+        stack = [self]
+        while stack:
+            loop = stack.pop()
+            yield from loop.blocks
+            stack.extend(loop.children)
+
+    def __repr__(self):
+        return f"<Loop at {self.header}, depth {self.depth}>"
+
+class LoopNest:
+    '''
+    Natural loops found from back edges, which are edges to a block that
+    dominates the source. Loops with the same header are merged.
+
+    Inner loops are found first. Their blocks are then represented by the
+    header in a union-find structure, so that every block is only visited
+    once when the outer loops are collected.
+    '''
+
+    def __init__(self, cfg, dominatorTree):
+        self.cfg = cfg
+        blockAmount = len(cfg.blocks)
+        order = dominatorTree.reachableBlocks
+
+        backEdgeSources = {}
+        for block in order:
+            for successor in block.successors:
+                if dominatorTree.dominates(successor, block):
+                    backEdgeSources.setdefault(successor.index, []).append(block.index)
+
+        representatives = list(range(blockAmount))
+        def find(index):
+            root = index
+            while representatives[root] != root:
+                root = representatives[root]
+            while representatives[index] != root:
+                representatives[index], index = root, representatives[index]
+            return root
+
+        self.loopByBlock = [None] * blockAmount
+        loopByHeader = {}
+        self.loops = []
+        for header in reversed(order):
+            sources = backEdgeSources.get(header.index)
+            if sources is None:
+                continue
+            loop = Loop(header)
+            loop.blocks.append(header)
+            self.loopByBlock[header.index] = loop
+            loopByHeader[header.index] = loop
+            self.loops.append(loop)
+
+            stack = list(sources)
+            while stack:
+                index = find(stack.pop())
+                if index == header.index:
+                    continue
+                innerLoop = loopByHeader.get(index)
+                if innerLoop is not None:
+                    innerLoop.parent = loop
+                    loop.children.append(innerLoop)
+                else:
+                    loop.blocks.append(cfg.blocks[index])
+                    self.loopByBlock[index] = loop
+                representatives[index] = header.index
+                for predecessor in cfg.blocks[index].predecessors:
+                    if dominatorTree.isReachable(predecessor):
+                        stack.append(predecessor.index)
+
+        # outer loops were created after their children
+        self.loops.reverse()
+        for loop in self.loops:
+            if loop.parent is not None:
+                loop.depth = loop.parent.depth + 1
+        self.topLevelLoops = [loop for loop in self.loops if loop.parent is None]
+
+    def getLoop(self, block):
+        '''innermost loop that contains the block or None'''
+        return self.loopByBlock[block.index]
+
+    def getDepth(self, block):
+        loop = self.loopByBlock[block.index]
+        return 0 if loop is None else loop.depth
@@ -0,0 +1,207 @@
+'''
+Compact encoding of an ir.Function.
+
+Virtual registers get dense ids per function, the arguments come first.
+Instructions are stored as columns in arrays instead of one object per
+instruction. Labels stay in the instruction stream as LABEL entries so
+that the layout does not change.
+
+Meaning of the columns per opcode:
+
+    LABEL          immediate = label id
+    INITIALIZE     target, immediate = value
+    MOVE           target, a
+    two operands   target, a, b        (ADD, SUB, ..., EQUAL, LESS, ...)
+    RETURN         a, -1 when nothing is returned
+    CALL           target, a = start in callArguments, b = argument amount,
+                   immediate = callee id
+    GOTO           immediate = label id
+    GOTO_IF_ZERO   a, immediate = label id
+
+Unused columns contain -1.
+'''
+
+from array import array
+from . import ir
+
+opcodeNames = [
+    "LABEL", "INITIALIZE", "MOVE",
+    "ADD", "SUB", "MUL", "DIV",
+    "EQUAL", "NOT_EQUAL", "LESS", "LESS_EQUAL", "GREATER", "GREATER_EQUAL",
+    "RETURN", "CALL", "GOTO", "GOTO_IF_ZERO",
+]
+(LABEL, INITIALIZE, MOVE,
+ ADD, SUB, MUL, DIV,
+ EQUAL, NOT_EQUAL, LESS, LESS_EQUAL, GREATER, GREATER_EQUAL,
+ RETURN, CALL, GOTO, GOTO_IF_ZERO) = range(len(opcodeNames))
+
+opcodeByTwoOpOperation = {"+" : ADD, "-" : SUB, "*" : MUL, "/" : DIV}
+opcodeByCompareOperation = {
+    "==" : EQUAL, "!=" : NOT_EQUAL,
+    "<" : LESS, "<=" : LESS_EQUAL,
+    ">" : GREATER, ">=" : GREATER_EQUAL,
+}
+operationByOpcode = {opcode : operation for operation, opcode in
+                     {**opcodeByTwoOpOperation, **opcodeByCompareOperation}.items()}
+twoOpOpcodes = set(opcodeByTwoOpOperation.values())
+compareOpcodes = set(opcodeByCompareOperation.values())
+
+class CompactFunction:
+    def __init__(self, name, argumentAmount):
+        self.name = name
+        self.argumentAmount = argumentAmount
+        self.vregAmount = argumentAmount
+        self.opcodes = array("B")
+        self.targets = array("i")
+        self.operandsA = array("i")
+        self.operandsB = array("i")
+        self.immediates = array("q")
+        self.callArguments = array("i")
+        self.labelNames = []
+        self.calleeNames = []
+
+    @classmethod
+    def fromFunction(cls, function):
+        compact = cls(function.name, len(function.arguments))
+        vregIds = {vreg : i for i, vreg in enumerate(function.arguments)}
+        labelIds = {}
+        calleeIds = {}
+
+        def getVRegId(vreg):
+            if vreg is None:
+                return -1
+            vregId = vregIds.get(vreg)
+            if vregId is None:
+                vregId = vregIds[vreg] = len(vregIds)
+            return vregId
+
+        def getLabelId(label):
+            labelId = labelIds.get(label)
+            if labelId is None:
+                labelId = labelIds[label] = len(compact.labelNames)
+                compact.labelNames.append(label.name)
+            return labelId
+
+        add = compact.add
+        for element in function.block:
+            elementType = type(element)
+            if elementType is ir.Label:
+                add(LABEL, immediate = getLabelId(element))
+            elif elementType is ir.InitializeInstr:
+                if not -2**63 <= element.value < 2**63:
+                    raise Exception(f"integer literal {element.value} does not fit into 64 bits")
+                add(INITIALIZE, getVRegId(element.vreg), immediate = element.value)
+            elif elementType is ir.MoveInstr:
+                add(MOVE, getVRegId(element.target), getVRegId(element.source))
+            elif elementType is ir.TwoOpInstr:
+                add(opcodeByTwoOpOperation[element.operation], getVRegId(element.target),
+                    getVRegId(element.a), getVRegId(element.b))
+            elif elementType is ir.CompareInstr:
+                add(opcodeByCompareOperation[element.operation], getVRegId(element.target),
+                    getVRegId(element.a), getVRegId(element.b))
+            elif elementType is ir.ReturnInstr:
+                add(RETURN, a = getVRegId(element.vreg))
+            elif elementType is ir.CallInstr:
+                calleeId = calleeIds.get(element.label)
+                if calleeId is None:
+                    calleeId = calleeIds[element.label] = len(compact.calleeNames)
+                    compact.calleeNames.append(element.label)
+                start = len(compact.callArguments)
+                compact.callArguments.extend(getVRegId(vreg) for vreg in element.arguments)
+                add(CALL, getVRegId(element.target), start, len(element.arguments), calleeId)
+            elif elementType is ir.GotoInstr:
+                add(GOTO, immediate = getLabelId(element.label))
+            elif elementType is ir.GotoIfZero:
+                add(GOTO_IF_ZERO, a = getVRegId(element.vreg), immediate = getLabelId(element.label))
+            else:
+                raise NotImplementedError(str(element))
+
+        compact.vregAmount = len(vregIds)
+        return compact
+
+    def add(self, opcode, target = -1, a = -1, b = -1, immediate = -1):
+        self.opcodes.append(opcode)
+        self.targets.append(target)
+        self.operandsA.append(a)
+        self.operandsB.append(b)
+        self.immediates.append(immediate)
+
+    def toFunction(self):
+        '''creates an ir.Function with new registers and labels'''
+        function = ir.Function(self.name)
+        vregs = [ir.VirtualRegister() for _ in range(self.vregAmount)]
+        function.arguments = vregs[:self.argumentAmount]
+        labels = [ir.Label(name) for name in self.labelNames]
+
+        block = function.block
+        for i, opcode in enumerate(self.opcodes):
+            target = vregs[self.targets[i]] if self.targets[i] >= 0 else None
+            a = vregs[self.operandsA[i]] if self.operandsA[i] >= 0 else None
+            immediate = self.immediates[i]
+            if opcode == LABEL:
+                block.add(labels[immediate])
+            elif opcode == INITIALIZE:
+                block.add(ir.InitializeInstr(target, immediate))
+            elif opcode == MOVE:
+                block.add(ir.MoveInstr(target, a))
+            elif opcode in twoOpOpcodes:
+                block.add(ir.TwoOpInstr(operationByOpcode[opcode], target, a, vregs[self.operandsB[i]]))
+            elif opcode in compareOpcodes:
+                block.add(ir.CompareInstr(operationByOpcode[opcode], target, a, vregs[self.operandsB[i]]))
+            elif opcode == RETURN:
+                block.add(ir.ReturnInstr(a))
+            elif opcode == CALL:
+                start = self.operandsA[i]
+                arguments = [vregs[vregId] for vregId in self.callArguments[start:start + self.operandsB[i]]]
+                block.add(ir.CallInstr(self.calleeNames[immediate], target, arguments))
+            elif opcode == GOTO:
+                block.add(ir.GotoInstr(labels[immediate]))
+            elif opcode == GOTO_IF_ZERO:
+                block.add(ir.GotoIfZero(a, labels[immediate]))
+        return function
+
+    def getInputVRegisters(self, index):
+        opcode = self.opcodes[index]
+        if opcode in twoOpOpcodes or opcode in compareOpcodes:
+            return [self.operandsA[index], self.operandsB[index]]
+        elif opcode == MOVE or opcode == GOTO_IF_ZERO:
+            return [self.operandsA[index]]
+        elif opcode == RETURN:
+            return [self.operandsA[index]] if self.operandsA[index] >= 0 else []
+        elif opcode == CALL:
+            start = self.operandsA[index]
+            return list(self.callArguments[start:start + self.operandsB[index]])
+        return []
+
+    def getOutputVRegister(self, index):
+        '''vreg id or -1'''
+        return self.targets[index]
+
+    def getLabelPositions(self):
+        '''index of the LABEL entry of every label id'''
+        positions = [-1] * len(self.labelNames)
+        for i, opcode in enumerate(self.opcodes):
+            if opcode == LABEL:
+                positions[self.immediates[i]] = i
+        return positions
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def __repr__(self):
+        lines = [f"{self.name} ({', '.join(f'%{i}' for i in range(self.argumentAmount))})"]
+        for i, opcode in enumerate(self.opcodes):
+            columns = (self.targets[i], self.operandsA[i], self.operandsB[i], self.immediates[i])
+            lines.append(f"{opcodeNames[opcode]:<14} " + " ".join(f"{value:>5}" for value in columns))
+        return "\n".join(lines)
+
+class CompactModule:
+    def __init__(self, functions):
+        self.functions = functions
+
+    @classmethod
+    def fromModule(cls, module):
+        return cls([CompactFunction.fromFunction(function) for function in module.functions])
+
+    def toModule(self):
+        return ir.Module([function.toFunction() for function in self.functions])
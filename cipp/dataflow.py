@@ -0,0 +1,280 @@
+'''
+Worklist based dataflow analysis over the blocks of a ControlFlowGraph.
+
+Sets are Python integers that are used as bitsets. Every analysis gives
+each block a gen and a kill set, the solver then computes
+
+    forward:   in = meet(out of predecessors),  out = gen | (in & ~kill)
+    backward:  out = meet(in of successors),    in = gen | (out & ~kill)
+
+where meet is a union or an intersection. Blocks are visited in reverse
+postorder (forward) or postorder (backward), so that loop free code
+converges after a single pass.
+'''
+
+import heapq
+from . import ir
+
+def solve(cfg, gen, kill, isForward, isUnion, boundary = 0, initial = 0, edgeGen = None):
+    '''
+    gen and kill are lists indexed by block index. boundary is the value
+    at the entry (forward) or at blocks without successors (backward).
+    initial is the starting value of all other sets, it has to be the
+    full set for intersections. edgeGen maps (source index, target index)
+    to bits that are added on that edge only.
+    Returns (ins, outs, visits).
+    '''
+    blocks = cfg.blocks
+    order = cfg.reversePostorder()
+    if not isForward:
+        order.reverse()
+    # unreachable blocks are analyzed too, after all others
+    reached = {block.index for block in order}
+    order.extend(block for block in blocks if block.index not in reached)
+
+    ins = [initial] * len(blocks)
+    outs = [initial] * len(blocks)
+    edgeGen = edgeGen or {}
+
+    # the worklist always continues with the block that comes first in the order
+    position = [0] * len(blocks)
+    for i, block in enumerate(order):
+        position[block.index] = i
+    worklist = list(range(len(order)))
+    isQueued = [True] * len(blocks)
+    visits = 0
+    while worklist:
+        block = order[heapq.heappop(worklist)]
+        index = block.index
+        isQueued[index] = False
+        visits += 1
+
+        neighbors = block.predecessors if isForward else block.successors
+        if len(neighbors) == 0 or (isForward and index == 0):
+            value = boundary
+        else:
+            value = None
+            for neighbor in neighbors:
+                if isForward:
+                    incoming = outs[neighbor.index] | edgeGen.get((neighbor.index, index), 0)
+                else:
+                    incoming = ins[neighbor.index] | edgeGen.get((index, neighbor.index), 0)
+                if value is None:
+                    value = incoming
+                elif isUnion:
+                    value |= incoming
+                else:
+                    value &= incoming
+
+        result = gen[index] | (value & ~kill[index])
+        if isForward:
+            ins[index] = value
+            changed = result != outs[index]
+            outs[index] = result
+            dependents = block.successors
+        else:
+            outs[index] = value
+            changed = result != ins[index]
+            ins[index] = result
+            dependents = block.predecessors
+
+        if changed:
+            for dependent in dependents:
+                if not isQueued[dependent.index]:
+                    isQueued[dependent.index] = True
+                    heapq.heappush(worklist, position[dependent.index])
+    return ins, outs, visits
+
+class BitIndex:
+    '''assigns a bit to every item'''
+
+    def __init__(self, items = ()):
+        self.items = []
+        self.bitByItem = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        bit = self.bitByItem.get(item)
+        if bit is None:
+            bit = self.bitByItem[item] = len(self.items)
+            self.items.append(item)
+        return bit
+
+    def getMask(self, item):
+        return 1 << self.bitByItem[item]
+
+    def getFullMask(self):
+        return (1 << len(self.items)) - 1
+
+    def toList(self, bits):
+        return [self.items[bit] for bit in iterBits(bits)]
+
+    def __len__(self):
+        return len(self.items)
+
+def iterBits(bits):
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+# Liveness
+####################################################
+
+class Liveness:
+    '''
+    Registers that may be read later. Works with and without SSA form,
+    the inputs of phis are live at the end of the matching predecessor.
+    '''
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.vregs = BitIndex(cfg.function.arguments)
+        gen = []
+        kill = []
+        edgeGen = {}
+        for block in cfg.blocks:
+            blockGen = 0
+            blockKill = 0
+            for instruction in block.instructions:
+                if isinstance(instruction, ir.PhiInstr):
+                    for predecessor, vreg in instruction.sources.items():
+                        if vreg is not None:
+                            key = (predecessor.index, block.index)
+                            edgeGen[key] = edgeGen.get(key, 0) | (1 << self.vregs.add(vreg))
+                else:
+                    for vreg in instruction.getInputVRegisters():
+                        mask = 1 << self.vregs.add(vreg)
+                        if not blockKill & mask:
+                            blockGen |= mask
+                output = instruction.getOutputVRegister()
+                if output is not None:
+                    blockKill |= 1 << self.vregs.add(output)
+            gen.append(blockGen)
+            kill.append(blockKill)
+
+        self.liveIn, self.liveOut, self.visits = solve(
+            cfg, gen, kill, isForward = False, isUnion = True, edgeGen = edgeGen)
+
+    def getLiveIn(self, block):
+        return set(self.vregs.toList(self.liveIn[block.index]))
+
+    def getLiveOut(self, block):
+        return set(self.vregs.toList(self.liveOut[block.index]))
+
+    def iterLiveAfter(self, block):
+        '''
+        Yields (instruction, bits of the registers that are live after it)
+        for the instructions of the block in reverse order.
+        '''
+        live = self.liveOut[block.index]
+        bitByItem = self.vregs.bitByItem
+        for instruction in reversed(block.instructions):
+            yield instruction, live
+            output = instruction.getOutputVRegister()
+            if output is not None:
+                live &= ~(1 << bitByItem[output])
+            if not isinstance(instruction, ir.PhiInstr):
+                for vreg in instruction.getInputVRegisters():
+                    live |= 1 << bitByItem[vreg]
+
+
+# Reaching Definitions
+####################################################
+
+class ReachingDefinitions:
+    '''
+    Definitions are instructions with an output register. Arguments are
+    defined at the entry, they are represented by the register itself.
+    '''
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.definitions = BitIndex(cfg.function.arguments)
+        self.definitionsPerVRegister = {vreg : self.definitions.getMask(vreg)
+                                        for vreg in cfg.function.arguments}
+        for instruction in cfg.iterInstructions():
+            output = instruction.getOutputVRegister()
+            if output is not None:
+                mask = 1 << self.definitions.add(instruction)
+                self.definitionsPerVRegister[output] = self.definitionsPerVRegister.get(output, 0) | mask
+
+        gen = []
+        kill = []
+        for block in cfg.blocks:
+            blockGen = 0
+            blockKill = 0
+            for instruction in block.instructions:
+                output = instruction.getOutputVRegister()
+                if output is not None:
+                    mask = self.definitions.getMask(instruction)
+                    others = self.definitionsPerVRegister[output] & ~mask
+                    blockGen = (blockGen & ~others) | mask
+                    blockKill = (blockKill | others) & ~mask
+            gen.append(blockGen)
+            kill.append(blockKill)
+
+        argumentBits = (1 << len(cfg.function.arguments)) - 1
+        self.reachIn, self.reachOut, self.visits = solve(
+            cfg, gen, kill, isForward = True, isUnion = True, boundary = argumentBits)
+
+    def getReachingIn(self, block):
+        return self.definitions.toList(self.reachIn[block.index])
+
+    def getReachingDefinitions(self, block, vreg):
+        '''definitions of the register that reach the start of the block'''
+        bits = self.reachIn[block.index] & self.definitionsPerVRegister.get(vreg, 0)
+        return self.definitions.toList(bits)
+
+
+# Available Expressions
+####################################################
+
+class AvailableExpressions:
+    '''
+    An expression is available when it has been computed on every path
+    and none of its operands has been written since. Expressions are the
+    (type, operation, a, b) keys of TwoOpInstrs and CompareInstrs.
+    '''
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.expressions = BitIndex()
+        self.expressionsPerOperand = {}
+        for instruction in cfg.iterInstructions():
+            key = getExpressionKey(instruction)
+            if key is not None and key not in self.expressions.bitByItem:
+                mask = 1 << self.expressions.add(key)
+                for vreg in (instruction.a, instruction.b):
+                    self.expressionsPerOperand[vreg] = self.expressionsPerOperand.get(vreg, 0) | mask
+
+        gen = []
+        kill = []
+        for block in cfg.blocks:
+            blockGen = 0
+            blockKill = 0
+            for instruction in block.instructions:
+                key = getExpressionKey(instruction)
+                if key is not None:
+                    blockGen |= self.expressions.getMask(key)
+                output = instruction.getOutputVRegister()
+                if output is not None:
+                    killed = self.expressionsPerOperand.get(output, 0)
+                    blockGen &= ~killed
+                    blockKill |= killed
+            gen.append(blockGen)
+            kill.append(blockKill & ~blockGen)
+
+        full = self.expressions.getFullMask()
+        self.availableIn, self.availableOut, self.visits = solve(
+            cfg, gen, kill, isForward = True, isUnion = False, boundary = 0, initial = full)
+
+    def getAvailableIn(self, block):
+        return self.expressions.toList(self.availableIn[block.index])
+
+def getExpressionKey(instruction):
+    if isinstance(instruction, (ir.TwoOpInstr, ir.CompareInstr)):
+        return (type(instruction), instruction.operation, instruction.a, instruction.b)
+    return None
@@ -0,0 +1,211 @@
+'''
+Translates source code to IR in a single pass. Instructions are emitted
+while the constructs are recognized, so no AST is built.
+
+The result is the same IR that parser.parse followed by
+ast_to_ir.transformProgramToIR creates. That path remains for tools
+that need the AST.
+'''
+
+from . import ir
+from . parser import (
+    stringToTokenStream, peekOperator, groupByOperator,
+    acceptKeyword, acceptLetter, acceptIdentifier, acceptInteger,
+    nextIsKeyword, nextIsLetter, nextIsIdentifier, nextIsInteger
+)
+
+def transformToIR(source):
+    return transformTokensToIR(stringToTokenStream(source))
+
+def transformTokensToIR(tokens):
+    functions = []
+    while nextIsKeyword(tokens, "def"):
+        functions.append(transformFunctionToIR(tokens))
+    return ir.Module(functions)
+
+def transformFunctionToIR(tokens):
+    acceptKeyword(tokens, "def")
+    skipType(tokens)
+    acceptLetter(tokens, "@")
+    functionIR = ir.Function(acceptIdentifier(tokens))
+
+    variables = {}
+    acceptLetter(tokens, "(")
+    while not nextIsLetter(tokens, ")"):
+        skipType(tokens)
+        variables[acceptIdentifier(tokens)] = functionIR.addArgument()
+        if nextIsLetter(tokens, ","):
+            acceptLetter(tokens, ",")
+        else:
+            break
+    acceptLetter(tokens, ")")
+
+    insertStatement(tokens, functionIR.block, variables)
+    return functionIR
+
+def skipType(tokens):
+    acceptIdentifier(tokens)
+
+
+# Statements
+####################################################
+
+def insertStatement(tokens, block, variables):
+    if nextIsLetter(tokens, "{"):
+        insertStatement_Block(tokens, block, variables)
+    elif nextIsKeyword(tokens, "return"):
+        insertStatement_Return(tokens, block, variables)
+    elif nextIsKeyword(tokens, "let"):
+        insertStatement_Let(tokens, block, variables)
+    elif nextIsKeyword(tokens, "while"):
+        insertStatement_While(tokens, block, variables)
+    elif nextIsKeyword(tokens, "if"):
+        insertStatement_If(tokens, block, variables)
+    elif nextIsIdentifier(tokens):
+        insertStatement_Assignment(tokens, block, variables)
+    else:
+        raise Exception("unknown statement type")
+
+def insertStatement_Block(tokens, block, variables):
+    acceptLetter(tokens, "{")
+    while not nextIsLetter(tokens, "}"):
+        insertStatement(tokens, block, variables)
+    acceptLetter(tokens, "}")
+
+def insertStatement_Return(tokens, block, variables):
+    acceptKeyword(tokens, "return")
+    result = insertExpression(tokens, block, variables)
+    acceptLetter(tokens, ";")
+    block.add(ir.ReturnInstr(result))
+
+def insertStatement_Let(tokens, block, variables):
+    acceptKeyword(tokens, "let")
+    skipType(tokens)
+    name = acceptIdentifier(tokens)
+    acceptLetter(tokens, "=")
+    value = insertExpression(tokens, block, variables)
+    acceptLetter(tokens, ";")
+    variables[name] = value
+
+def insertStatement_Assignment(tokens, block, variables):
+    targetName = acceptIdentifier(tokens)
+    if nextIsLetter(tokens, "["):
+        raise NotImplementedError("array assignment")
+    acceptLetter(tokens, "=")
+    result = insertExpression(tokens, block, variables)
+    acceptLetter(tokens, ";")
+    block.add(ir.MoveInstr(variables[targetName], result))
+
+def insertStatement_While(tokens, block, variables):
+    startLabel = block.newLabel("while_start")
+    afterLabel = block.newLabel("while_after")
+    block.add(startLabel)
+
+    acceptKeyword(tokens, "while")
+    condResult = insertBracketedExpression(tokens, block, variables)
+    block.add(ir.GotoIfZero(condResult, afterLabel))
+    insertStatement(tokens, block, variables)
+    block.add(ir.GotoInstr(startLabel))
+
+    block.add(afterLabel)
+
+def insertStatement_If(tokens, block, variables):
+    acceptKeyword(tokens, "if")
+    condResult = insertBracketedExpression(tokens, block, variables)
+    # the jump target is only known after the then-statement
+    skipThen = ir.GotoIfZero(condResult, None)
+    block.add(skipThen)
+    insertStatement(tokens, block, variables)
+
+    if nextIsKeyword(tokens, "else"):
+        acceptKeyword(tokens, "else")
+        startElseLabel = block.newLabel("else_start")
+        afterElseLabel = block.newLabel("else_end")
+        skipThen.label = startElseLabel
+        block.add(ir.GotoInstr(afterElseLabel))
+        block.add(startElseLabel)
+        insertStatement(tokens, block, variables)
+        block.add(afterElseLabel)
+    else:
+        afterLabel = block.newLabel("if_after")
+        skipThen.label = afterLabel
+        block.add(afterLabel)
+
+def insertBracketedExpression(tokens, block, variables):
+    acceptLetter(tokens, "(")
+    result = insertExpression(tokens, block, variables)
+    acceptLetter(tokens, ")")
+    return result
+
+
+# Expressions
+####################################################
+
+def insertExpression(tokens, block, variables, minPrecedence = 0):
+    '''
+    Same precedence climbing as parser.parseExpression. Whether an operand
+    is the first term of a sum or product is only known after its
+    instructions have been emitted. The initialization of the result is
+    inserted in front of them then.
+    '''
+    start = len(block.elements)
+    result = insertFactor(tokens, block, variables)
+    while True:
+        operator = peekOperator(tokens)
+        if operator is None:
+            return result
+        group = groupByOperator[operator]
+        if group.precedence < minPrecedence:
+            return result
+
+        if group.isChainable:
+            first = result
+            firstOperation = group.operators[0]
+            result = ir.VirtualRegister()
+            block.elements.insert(start, ir.InitializeInstr(result, initialValues[firstOperation]))
+            block.add(ir.TwoOpInstr(firstOperation, result, result, first))
+            while operator in group.operators:
+                tokens.skip(len(operator))
+                reg = insertExpression(tokens, block, variables, group.precedence + 1)
+                block.add(ir.TwoOpInstr(operator, result, result, reg))
+                operator = peekOperator(tokens)
+        else:
+            tokens.skip(len(operator))
+            a = result
+            b = insertExpression(tokens, block, variables, group.precedence + 1)
+            result = ir.VirtualRegister()
+            block.add(ir.CompareInstr(operator, result, a, b))
+            minPrecedence = group.precedence + 1
+
+initialValues = {"+" : 0, "*" : 1}
+
+def insertFactor(tokens, block, variables):
+    if nextIsIdentifier(tokens):
+        return variables[acceptIdentifier(tokens)]
+    elif nextIsInteger(tokens):
+        result = ir.VirtualRegister()
+        block.add(ir.InitializeInstr(result, acceptInteger(tokens)))
+        return result
+    elif nextIsLetter(tokens, "("):
+        return insertBracketedExpression(tokens, block, variables)
+    elif nextIsLetter(tokens, "@"):
+        return insertFunctionCall(tokens, block, variables)
+    else:
+        raise Exception("expected expression")
+
+def insertFunctionCall(tokens, block, variables):
+    acceptLetter(tokens, "@")
+    name = acceptIdentifier(tokens)
+    argumentRegs = []
+    acceptLetter(tokens, "(")
+    while not nextIsLetter(tokens, ")"):
+        argumentRegs.append(insertExpression(tokens, block, variables))
+        if nextIsLetter(tokens, ","):
+            acceptLetter(tokens, ",")
+        else:
+            break
+    acceptLetter(tokens, ")")
+
+    result = ir.VirtualRegister()
+    block.add(ir.CallInstr(name, result, argumentRegs))
+    return result
@@ -88,6 +88,21 @@ class Instruction:
     def getVRegisters(self):
         return []
 
+    def getInputVRegisters(self):
+        '''registers that are read'''
+        return []
+
+    def getOutputVRegister(self):
+        '''register that is written or None'''
+        return None
+
+    def replaceInputVRegisters(self, replace):
+        '''replace is called with every input register and returns the new one'''
+        pass
+
+    def setOutputVRegister(self, vreg):
+        raise Exception(f"{type(self).__name__} has no output")
+
 class TwoOpInstr(Instruction):
     def __init__(self, operation, target, a, b):
         self.operation = operation
@@ -98,6 +113,19 @@ class TwoOpInstr(Instruction):
     def getVRegisters(self):
         return [self.target, self.a, self.b]
 
+    def getInputVRegisters(self):
+        return [self.a, self.b]
+
+    def getOutputVRegister(self):
+        return self.target
+
+    def replaceInputVRegisters(self, replace):
+        self.a = replace(self.a)
+        self.b = replace(self.b)
+
+    def setOutputVRegister(self, vreg):
+        self.target = vreg
+
     def __repr__(self):
         return f"{self.target} = {self.a} {self.operation} {self.b}"
 
@@ -109,6 +137,12 @@ class InitializeInstr(Instruction):
     def getVRegisters(self):
         return [self.vreg]
 
+    def getOutputVRegister(self):
+        return self.vreg
+
+    def setOutputVRegister(self, vreg):
+        self.vreg = vreg
+
     def __repr__(self):
         return f"{self.vreg} = {self.value}"
 
@@ -120,6 +154,18 @@ class MoveInstr(Instruction):
     def getVRegisters(self):
         return [self.target, self.source]
 
+    def getInputVRegisters(self):
+        return [self.source]
+
+    def getOutputVRegister(self):
+        return self.target
+
+    def replaceInputVRegisters(self, replace):
+        self.source = replace(self.source)
+
+    def setOutputVRegister(self, vreg):
+        self.target = vreg
+
     def __repr__(self):
         return f"{self.target} = {self.source}"
 
@@ -133,6 +179,19 @@ class CompareInstr(Instruction):
     def getVRegisters(self):
         return [self.target, self.a, self.b]
 
+    def getInputVRegisters(self):
+        return [self.a, self.b]
+
+    def getOutputVRegister(self):
+        return self.target
+
+    def replaceInputVRegisters(self, replace):
+        self.a = replace(self.a)
+        self.b = replace(self.b)
+
+    def setOutputVRegister(self, vreg):
+        self.target = vreg
+
     def __repr__(self):
         return f"{self.target} = {self.a} {self.operation} {self.b}"
 
@@ -143,6 +202,13 @@ class ReturnInstr(Instruction):
     def getVRegisters(self):
         return [self.vreg]
 
+    def getInputVRegisters(self):
+        return [] if self.vreg is None else [self.vreg]
+
+    def replaceInputVRegisters(self, replace):
+        if self.vreg is not None:
+            self.vreg = replace(self.vreg)
+
     def __repr__(self):
         return f"return {self.vreg}"
 
@@ -155,6 +221,18 @@ class CallInstr(Instruction):
     def getVRegisters(self):
         return self.arguments + [self.target]
 
+    def getInputVRegisters(self):
+        return list(self.arguments)
+
+    def getOutputVRegister(self):
+        return self.target
+
+    def replaceInputVRegisters(self, replace):
+        self.arguments = [replace(vreg) for vreg in self.arguments]
+
+    def setOutputVRegister(self, vreg):
+        self.target = vreg
+
     def __repr__(self):
         return f"call {self.label}({', '.join(map(str, self.arguments))})"
 
@@ -173,5 +251,44 @@ class GotoIfZero(Instruction):
     def getVRegisters(self):
         return [self.vreg]
 
+    def getInputVRegisters(self):
+        return [self.vreg]
+
+    def replaceInputVRegisters(self, replace):
+        self.vreg = replace(self.vreg)
+
+    def __repr__(self):
+        return f"if {self.vreg} == 0: goto {self.label.name}"
+
+class PhiInstr(Instruction):
+    '''
+    Only exists while a function is in SSA form, see cipp.ssa.
+    sources maps every predecessor block to the register that
+    is used when control comes from it. Sources can be None when
+    the value is undefined on that path.
+    '''
+
+    def __init__(self, target, sources = None):
+        self.target = target
+        self.sources = sources if sources is not None else {}
+
+    def getVRegisters(self):
+        return self.getInputVRegisters() + [self.target]
+
+    def getInputVRegisters(self):
+        return [vreg for vreg in self.sources.values() if vreg is not None]
+
+    def getOutputVRegister(self):
+        return self.target
+
+    def replaceInputVRegisters(self, replace):
+        for block, vreg in self.sources.items():
+            if vreg is not None:
+                self.sources[block] = replace(vreg)
+
+    def setOutputVRegister(self, vreg):
+        self.target = vreg
+
     def __repr__(self):
-        return f"if {self.vreg} == 0: goto {self.label.name}"
\ No newline at end of file
+        sources = ", ".join(f"{block.index}: {vreg}" for block, vreg in self.sources.items())
+        return f"{self.target} = phi({sources})"
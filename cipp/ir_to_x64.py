@@ -1,16 +1,18 @@
 from . import ir
 from . x64assembler.block import Block, Label
 from . x64assembler import instructions as x64
-from . x64assembler.registers import allRegisters
+from . x64assembler.registers import allRegisters, GeneralPurposeRegister
+from . register_allocation import allocateRegisters, calleeSavedRegisters
+from . stack_slots import assignStackSlots
 from . platform_utils import onLinux, onWindows
 
 globals().update(allRegisters)
 
-def compileModule(moduleIR):
+def compileModule(moduleIR, registerAllocation = False, reuseStackSlots = False, tailCalls = False):
     elements = []
     for functionIR in moduleIR.functions:
         elements.append(Label(functionIR.name))
-        elements.extend(compileFunction(functionIR))
+        elements.extend(compileFunction(functionIR, registerAllocation, reuseStackSlots, tailCalls))
 
     block = Block(elements)
     return block
@@ -24,33 +26,83 @@ elif onWindows:
 else:
     raise Exception("unsupported platform")
 
-def compileFunction(functionIR):
-    vregOffsets = {}
-    for i, reg in enumerate(functionIR.getUsedVRegisters()):
-        vregOffsets[reg] = i * 8
+class Frame:
+    '''
+    Location of every virtual register, which is either a register or
+    an offset from the stack pointer. Used callee saved registers are
+    pushed before the stack slots are reserved.
+    '''
 
-    yield from prepareStack(vregOffsets)
+    def __init__(self, locations, slotAmount, savedRegisters = ()):
+        self.locations = locations
+        self.size = slotAmount * 8
+        self.savedRegisters = list(savedRegisters)
 
-    for reg, vreg in zip(call_registers, functionIR.arguments):
-        yield storeVirtualRegister(reg, vreg, vregOffsets)
+    @classmethod
+    def fromStackSlots(cls, functionIR, reuseStackSlots = False):
+        if reuseStackSlots:
+            slotByVReg, slotAmount = assignStackSlots(functionIR)
+            locations = {vreg : slot * 8 for vreg, slot in slotByVReg.items()}
+            return cls(locations, slotAmount)
+        locations = {}
+        for i, reg in enumerate(functionIR.getUsedVRegisters()):
+            locations[reg] = i * 8
+        return cls(locations, len(locations))
 
-    for irElement in functionIR.block:
-        yield from elementToAssemblyElement(irElement, vregOffsets)
+    @classmethod
+    def fromRegisterAllocation(cls, functionIR, reuseStackSlots = False):
+        locations = allocateRegisters(functionIR)
+        spilled = [vreg for vreg, location in locations.items() if location is None]
+        if reuseStackSlots:
+            slotByVReg, slotAmount = assignStackSlots(functionIR, spilled)
+        else:
+            slotByVReg = {vreg : i for i, vreg in enumerate(spilled)}
+            slotAmount = len(spilled)
+        for vreg, slot in slotByVReg.items():
+            locations[vreg] = slot * 8
+        usedRegisters = set(locations.values())
+        savedRegisters = [reg for reg in calleeSavedRegisters if reg in usedRegisters]
+        return cls(locations, slotAmount, savedRegisters)
 
-def elementToAssemblyElement(irElement, vregOffsets):
+def compileFunction(functionIR, registerAllocation = False, reuseStackSlots = False, tailCalls = False):
+    if registerAllocation:
+        frame = Frame.fromRegisterAllocation(functionIR, reuseStackSlots)
+    else:
+        frame = Frame.fromStackSlots(functionIR, reuseStackSlots)
+
+    yield from prepareStack(frame)
+    yield from moveArguments(functionIR.arguments, frame)
+
+    elements = functionIR.block.elements
+    skipNext = False
+    for i, irElement in enumerate(elements):
+        if skipNext:
+            skipNext = False
+        elif tailCalls and isTailCall(elements, i):
+            yield from tailCallToAssembly(irElement, frame)
+            # the callee returns to our caller, the return is not needed
+            skipNext = True
+        else:
+            yield from elementToAssemblyElement(irElement, frame)
+
+def elementToAssemblyElement(irElement, frame):
     if isinstance(irElement, ir.Instruction):
-        yield from irInstructionToAssembly(irElement, vregOffsets)
+        yield from irInstructionToAssembly(irElement, frame)
     elif isinstance(irElement, ir.Label):
         yield Label(irElement.name)
 
-def irInstructionToAssembly(instr, vregOffsets):
+def irInstructionToAssembly(instr, frame):
     if isinstance(instr, ir.InitializeInstr):
-        yield x64.MovImmToRegInstr(rax, instr.value)
-        yield storeVirtualRegister(rax, instr.vreg, vregOffsets)
+        target = frame.locations[instr.vreg]
+        if isRegister(target):
+            yield x64.MovImmToRegInstr(target, instr.value)
+        else:
+            yield x64.MovImmToRegInstr(rax, instr.value)
+            yield storeVirtualRegister(rax, instr.vreg, frame)
     elif isinstance(instr, ir.CompareInstr):
-        yield loadVirtualRegister(rax, instr.a, vregOffsets)
-        yield loadVirtualRegister(rcx, instr.b, vregOffsets)
-        yield x64.CompareInstr(rax, rcx)
+        a = yield from loadOperand(rax, instr.a, frame)
+        b = yield from loadOperand(rcx, instr.b, frame)
+        yield x64.CompareInstr(a, b)
         yield x64.MovImmToRegInstr(rax, 0)
         yield {
             "!=" : x64.SetIfNotEqualInstr,
@@ -60,51 +112,155 @@ def irInstructionToAssembly(instr, vregOffsets):
             ">=" : x64.SetIfGreaterOrEqualInstr,
             "<=" : x64.SetIfLessOrEqualInstr
         }[instr.operation](al)
-        yield storeVirtualRegister(rax, instr.target, vregOffsets)
+        yield from storeResult(rax, instr.target, frame)
     elif isinstance(instr, ir.MoveInstr):
-        yield loadVirtualRegister(rax, instr.source, vregOffsets)
-        yield storeVirtualRegister(rax, instr.target, vregOffsets)
+        target = frame.locations[instr.target]
+        if isRegister(target):
+            yield from loadInto(target, instr.source, frame)
+        else:
+            source = yield from loadOperand(rax, instr.source, frame)
+            yield storeVirtualRegister(source, instr.target, frame)
     elif isinstance(instr, ir.TwoOpInstr):
-        yield loadVirtualRegister(rax, instr.a, vregOffsets)
-        yield loadVirtualRegister(rcx, instr.b, vregOffsets)
+        # compute in the target register unless that would overwrite b too early
+        target = frame.locations[instr.target]
+        if isRegister(target) and target is not frame.locations[instr.b]:
+            result = target
+        else:
+            result = rax
+        yield from loadInto(result, instr.a, frame)
+        b = yield from loadOperand(rcx, instr.b, frame)
         if instr.operation == "+":
-            yield x64.AddRegToRegInstr(rax, rcx)
+            yield x64.AddRegToRegInstr(result, b)
         elif instr.operation == "-":
-            yield x64.SubRegFromRegInstr(rax, rcx)
-        yield storeVirtualRegister(rax, instr.target, vregOffsets)
+            yield x64.SubRegFromRegInstr(result, b)
+        elif instr.operation == "*":
+            yield x64.MulRegToRegInstr(result, b)
+        yield from storeResult(result, instr.target, frame)
     elif isinstance(instr, ir.ReturnInstr):
-        yield loadVirtualRegister(rax, instr.vreg, vregOffsets)
-        yield from clearStackAndReturn(vregOffsets)
+        if instr.vreg is not None:
+            yield from loadInto(rax, instr.vreg, frame)
+        yield from clearStackAndReturn(frame)
     elif isinstance(instr, ir.GotoInstr):
         yield x64.JmpInstr(instr.label.name)
     elif isinstance(instr, ir.GotoIfZero):
         yield x64.MovImmToRegInstr(rax, 0)
-        yield loadVirtualRegister(rcx, instr.vreg, vregOffsets)
-        yield x64.CompareInstr(rax, rcx)
+        value = yield from loadOperand(rcx, instr.vreg, frame)
+        yield x64.CompareInstr(rax, value)
         yield x64.JmpZeroInstr(instr.label.name)
     elif isinstance(instr, ir.CallInstr):
-        for vreg, reg in zip(instr.arguments, call_registers):
-            yield loadVirtualRegister(reg, vreg, vregOffsets)
+        yield from moveCallArguments(instr.arguments, frame)
         yield x64.CallInstr(instr.label)
-        yield storeVirtualRegister(rax, instr.target, vregOffsets)
+        yield from storeResult(rax, instr.target, frame)
     else:
         raise NotImplementedError(str(instr))
 
+def tailCallToAssembly(instr, frame):
+    '''
+    The arguments are loaded before the frame is cleared, the callee
+    then finds the return address of this function on top of the stack.
+    '''
+    yield from moveCallArguments(instr.arguments, frame)
+    yield from clearStack(frame)
+    yield x64.JmpInstr(instr.label)
+
+def isTailCall(elements, index):
+    '''checks if the element at the index is a call that is followed by a return of its result'''
+    call = elements[index]
+    if not isinstance(call, ir.CallInstr) or index + 1 >= len(elements):
+        return False
+    following = elements[index + 1]
+    return isinstance(following, ir.ReturnInstr) and following.vreg is call.target
+
+def isRegister(location):
+    return isinstance(location, GeneralPurposeRegister)
+
 def changeStackPointer(byteAmount):
     return x64.AddImmToRegInstr(rsp, byteAmount)
 
-def loadVirtualRegister(target, vreg, vregOffsets):
-    return x64.MovMemToRegInstr(target, rsp, vregOffsets[vreg])
+def loadVirtualRegister(target, vreg, frame):
+    return x64.MovMemToRegInstr(target, rsp, frame.locations[vreg])
+
+def storeVirtualRegister(source, vreg, frame):
+    return x64.MovRegToMemInstr(rsp, source, frame.locations[vreg])
+
+def loadOperand(scratch, vreg, frame):
+    '''returns the register that contains the value, loads it into scratch if necessary'''
+    location = frame.locations[vreg]
+    if isRegister(location):
+        return location
+    yield loadVirtualRegister(scratch, vreg, frame)
+    return scratch
+
+def loadInto(target, vreg, frame):
+    location = frame.locations[vreg]
+    if not isRegister(location):
+        yield loadVirtualRegister(target, vreg, frame)
+    elif location is not target:
+        yield x64.MovRegToRegInstr(target, location)
+
+def storeResult(source, vreg, frame):
+    location = frame.locations[vreg]
+    if not isRegister(location):
+        yield storeVirtualRegister(source, vreg, frame)
+    elif location is not source:
+        yield x64.MovRegToRegInstr(location, source)
+
+def moveArguments(arguments, frame):
+    '''moves the incoming arguments from the call registers to their locations'''
+    registerMoves = []
+    for reg, vreg in zip(call_registers, arguments):
+        location = frame.locations[vreg]
+        if isRegister(location):
+            registerMoves.append((location, reg))
+        else:
+            yield storeVirtualRegister(reg, vreg, frame)
+    yield from moveRegistersInParallel(registerMoves)
+
+def moveCallArguments(arguments, frame):
+    registerMoves = []
+    memoryArguments = []
+    for vreg, reg in zip(arguments, call_registers):
+        location = frame.locations[vreg]
+        if isRegister(location):
+            registerMoves.append((reg, location))
+        else:
+            memoryArguments.append((reg, vreg))
+    # loads from the stack do not read any register, so they come last
+    yield from moveRegistersInParallel(registerMoves)
+    for reg, vreg in memoryArguments:
+        yield loadVirtualRegister(reg, vreg, frame)
 
-def storeVirtualRegister(source, vreg, vregOffsets):
-    return x64.MovRegToMemInstr(rsp, source, vregOffsets[vreg])
+def moveRegistersInParallel(moves):
+    '''
+    moves is a list of (target, source) register pairs that happen at the
+    same time. Cycles are broken with rax.
+    '''
+    pending = {target : source for target, source in moves if target is not source}
+    while pending:
+        readSources = set(pending.values())
+        ready = [target for target in pending if target not in readSources]
+        if ready:
+            for target in ready:
+                yield x64.MovRegToRegInstr(target, pending.pop(target))
+        else:
+            target = next(iter(pending))
+            yield x64.MovRegToRegInstr(rax, target)
+            for other, source in pending.items():
+                if source is target:
+                    pending[other] = rax
 
-def prepareStack(vregOffsets):
-    yield changeStackPointer(-len(vregOffsets) * 8)
+def prepareStack(frame):
+    for reg in frame.savedRegisters:
+        yield x64.PushRegInstr(reg)
+    if frame.size > 0:
+        yield changeStackPointer(-frame.size)
 
-def clearStack(vregOffsets):
-    yield changeStackPointer(len(vregOffsets) * 8)
+def clearStack(frame):
+    if frame.size > 0:
+        yield changeStackPointer(frame.size)
+    for reg in reversed(frame.savedRegisters):
+        yield x64.PopRegInstr(reg)
 
-def clearStackAndReturn(vregOffsets):
-    yield from clearStack(vregOffsets)
+def clearStackAndReturn(frame):
+    yield from clearStack(frame)
     yield x64.RetInstr()
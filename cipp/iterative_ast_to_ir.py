@@ -0,0 +1,244 @@
+'''
+Creates the same IR as cipp.ast_to_ir, but without recursion.
+
+Pending work is kept on a stack of (handler, argument) pairs. A handler
+can emit instructions and push more work. Expression handlers put their
+result register on a separate stack of values, from where the handler
+that needs it takes it later.
+'''
+
+from . import ir
+from . import ast
+
+def transformProgramToIR(programAST):
+    functionsIRs = list(map(transformFunctionToIR, programAST.functions))
+    return ir.Module(functionsIRs)
+
+def transformFunctionToIR(functionAST):
+    functionIR = ir.Function(functionAST.name)
+
+    variables = {}
+    for argument in functionAST.arguments:
+        variables[argument.name] = functionIR.addArgument()
+
+    insertInstr_Statement(functionIR.block, functionAST.statement, variables)
+
+    return functionIR
+
+def insertInstr_Statement(block, statementAST, variables):
+    runWork(block, variables, lowerStatement, statementAST)
+
+def insertInstr_Expression(block, expr, variables):
+    values = runWork(block, variables, lowerExpression, expr)
+    return values[0]
+
+def runWork(block, variables, handler, argument):
+    work = [(handler, argument)]
+    values = []
+    while work:
+        handler, argument = work.pop()
+        handler(block, variables, work, values, argument)
+    return values
+
+
+# Statements
+####################################################
+
+def lowerStatement(block, variables, work, values, statementAST):
+    getStatementHandler(statementAST)(block, variables, work, values, statementAST)
+
+def getStatementHandler(statementAST):
+    handler = statementHandlers.get(type(statementAST))
+    if handler is None:
+        raise NotImplementedError(str(statementAST))
+    return handler
+
+def lowerStatement_Block(block, variables, work, values, blockAST):
+    for statement in reversed(blockAST.statements):
+        work.append((getStatementHandler(statement), statement))
+
+def lowerStatement_Assignment(block, variables, work, values, assignmentAST):
+    work.append((emitAssignment, assignmentAST.target))
+    work.append((getExpressionHandler(assignmentAST.expression), assignmentAST.expression))
+
+def lowerStatement_Return(block, variables, work, values, returnAST):
+    work.append((emitReturn, None))
+    work.append((getExpressionHandler(returnAST.expression), returnAST.expression))
+
+def lowerStatement_While(block, variables, work, values, whileAST):
+    startLabel = block.newLabel("while_start")
+    afterLabel = block.newLabel("while_after")
+    block.add(startLabel)
+
+    work.append((emitElement, afterLabel))
+    work.append((emitElement, ir.GotoInstr(startLabel)))
+    work.append((getStatementHandler(whileAST.statement), whileAST.statement))
+    work.append((emitGotoIfZero, afterLabel))
+    work.append((getExpressionHandler(whileAST.condition), whileAST.condition))
+
+def lowerStatement_If(block, variables, work, values, ifAST):
+    afterLabel = block.newLabel("if_after")
+    work.append((emitElement, afterLabel))
+    work.append((getStatementHandler(ifAST.thenStatement), ifAST.thenStatement))
+    work.append((emitGotoIfZero, afterLabel))
+    work.append((getExpressionHandler(ifAST.condition), ifAST.condition))
+
+def lowerStatement_IfElse(block, variables, work, values, ifElseAST):
+    startElseLabel = block.newLabel("else_start")
+    afterElseLabel = block.newLabel("else_end")
+
+    work.append((emitElement, afterElseLabel))
+    work.append((getStatementHandler(ifElseAST.elseStatement), ifElseAST.elseStatement))
+    work.append((emitElement, startElseLabel))
+    work.append((emitElement, ir.GotoInstr(afterElseLabel)))
+    work.append((getStatementHandler(ifElseAST.thenStatement), ifElseAST.thenStatement))
+    work.append((emitGotoIfZero, startElseLabel))
+    work.append((getExpressionHandler(ifElseAST.condition), ifElseAST.condition))
+
+def lowerUnsupported(block, variables, work, values, node):
+    raise NotImplementedError(str(node))
+
+def lowerStatement_Let(block, variables, work, values, letAST):
+    work.append((bindVariable, letAST.name))
+    work.append((getExpressionHandler(letAST.expression), letAST.expression))
+
+statementHandlers = {
+    ast.BlockStmt : lowerStatement_Block,
+    ast.AssignmentStmt : lowerStatement_Assignment,
+    ast.ReturnStmt : lowerStatement_Return,
+    ast.WhileStmt : lowerStatement_While,
+    ast.IfStmt : lowerStatement_If,
+    ast.IfElseStmt : lowerStatement_IfElse,
+    ast.LetStmt : lowerStatement_Let,
+    ast.ArrayAssignmentStmt : lowerUnsupported,
+}
+
+
+# Expressions
+####################################################
+
+def lowerExpression(block, variables, work, values, expr):
+    getExpressionHandler(expr)(block, variables, work, values, expr)
+
+def getExpressionHandler(expr):
+    handler = expressionHandlers.get(type(expr))
+    if handler is None:
+        raise NotImplementedError(str(expr))
+    return handler
+
+def lowerExpression_Comparison(block, variables, work, values, expr):
+    result = ir.VirtualRegister()
+    if type(expr.left) in leafTypes and type(expr.right) in leafTypes:
+        a = lowerLeaf(block, variables, expr.left)
+        b = lowerLeaf(block, variables, expr.right)
+        block.add(ir.CompareInstr(expr.operator, result, a, b))
+        values.append(result)
+        return
+
+    work.append((emitComparison, (expr.operator, result)))
+    work.append((getExpressionHandler(expr.right), expr.right))
+    work.append((getExpressionHandler(expr.left), expr.left))
+
+def lowerExpression_Terms(block, variables, work, values, expr):
+    result = ir.VirtualRegister()
+    initialValue = 0 if isinstance(expr, ast.AddSubExpr) else 1
+    block.add(ir.InitializeInstr(result, initialValue))
+
+    if allAreLeaves([term.expr for term in expr.terms]):
+        for term in expr.terms:
+            reg = lowerLeaf(block, variables, term.expr)
+            block.add(ir.TwoOpInstr(term.operation, result, result, reg))
+        values.append(result)
+        return
+
+    work.append((pushValue, result))
+    for term in reversed(expr.terms):
+        work.append((emitTermOperation, (term.operation, result)))
+        work.append((getExpressionHandler(term.expr), term.expr))
+
+def lowerExpression_ConstInt(block, variables, work, values, intAST):
+    result = ir.VirtualRegister()
+    block.add(ir.InitializeInstr(result, intAST.value))
+    values.append(result)
+
+def lowerExpression_Variable(block, variables, work, values, variableAST):
+    values.append(variables[variableAST.name])
+
+def lowerExpression_FunctionCall(block, variables, work, values, functionCallAST):
+    if allAreLeaves(functionCallAST.arguments):
+        for expr in functionCallAST.arguments:
+            values.append(lowerLeaf(block, variables, expr))
+        emitCall(block, variables, work, values, functionCallAST)
+        return
+
+    work.append((emitCall, functionCallAST))
+    for expr in reversed(functionCallAST.arguments):
+        work.append((getExpressionHandler(expr), expr))
+
+# Leaves are lowered directly when all children of an expression are leaves.
+# This avoids the work stack for most small expressions.
+
+def allAreLeaves(expressions):
+    for expr in expressions:
+        if type(expr) not in leafTypes:
+            return False
+    return True
+
+def lowerLeaf(block, variables, expr):
+    if type(expr) is ast.Variable:
+        return variables[expr.name]
+    result = ir.VirtualRegister()
+    block.add(ir.InitializeInstr(result, expr.value))
+    return result
+
+leafTypes = {ast.Variable, ast.ConstInt}
+
+expressionHandlers = {
+    ast.ComparisonExpr : lowerExpression_Comparison,
+    ast.AddSubExpr : lowerExpression_Terms,
+    ast.MulDivExpr : lowerExpression_Terms,
+    ast.ConstInt : lowerExpression_ConstInt,
+    ast.Variable : lowerExpression_Variable,
+    ast.FunctionCall : lowerExpression_FunctionCall,
+}
+
+
+# Work that uses results of expressions
+####################################################
+
+def emitElement(block, variables, work, values, element):
+    block.add(element)
+
+def emitAssignment(block, variables, work, values, target):
+    block.add(ir.MoveInstr(variables[target], values.pop()))
+
+def emitReturn(block, variables, work, values, _):
+    block.add(ir.ReturnInstr(values.pop()))
+
+def emitGotoIfZero(block, variables, work, values, label):
+    block.add(ir.GotoIfZero(values.pop(), label))
+
+def bindVariable(block, variables, work, values, name):
+    variables[name] = values.pop()
+
+def emitComparison(block, variables, work, values, operatorAndResult):
+    operator, result = operatorAndResult
+    b = values.pop()
+    a = values.pop()
+    block.add(ir.CompareInstr(operator, result, a, b))
+    values.append(result)
+
+def emitTermOperation(block, variables, work, values, operationAndResult):
+    operation, result = operationAndResult
+    block.add(ir.TwoOpInstr(operation, result, result, values.pop()))
+
+def emitCall(block, variables, work, values, functionCallAST):
+    argumentAmount = len(functionCallAST.arguments)
+    argumentRegs = values[len(values) - argumentAmount:]
+    del values[len(values) - argumentAmount:]
+    result = ir.VirtualRegister()
+    block.add(ir.CallInstr(functionCallAST.functionName, result, argumentRegs))
+    values.append(result)
+
+def pushValue(block, variables, work, values, vreg):
+    values.append(vreg)
@@ -0,0 +1,255 @@
+'''
+Parser that produces the same AST as cipp.parser, but keeps nested
+statements and expressions on an explicit stack instead of the Python
+call stack. Deeply nested code does not hit the recursion limit.
+'''
+
+from . import ast
+from . tokens import IdentifierToken, IntegerToken
+from . parser import (
+    parseType, parseArguments, peekOperator, groupByOperator,
+    acceptKeyword, acceptLetter, acceptIdentifier, acceptInteger,
+    nextIsKeyword, nextIsLetter, nextIsIdentifier, nextIsInteger
+)
+
+def parseProgram(tokens):
+    functions = []
+    while nextIsKeyword(tokens, "def"):
+        function = parseFunction(tokens)
+        functions.append(function)
+    return ast.Program(functions)
+
+def parseFunction(tokens):
+    acceptKeyword(tokens, "def")
+    retType = parseType(tokens)
+    acceptLetter(tokens, "@")
+    name = acceptIdentifier(tokens)
+    arguments = parseArguments(tokens)
+    statement = parseStatement(tokens)
+    return ast.Function(name, retType, arguments, statement)
+
+
+# Statements
+####################################################
+
+def parseStatement(tokens):
+    stack = []
+    while True:
+        statement = parseStatementStart(tokens, stack)
+        while statement is not None:
+            if len(stack) == 0:
+                return statement
+            statement = stack[-1].add(tokens, statement)
+            if statement is not None:
+                stack.pop()
+
+def parseStatementStart(tokens, stack):
+    '''
+    Returns the statement when it is complete already.
+    Otherwise a frame is pushed that waits for the nested statement.
+    '''
+    if nextIsLetter(tokens, "{"):
+        acceptLetter(tokens, "{")
+        if nextIsLetter(tokens, "}"):
+            acceptLetter(tokens, "}")
+            return ast.BlockStmt([])
+        stack.append(BlockFrame())
+    elif nextIsKeyword(tokens, "return"):
+        return parseStatement_Return(tokens)
+    elif nextIsKeyword(tokens, "let"):
+        return parseStatement_Let(tokens)
+    elif nextIsKeyword(tokens, "while"):
+        acceptKeyword(tokens, "while")
+        stack.append(WhileFrame(parseCondition(tokens)))
+    elif nextIsKeyword(tokens, "if"):
+        acceptKeyword(tokens, "if")
+        stack.append(IfFrame(parseCondition(tokens)))
+    elif nextIsIdentifier(tokens):
+        return parseStatement_Assignment(tokens)
+    else:
+        raise Exception("unknown statement type")
+    return None
+
+class BlockFrame:
+    def __init__(self):
+        self.statements = []
+
+    def add(self, tokens, statement):
+        self.statements.append(statement)
+        if not nextIsLetter(tokens, "}"):
+            return None
+        acceptLetter(tokens, "}")
+        if len(self.statements) == 1:
+            return self.statements[0]
+        else:
+            return ast.BlockStmt(self.statements)
+
+class WhileFrame:
+    def __init__(self, condition):
+        self.condition = condition
+
+    def add(self, tokens, statement):
+        return ast.WhileStmt(self.condition, statement)
+
+class IfFrame:
+    def __init__(self, condition):
+        self.condition = condition
+        self.thenStatement = None
+
+    def add(self, tokens, statement):
+        if self.thenStatement is not None:
+            return ast.IfElseStmt(self.condition, self.thenStatement, statement)
+        if nextIsKeyword(tokens, "else"):
+            acceptKeyword(tokens, "else")
+            self.thenStatement = statement
+            return None
+        return ast.IfStmt(self.condition, statement)
+
+def parseCondition(tokens):
+    acceptLetter(tokens, "(")
+    condition = parseExpression(tokens)
+    acceptLetter(tokens, ")")
+    return condition
+
+def parseStatement_Return(tokens):
+    acceptKeyword(tokens, "return")
+    expression = parseExpression(tokens)
+    acceptLetter(tokens, ";")
+    return ast.ReturnStmt(expression)
+
+def parseStatement_Let(tokens):
+    acceptKeyword(tokens, "let")
+    dataType = parseType(tokens)
+    name = acceptIdentifier(tokens)
+    acceptLetter(tokens, "=")
+    expression = parseExpression(tokens)
+    acceptLetter(tokens, ";")
+    return ast.LetStmt(name, dataType, expression)
+
+def parseStatement_Assignment(tokens):
+    targetName = acceptIdentifier(tokens)
+    if nextIsLetter(tokens, "["):
+        acceptLetter(tokens, "[")
+        offset = parseExpression(tokens)
+        acceptLetter(tokens, "]")
+        acceptLetter(tokens, "=")
+        expression = parseExpression(tokens)
+        acceptLetter(tokens, ";")
+        return ast.ArrayAssignmentStmt(targetName, offset, expression)
+    else:
+        acceptLetter(tokens, "=")
+        expression = parseExpression(tokens)
+        acceptLetter(tokens, ";")
+        return ast.AssignmentStmt(targetName, expression)
+
+
+# Expressions
+####################################################
+
+def parseExpression(tokens):
+    '''
+    Same precedence climbing as parser.parseExpression. Every frame on the
+    stack stands for a suspended recursive call. minPrecedence belongs to
+    the innermost call that is currently running.
+    '''
+    stack = []
+    minPrecedence = 0
+    while True:
+        # variables and constants are handled inline because they are most common
+        tokenType = tokens.peekType()
+        if tokenType is IdentifierToken:
+            expression = ast.Variable(tokens.takeNextValue())
+        elif tokenType is IntegerToken:
+            expression = ast.ConstInt(tokens.takeNextValue())
+        else:
+            expression = parseFactorStart(tokens, stack, minPrecedence)
+            if expression is None:
+                minPrecedence = 0
+                continue
+
+        while True:
+            operator = peekOperator(tokens)
+            if operator is not None:
+                group = groupByOperator[operator]
+                if group.precedence >= minPrecedence:
+                    tokens.skip(len(operator))
+                    stack.append(GroupFrame(minPrecedence, group, expression, operator))
+                    minPrecedence = group.precedence + 1
+                    break
+
+            if len(stack) == 0:
+                return expression
+
+            frame = stack[-1]
+            if isinstance(frame, GroupFrame):
+                group = frame.group
+                frame.operations.append((frame.operator, expression))
+                if group.isChainable:
+                    operator = peekOperator(tokens)
+                    if operator in group.operators:
+                        tokens.skip(len(operator))
+                        frame.operator = operator
+                        minPrecedence = group.precedence + 1
+                        break
+                stack.pop()
+                expression = group.build(frame.first, frame.operations)
+                minPrecedence = frame.minPrecedence
+                if not group.isChainable:
+                    minPrecedence = group.precedence + 1
+            elif isinstance(frame, BracketFrame):
+                acceptLetter(tokens, ")")
+                stack.pop()
+                minPrecedence = frame.minPrecedence
+            elif isinstance(frame, CallFrame):
+                frame.arguments.append(expression)
+                if nextIsLetter(tokens, ","):
+                    acceptLetter(tokens, ",")
+                    if not nextIsLetter(tokens, ")"):
+                        minPrecedence = 0
+                        break
+                acceptLetter(tokens, ")")
+                stack.pop()
+                expression = ast.FunctionCall(frame.name, frame.arguments)
+                minPrecedence = frame.minPrecedence
+
+def parseFactorStart(tokens, stack, minPrecedence):
+    '''
+    Returns the factor when it is complete already.
+    Otherwise a frame is pushed that waits for a nested expression.
+    '''
+    if nextIsIdentifier(tokens):
+        return ast.Variable(acceptIdentifier(tokens))
+    elif nextIsInteger(tokens):
+        return ast.ConstInt(acceptInteger(tokens))
+    elif nextIsLetter(tokens, "("):
+        acceptLetter(tokens, "(")
+        stack.append(BracketFrame(minPrecedence))
+    elif nextIsLetter(tokens, "@"):
+        acceptLetter(tokens, "@")
+        name = acceptIdentifier(tokens)
+        acceptLetter(tokens, "(")
+        if nextIsLetter(tokens, ")"):
+            acceptLetter(tokens, ")")
+            return ast.FunctionCall(name, [])
+        stack.append(CallFrame(minPrecedence, name))
+    else:
+        raise Exception("expected expression")
+    return None
+
+class GroupFrame:
+    def __init__(self, minPrecedence, group, first, operator):
+        self.minPrecedence = minPrecedence
+        self.group = group
+        self.first = first
+        self.operator = operator
+        self.operations = []
+
+class BracketFrame:
+    def __init__(self, minPrecedence):
+        self.minPrecedence = minPrecedence
+
+class CallFrame:
+    def __init__(self, minPrecedence, name):
+        self.minPrecedence = minPrecedence
+        self.name = name
+        self.arguments = []
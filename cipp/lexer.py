@@ -19,10 +19,24 @@ class Lexer:
 
 
 class Token:
+    # Used by the TableLexer. The pattern has to match exactly the chars
+    # that would be consumed by checkNext, starting with the first char.
+    pattern = None
+    forbiddenNextChars = ""
+
     @classmethod
     def startswith(cls, char):
         raise NotImplementedError()
 
+    @classmethod
+    def fromString(cls, string):
+        '''create the finished token from all chars it consumed'''
+        raise NotImplementedError()
+
+    @classmethod
+    def valueFromString(cls, string):
+        return cls.fromString(string).value
+
     def __init__(self, firstChar):
         pass
 
@@ -0,0 +1,345 @@
+'''
+Reads grammar.txt and generates the tables for the LL(1) parser in
+cipp.ll1_parser. Run "python -m cipp.ll1_generator" after the grammar
+changed to update ll1_tables.py.
+
+The EBNF of the grammar is turned into plain productions first. Every
+group, 'x*' and 'x?' gets its own helper nonterminal. The action of a
+production tells the parser how to build a value from its children:
+
+    rule           build the value with the builder of the rule
+    group          tuple of the children, single children are passed through
+    optional       value of the only child
+    optional-none  None
+    repeat         append the child to the list of the repetition
+    repeat-end     the list is complete
+'''
+
+import os
+import re
+import sys
+from pprint import pformat
+
+directory = os.path.dirname(os.path.abspath(__file__))
+grammarPath = os.path.join(directory, "grammar.txt")
+tablesPath = os.path.join(directory, "ll1_tables.py")
+
+endMarker = "$"
+tokenTerminals = ("IDENTIFIER", "NUMBER")
+
+def generateTables(grammarPath = grammarPath):
+    with open(grammarPath) as f:
+        grammar = Grammar.fromText(f.read())
+    return grammar.toPython()
+
+def writeTables():
+    source = generateTables()
+    with open(tablesPath, "w") as f:
+        f.write(source)
+    return source
+
+
+class Production:
+    def __init__(self, nonterminal, symbols, action):
+        self.nonterminal = nonterminal
+        self.symbols = tuple(symbols)
+        self.action = action
+
+    def __repr__(self):
+        return f"{self.nonterminal} : {' '.join(self.symbols) or '<empty>'}"
+
+class Grammar:
+    def __init__(self, rules):
+        '''rules is a list of (name, alternatives) in the order of the file'''
+        self.nonterminals = []
+        self.productions = []
+        self.ruleNames = {name for name, _ in rules}
+        self.helperCounters = {}
+
+        for name, alternatives in rules:
+            self.nonterminals.append(name)
+            for sequence in alternatives:
+                symbols = [self.insertNode(name, node) for node in sequence]
+                self.productions.append(Production(name, symbols, "rule"))
+
+        self.startSymbol = rules[0][0]
+        self.terminals = {symbol for production in self.productions
+                          for symbol in production.symbols
+                          if symbol not in self.productionsByNonterminal()}
+        self.keywords = {terminal for terminal in self.terminals
+                         if re.fullmatch("[a-z_][a-z0-9_]*", terminal)}
+
+        self.nullable = self.computeNullable()
+        self.firstSets = self.computeFirstSets()
+        self.followSets = self.computeFollowSets()
+        self.resolvedConflicts = []
+        self.predictTable = self.computePredictTable()
+
+    @classmethod
+    def fromText(cls, text):
+        return cls(parseRules(text))
+
+    def insertNode(self, ruleName, node):
+        '''returns the symbol that stands for the node'''
+        kind = node[0]
+        if kind == "symbol":
+            return node[1]
+        elif kind == "group":
+            alternatives = node[1]
+            if len(alternatives) == 1 and len(alternatives[0]) == 1:
+                return self.insertNode(ruleName, alternatives[0][0])
+            helper = self.newHelper(ruleName)
+            for sequence in alternatives:
+                symbols = [self.insertNode(ruleName, child) for child in sequence]
+                self.productions.append(Production(helper, symbols, "group"))
+            return helper
+        elif kind == "optional":
+            child = self.insertNode(ruleName, node[1])
+            helper = self.newHelper(ruleName)
+            self.productions.append(Production(helper, [child], "optional"))
+            self.productions.append(Production(helper, [], "optional-none"))
+            return helper
+        elif kind == "repeat":
+            child = self.insertNode(ruleName, node[1])
+            helper = self.newHelper(ruleName)
+            self.productions.append(Production(helper, [child, helper], "repeat"))
+            self.productions.append(Production(helper, [], "repeat-end"))
+            return helper
+        else:
+            raise Exception(f"unknown node kind: {kind}")
+
+    def newHelper(self, ruleName):
+        number = self.helperCounters.get(ruleName, 0) + 1
+        self.helperCounters[ruleName] = number
+        name = f"{ruleName}.{number}"
+        self.nonterminals.append(name)
+        return name
+
+    def productionsByNonterminal(self):
+        result = {name : [] for name in self.nonterminals}
+        for production in self.productions:
+            result[production.nonterminal].append(production)
+        return result
+
+    def isTerminal(self, symbol):
+        return symbol in self.terminals
+
+    def computeNullable(self):
+        nullable = set()
+        changed = True
+        while changed:
+            changed = False
+            for production in self.productions:
+                if production.nonterminal in nullable:
+                    continue
+                if all(symbol in nullable for symbol in production.symbols):
+                    nullable.add(production.nonterminal)
+                    changed = True
+        return nullable
+
+    def computeFirstSets(self):
+        firstSets = {name : set() for name in self.nonterminals}
+        changed = True
+        while changed:
+            changed = False
+            for production in self.productions:
+                first = self.firstOfSequence(production.symbols, firstSets)
+                target = firstSets[production.nonterminal]
+                if not first <= target:
+                    target |= first
+                    changed = True
+        return firstSets
+
+    def firstOfSequence(self, symbols, firstSets = None):
+        firstSets = firstSets or self.firstSets
+        result = set()
+        for symbol in symbols:
+            if self.isTerminal(symbol):
+                result.add(symbol)
+                return result
+            result |= firstSets[symbol]
+            if symbol not in self.nullable:
+                return result
+        return result
+
+    def sequenceIsNullable(self, symbols):
+        return all(symbol in self.nullable for symbol in symbols)
+
+    def computeFollowSets(self):
+        followSets = {name : set() for name in self.nonterminals}
+        followSets[self.startSymbol].add(endMarker)
+        changed = True
+        while changed:
+            changed = False
+            for production in self.productions:
+                for i, symbol in enumerate(production.symbols):
+                    if self.isTerminal(symbol):
+                        continue
+                    rest = production.symbols[i+1:]
+                    follow = self.firstOfSequence(rest)
+                    if self.sequenceIsNullable(rest):
+                        follow |= followSets[production.nonterminal]
+                    if not follow <= followSets[symbol]:
+                        followSets[symbol] |= follow
+                        changed = True
+        return followSets
+
+    def computePredictTable(self):
+        '''
+        Maps every nonterminal to a dict from terminals to the index of
+        the production that has to be used. When an empty production and a
+        non-empty production both fit, the non-empty one wins. That binds
+        an 'else' to the closest 'if'.
+        '''
+        table = {name : {} for name in self.nonterminals}
+        for index, production in enumerate(self.productions):
+            row = table[production.nonterminal]
+            for terminal in self.firstOfSequence(production.symbols):
+                if terminal in row:
+                    raise Exception(f"grammar is not LL(1): '{terminal}' predicts "
+                                    f"{self.productions[row[terminal]]} and {production}")
+                row[terminal] = index
+
+        for index, production in enumerate(self.productions):
+            if not self.sequenceIsNullable(production.symbols):
+                continue
+            row = table[production.nonterminal]
+            for terminal in self.followSets[production.nonterminal]:
+                if terminal not in row:
+                    row[terminal] = index
+                elif self.sequenceIsNullable(self.productions[row[terminal]].symbols):
+                    raise Exception(f"grammar is not LL(1): '{terminal}' predicts "
+                                    f"{self.productions[row[terminal]]} and {production}")
+                elif row[terminal] != index:
+                    self.resolvedConflicts.append((production.nonterminal, terminal))
+        return table
+
+    def toPython(self):
+        lines = [
+            "# Generated by cipp/ll1_generator.py from cipp/grammar.txt, do not edit.",
+            "# Run \"python -m cipp.ll1_generator\" after changing the grammar.",
+            "",
+            f"startSymbol = {self.startSymbol!r}",
+            "",
+            f"keywords = {formatSet(self.keywords)}",
+            "",
+            "# (nonterminal, symbols, action)",
+            "productions = [",
+        ]
+        for index, production in enumerate(self.productions):
+            entry = (production.nonterminal, production.symbols, production.action)
+            lines.append(f"    {entry!r}, # {index}")
+        lines.append("]")
+        lines.append("")
+        lines.extend(formatDict("firstSets", self.firstSets, formatSet))
+        lines.extend(formatDict("followSets", self.followSets, formatSet))
+        lines.extend(formatDict("predictTable", self.predictTable,
+                                lambda row: pformat(row, width = 1000)))
+        return "\n".join(lines)
+
+def formatSet(values):
+    if len(values) == 0:
+        return "set()"
+    return "{" + ", ".join(map(repr, sorted(values))) + "}"
+
+def formatDict(name, dictionary, formatValue):
+    lines = [f"{name} = {{"]
+    for key, value in dictionary.items():
+        lines.append(f"    {key!r} : {formatValue(value)},")
+    lines.append("}")
+    lines.append("")
+    return lines
+
+
+# Reading the Grammar File
+####################################################
+
+rulePattern = re.compile(r"^([a-z][a-z0-9-]*)\s*:(.*)$")
+grammarTokenPattern = re.compile(r"\s*('[^']+'|[A-Za-z][A-Za-z0-9-]*|[()|*?])")
+
+def parseRules(text):
+    '''
+    A rule starts at the beginning of a line. Indented lines
+    continue the previous rule.
+    '''
+    ruleTexts = []
+    for line in text.splitlines():
+        if line.strip() == "":
+            continue
+        match = rulePattern.match(line)
+        if match:
+            ruleTexts.append([match.group(1), match.group(2)])
+        elif line[0].isspace() and len(ruleTexts) > 0:
+            ruleTexts[-1][1] += " " + line
+        else:
+            raise Exception(f"cannot parse grammar line: '{line}'")
+
+    ruleNames = {name for name, _ in ruleTexts}
+    rules = []
+    for name, body in ruleTexts:
+        tokens = tokenizeRule(body, ruleNames)
+        alternatives = parseAlternatives(tokens)
+        if len(tokens) > 0:
+            raise Exception(f"unexpected '{tokens[0][1]}' in rule '{name}'")
+        rules.append((name, alternatives))
+    return rules
+
+def tokenizeRule(body, ruleNames):
+    '''returns a reversed list of (kind, text) pairs'''
+    tokens = []
+    position = 0
+    body = body.rstrip()
+    while position < len(body):
+        match = grammarTokenPattern.match(body, position)
+        if match is None:
+            raise Exception(f"cannot tokenize grammar: '{body[position:]}'")
+        text = match.group(1)
+        if text.startswith("'"):
+            tokens.append(("symbol", text[1:-1]))
+        elif text in "()|*?":
+            tokens.append(("operator", text))
+        elif text in ruleNames or text in tokenTerminals:
+            tokens.append(("symbol", text))
+        else:
+            raise Exception(f"unknown symbol in grammar: '{text}'")
+        position = match.end()
+    tokens.reverse()
+    return tokens
+
+def parseAlternatives(tokens):
+    alternatives = [parseSequence(tokens)]
+    while nextIsOperator(tokens, "|"):
+        tokens.pop()
+        alternatives.append(parseSequence(tokens))
+    return alternatives
+
+def parseSequence(tokens):
+    sequence = []
+    while len(tokens) > 0 and not nextIsOperator(tokens, "|") and not nextIsOperator(tokens, ")"):
+        sequence.append(parseItem(tokens))
+    return sequence
+
+def parseItem(tokens):
+    kind, text = tokens.pop()
+    if kind == "symbol":
+        node = ("symbol", text)
+    elif text == "(":
+        node = ("group", parseAlternatives(tokens))
+        if not nextIsOperator(tokens, ")"):
+            raise Exception("expected ')' in grammar")
+        tokens.pop()
+    else:
+        raise Exception(f"unexpected '{text}' in grammar")
+
+    while nextIsOperator(tokens, "*") or nextIsOperator(tokens, "?"):
+        _, text = tokens.pop()
+        node = ("repeat" if text == "*" else "optional", node)
+    return node
+
+def nextIsOperator(tokens, operator):
+    return len(tokens) > 0 and tokens[-1] == ("operator", operator)
+
+
+if __name__ == "__main__":
+    writeTables()
+    print(f"written {tablesPath}", file = sys.stderr)
@@ -0,0 +1,267 @@
+'''
+Table-driven LL(1) parser. The productions and the predict table are
+generated from grammar.txt by cipp.ll1_generator, so this module only
+knows how the AST nodes are built for every rule of the grammar.
+
+The parser keeps the symbols it still expects on a stack. A nonterminal
+on top of the stack is replaced by the symbols of the production that is
+found with a single lookup of the next terminal in its row of the table.
+Finished values are collected on a second stack.
+
+Keywords of the grammar are reserved, they cannot be used as identifiers.
+'''
+
+from . import ast
+from . import ll1_tables
+from . tokens import IdentifierToken, IntegerToken
+from . parser import (
+    SingleCharToken, stringToTokenStream,
+    buildComparisonExpr, buildAddSubExpr, buildMulDivExpr
+)
+
+def parse(string):
+    return parseProgram(stringToTokenStream(string))
+
+def parseProgram(tokens):
+    stack = [startItem]
+    values = []
+    terminal = peekTerminal(tokens)
+
+    while stack:
+        kind, argument = stack.pop()
+        if kind == EXPAND:
+            nonterminal, row = argument
+            items = row.get(terminal)
+            if items is None:
+                raise Exception(f"unexpected {describeTerminal(terminal)} in {nonterminal}")
+            stack.extend(items)
+        elif kind == MATCH:
+            if terminal != argument:
+                raise Exception(f"expected {describeTerminal(argument)} "
+                                f"but got {describeTerminal(terminal)}")
+            values.append(tokens.takeNextValue())
+            terminal = peekTerminal(tokens)
+        elif kind == REDUCE:
+            build, amount = argument
+            start = len(values) - amount
+            children = values[start:]
+            del values[start:]
+            values.append(build(children))
+        elif kind == NEW_LIST:
+            values.append([])
+        elif kind == APPEND:
+            value = values.pop()
+            values[-1].append(value)
+        elif kind == PUSH_NONE:
+            values.append(None)
+
+    if terminal != endMarker:
+        raise Exception(f"expected end of input but got {describeTerminal(terminal)}")
+    return values[0]
+
+def peekTerminal(tokens):
+    tokenType = tokens.peekType()
+    if tokenType is SingleCharToken:
+        return tokens.peekValue()
+    elif tokenType is IdentifierToken:
+        name = tokens.peekValue()
+        return name if name in keywords else "IDENTIFIER"
+    elif tokenType is IntegerToken:
+        return "NUMBER"
+    elif tokenType is None:
+        return endMarker
+    else:
+        raise Exception(f"unexpected token type: {tokenType.__name__}")
+
+def describeTerminal(terminal):
+    if terminal == endMarker:
+        return "end of input"
+    elif terminal in ("IDENTIFIER", "NUMBER"):
+        return terminal.lower()
+    else:
+        return f"'{terminal}'"
+
+
+# AST Builders
+####################################################
+
+def buildProgram(children):
+    functions, = children
+    return ast.Program(functions)
+
+def buildFunction(children):
+    _, retType, _, name, _, arguments, _, statement = children
+    return ast.Function(name, retType, arguments, statement)
+
+def buildSeparatedList(children):
+    '''children of "(element (',' list)?)?"'''
+    content, = children
+    if content is None:
+        return []
+    element, rest = content
+    if rest is None:
+        return [element]
+    return [element] + rest[1]
+
+def buildArgument(children):
+    dataType, name = children
+    return ast.Argument(name, dataType)
+
+def buildType(children):
+    name, = children
+    return ast.Type(name)
+
+def buildStatement(children):
+    statement, = children
+    return statement
+
+def buildBlockStatement(children):
+    _, statements, _ = children
+    if len(statements) == 1:
+        return statements[0]
+    else:
+        return ast.BlockStmt(statements)
+
+def buildReturnStatement(children):
+    _, expression, _ = children
+    return ast.ReturnStmt(expression)
+
+def buildLetStatement(children):
+    _, dataType, name, _, expression, _ = children
+    return ast.LetStmt(name, dataType, expression)
+
+def buildWhileStatement(children):
+    _, _, condition, _, statement = children
+    return ast.WhileStmt(condition, statement)
+
+def buildIfStatement(children):
+    _, _, condition, _, thenStatement, elsePart = children
+    if elsePart is None:
+        return ast.IfStmt(condition, thenStatement)
+    _, elseStatement = elsePart
+    return ast.IfElseStmt(condition, thenStatement, elseStatement)
+
+def buildAssignmentStatement(children):
+    targetName, offsetPart, _, expression, _ = children
+    if offsetPart is None:
+        return ast.AssignmentStmt(targetName, expression)
+    _, offset, _ = offsetPart
+    return ast.ArrayAssignmentStmt(targetName, offset, expression)
+
+def buildExpression(children):
+    left, comparison = children
+    if comparison is None:
+        return left
+    return buildComparisonExpr(left, [comparison])
+
+def buildAddSubLevel(children):
+    first, operations = children
+    if len(operations) == 0:
+        return first
+    return buildAddSubExpr(first, operations)
+
+def buildMulDivLevel(children):
+    first, operations = children
+    if len(operations) == 0:
+        return first
+    return buildMulDivExpr(first, operations)
+
+def buildFactor(children):
+    if len(children) == 3:
+        # '(' expression ')'
+        return children[1]
+    value, = children
+    if isinstance(value, int):
+        return ast.ConstInt(value)
+    elif isinstance(value, str):
+        return ast.Variable(value)
+    else:
+        return value
+
+def buildComparisonOperator(children):
+    return "".join(letter for letter in children if letter is not None)
+
+def buildFunctionCall(children):
+    _, name, _, arguments, _ = children
+    return ast.FunctionCall(name, arguments)
+
+builderByRule = {
+    "program" : buildProgram,
+    "function" : buildFunction,
+    "argument-list" : buildSeparatedList,
+    "argument" : buildArgument,
+    "type" : buildType,
+    "statement" : buildStatement,
+    "block-statement" : buildBlockStatement,
+    "return-statement" : buildReturnStatement,
+    "let-statement" : buildLetStatement,
+    "while-statement" : buildWhileStatement,
+    "if-statement" : buildIfStatement,
+    "assignment-statement" : buildAssignmentStatement,
+    "expression" : buildExpression,
+    "expression2" : buildAddSubLevel,
+    "expression3" : buildMulDivLevel,
+    "expression4" : buildFactor,
+    "comparison-operator" : buildComparisonOperator,
+    "function-call" : buildFunctionCall,
+    "call-argument-list" : buildSeparatedList,
+}
+
+
+# Stack Items
+####################################################
+
+# Every production is turned into the items that replace its nonterminal
+# on the stack. They are stored in reverse order, so that they can be
+# pushed with a single extend.
+
+EXPAND, MATCH, REDUCE, NEW_LIST, APPEND, PUSH_NONE = range(6)
+endMarker = "$"
+keywords = ll1_tables.keywords
+
+def createStackItems(productions, predictTable):
+    rows = {nonterminal : {} for nonterminal in predictTable}
+    repeatedNonterminals = {nonterminal for nonterminal, _, action in productions
+                            if action == "repeat"}
+
+    def itemsForSymbol(symbol):
+        if symbol not in rows:
+            return [(MATCH, symbol)]
+        items = [(EXPAND, (ruleName(symbol), rows[symbol]))]
+        if symbol in repeatedNonterminals:
+            # the list is created before the first element is parsed
+            items.insert(0, (NEW_LIST, None))
+        return items
+
+    itemsPerProduction = []
+    for nonterminal, symbols, action in productions:
+        items = []
+        if action == "repeat":
+            element, _ = symbols
+            items.extend(itemsForSymbol(element))
+            items.append((APPEND, None))
+            items.append((EXPAND, (ruleName(nonterminal), rows[nonterminal])))
+        elif action == "optional-none":
+            items.append((PUSH_NONE, None))
+        else:
+            for symbol in symbols:
+                items.extend(itemsForSymbol(symbol))
+            if action == "rule":
+                if nonterminal not in builderByRule:
+                    raise Exception(f"no builder for rule '{nonterminal}'")
+                items.append((REDUCE, (builderByRule[nonterminal], len(symbols))))
+            elif action == "group" and len(symbols) > 1:
+                items.append((REDUCE, (tuple, len(symbols))))
+        itemsPerProduction.append(tuple(reversed(items)))
+
+    for nonterminal, row in predictTable.items():
+        for terminal, index in row.items():
+            rows[nonterminal][terminal] = itemsPerProduction[index]
+    return rows
+
+def ruleName(nonterminal):
+    '''helper nonterminals are called "rule.number"'''
+    return nonterminal.split(".")[0]
+
+rows = createStackItems(ll1_tables.productions, ll1_tables.predictTable)
+startItem = (EXPAND, (ll1_tables.startSymbol, rows[ll1_tables.startSymbol]))
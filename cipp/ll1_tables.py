@@ -0,0 +1,217 @@
+# Generated by cipp/ll1_generator.py from cipp/grammar.txt, do not edit.
+# Run "python -m cipp.ll1_generator" after changing the grammar.
+
+startSymbol = 'program'
+
+keywords = {'def', 'else', 'if', 'let', 'return', 'while'}
+
+# (nonterminal, symbols, action)
+productions = [
+    ('program.1', ('function', 'program.1'), 'repeat'), # 0
+    ('program.1', (), 'repeat-end'), # 1
+    ('program', ('program.1',), 'rule'), # 2
+    ('function', ('def', 'type', '@', 'IDENTIFIER', '(', 'argument-list', ')', 'statement'), 'rule'), # 3
+    ('argument-list.2', (',', 'argument-list'), 'group'), # 4
+    ('argument-list.3', ('argument-list.2',), 'optional'), # 5
+    ('argument-list.3', (), 'optional-none'), # 6
+    ('argument-list.1', ('argument', 'argument-list.3'), 'group'), # 7
+    ('argument-list.4', ('argument-list.1',), 'optional'), # 8
+    ('argument-list.4', (), 'optional-none'), # 9
+    ('argument-list', ('argument-list.4',), 'rule'), # 10
+    ('argument', ('type', 'IDENTIFIER'), 'rule'), # 11
+    ('type', ('IDENTIFIER',), 'rule'), # 12
+    ('statement', ('if-statement',), 'rule'), # 13
+    ('statement', ('let-statement',), 'rule'), # 14
+    ('statement', ('block-statement',), 'rule'), # 15
+    ('statement', ('while-statement',), 'rule'), # 16
+    ('statement', ('return-statement',), 'rule'), # 17
+    ('statement', ('assignment-statement',), 'rule'), # 18
+    ('block-statement.1', ('statement', 'block-statement.1'), 'repeat'), # 19
+    ('block-statement.1', (), 'repeat-end'), # 20
+    ('block-statement', ('{', 'block-statement.1', '}'), 'rule'), # 21
+    ('return-statement', ('return', 'expression', ';'), 'rule'), # 22
+    ('let-statement', ('let', 'type', 'IDENTIFIER', '=', 'expression', ';'), 'rule'), # 23
+    ('while-statement', ('while', '(', 'expression', ')', 'statement'), 'rule'), # 24
+    ('if-statement.1', ('else', 'statement'), 'group'), # 25
+    ('if-statement.2', ('if-statement.1',), 'optional'), # 26
+    ('if-statement.2', (), 'optional-none'), # 27
+    ('if-statement', ('if', '(', 'expression', ')', 'statement', 'if-statement.2'), 'rule'), # 28
+    ('assignment-statement.1', ('[', 'expression', ']'), 'group'), # 29
+    ('assignment-statement.2', ('assignment-statement.1',), 'optional'), # 30
+    ('assignment-statement.2', (), 'optional-none'), # 31
+    ('assignment-statement', ('IDENTIFIER', 'assignment-statement.2', '=', 'expression', ';'), 'rule'), # 32
+    ('expression.1', ('comparison-operator', 'expression2'), 'group'), # 33
+    ('expression.2', ('expression.1',), 'optional'), # 34
+    ('expression.2', (), 'optional-none'), # 35
+    ('expression', ('expression2', 'expression.2'), 'rule'), # 36
+    ('expression2.2', ('+',), 'group'), # 37
+    ('expression2.2', ('-',), 'group'), # 38
+    ('expression2.1', ('expression2.2', 'expression3'), 'group'), # 39
+    ('expression2.3', ('expression2.1', 'expression2.3'), 'repeat'), # 40
+    ('expression2.3', (), 'repeat-end'), # 41
+    ('expression2', ('expression3', 'expression2.3'), 'rule'), # 42
+    ('expression3.2', ('*',), 'group'), # 43
+    ('expression3.2', ('/',), 'group'), # 44
+    ('expression3.1', ('expression3.2', 'expression4'), 'group'), # 45
+    ('expression3.3', ('expression3.1', 'expression3.3'), 'repeat'), # 46
+    ('expression3.3', (), 'repeat-end'), # 47
+    ('expression3', ('expression4', 'expression3.3'), 'rule'), # 48
+    ('expression4', ('NUMBER',), 'rule'), # 49
+    ('expression4', ('IDENTIFIER',), 'rule'), # 50
+    ('expression4', ('(', 'expression', ')'), 'rule'), # 51
+    ('expression4', ('function-call',), 'rule'), # 52
+    ('comparison-operator', ('=', '='), 'rule'), # 53
+    ('comparison-operator', ('!', '='), 'rule'), # 54
+    ('comparison-operator.1', ('=',), 'optional'), # 55
+    ('comparison-operator.1', (), 'optional-none'), # 56
+    ('comparison-operator', ('<', 'comparison-operator.1'), 'rule'), # 57
+    ('comparison-operator.2', ('=',), 'optional'), # 58
+    ('comparison-operator.2', (), 'optional-none'), # 59
+    ('comparison-operator', ('>', 'comparison-operator.2'), 'rule'), # 60
+    ('function-call', ('@', 'IDENTIFIER', '(', 'call-argument-list', ')'), 'rule'), # 61
+    ('call-argument-list.2', (',', 'call-argument-list'), 'group'), # 62
+    ('call-argument-list.3', ('call-argument-list.2',), 'optional'), # 63
+    ('call-argument-list.3', (), 'optional-none'), # 64
+    ('call-argument-list.1', ('expression', 'call-argument-list.3'), 'group'), # 65
+    ('call-argument-list.4', ('call-argument-list.1',), 'optional'), # 66
+    ('call-argument-list.4', (), 'optional-none'), # 67
+    ('call-argument-list', ('call-argument-list.4',), 'rule'), # 68
+]
+
+firstSets = {
+    'program' : {'def'},
+    'program.1' : {'def'},
+    'function' : {'def'},
+    'argument-list' : {'IDENTIFIER'},
+    'argument-list.1' : {'IDENTIFIER'},
+    'argument-list.2' : {','},
+    'argument-list.3' : {','},
+    'argument-list.4' : {'IDENTIFIER'},
+    'argument' : {'IDENTIFIER'},
+    'type' : {'IDENTIFIER'},
+    'statement' : {'IDENTIFIER', 'if', 'let', 'return', 'while', '{'},
+    'block-statement' : {'{'},
+    'block-statement.1' : {'IDENTIFIER', 'if', 'let', 'return', 'while', '{'},
+    'return-statement' : {'return'},
+    'let-statement' : {'let'},
+    'while-statement' : {'while'},
+    'if-statement' : {'if'},
+    'if-statement.1' : {'else'},
+    'if-statement.2' : {'else'},
+    'assignment-statement' : {'IDENTIFIER'},
+    'assignment-statement.1' : {'['},
+    'assignment-statement.2' : {'['},
+    'expression' : {'(', '@', 'IDENTIFIER', 'NUMBER'},
+    'expression.1' : {'!', '<', '=', '>'},
+    'expression.2' : {'!', '<', '=', '>'},
+    'expression2' : {'(', '@', 'IDENTIFIER', 'NUMBER'},
+    'expression2.1' : {'+', '-'},
+    'expression2.2' : {'+', '-'},
+    'expression2.3' : {'+', '-'},
+    'expression3' : {'(', '@', 'IDENTIFIER', 'NUMBER'},
+    'expression3.1' : {'*', '/'},
+    'expression3.2' : {'*', '/'},
+    'expression3.3' : {'*', '/'},
+    'expression4' : {'(', '@', 'IDENTIFIER', 'NUMBER'},
+    'comparison-operator' : {'!', '<', '=', '>'},
+    'comparison-operator.1' : {'='},
+    'comparison-operator.2' : {'='},
+    'function-call' : {'@'},
+    'call-argument-list' : {'(', '@', 'IDENTIFIER', 'NUMBER'},
+    'call-argument-list.1' : {'(', '@', 'IDENTIFIER', 'NUMBER'},
+    'call-argument-list.2' : {','},
+    'call-argument-list.3' : {','},
+    'call-argument-list.4' : {'(', '@', 'IDENTIFIER', 'NUMBER'},
+}
+
+followSets = {
+    'program' : {'$'},
+    'program.1' : {'$'},
+    'function' : {'$', 'def'},
+    'argument-list' : {')'},
+    'argument-list.1' : {')'},
+    'argument-list.2' : {')'},
+    'argument-list.3' : {')'},
+    'argument-list.4' : {')'},
+    'argument' : {')', ','},
+    'type' : {'@', 'IDENTIFIER'},
+    'statement' : {'$', 'IDENTIFIER', 'def', 'else', 'if', 'let', 'return', 'while', '{', '}'},
+    'block-statement' : {'$', 'IDENTIFIER', 'def', 'else', 'if', 'let', 'return', 'while', '{', '}'},
+    'block-statement.1' : {'}'},
+    'return-statement' : {'$', 'IDENTIFIER', 'def', 'else', 'if', 'let', 'return', 'while', '{', '}'},
+    'let-statement' : {'$', 'IDENTIFIER', 'def', 'else', 'if', 'let', 'return', 'while', '{', '}'},
+    'while-statement' : {'$', 'IDENTIFIER', 'def', 'else', 'if', 'let', 'return', 'while', '{', '}'},
+    'if-statement' : {'$', 'IDENTIFIER', 'def', 'else', 'if', 'let', 'return', 'while', '{', '}'},
+    'if-statement.1' : {'$', 'IDENTIFIER', 'def', 'else', 'if', 'let', 'return', 'while', '{', '}'},
+    'if-statement.2' : {'$', 'IDENTIFIER', 'def', 'else', 'if', 'let', 'return', 'while', '{', '}'},
+    'assignment-statement' : {'$', 'IDENTIFIER', 'def', 'else', 'if', 'let', 'return', 'while', '{', '}'},
+    'assignment-statement.1' : {'='},
+    'assignment-statement.2' : {'='},
+    'expression' : {')', ',', ';', ']'},
+    'expression.1' : {')', ',', ';', ']'},
+    'expression.2' : {')', ',', ';', ']'},
+    'expression2' : {'!', ')', ',', ';', '<', '=', '>', ']'},
+    'expression2.1' : {'!', ')', '+', ',', '-', ';', '<', '=', '>', ']'},
+    'expression2.2' : {'(', '@', 'IDENTIFIER', 'NUMBER'},
+    'expression2.3' : {'!', ')', ',', ';', '<', '=', '>', ']'},
+    'expression3' : {'!', ')', '+', ',', '-', ';', '<', '=', '>', ']'},
+    'expression3.1' : {'!', ')', '*', '+', ',', '-', '/', ';', '<', '=', '>', ']'},
+    'expression3.2' : {'(', '@', 'IDENTIFIER', 'NUMBER'},
+    'expression3.3' : {'!', ')', '+', ',', '-', ';', '<', '=', '>', ']'},
+    'expression4' : {'!', ')', '*', '+', ',', '-', '/', ';', '<', '=', '>', ']'},
+    'comparison-operator' : {'(', '@', 'IDENTIFIER', 'NUMBER'},
+    'comparison-operator.1' : {'(', '@', 'IDENTIFIER', 'NUMBER'},
+    'comparison-operator.2' : {'(', '@', 'IDENTIFIER', 'NUMBER'},
+    'function-call' : {'!', ')', '*', '+', ',', '-', '/', ';', '<', '=', '>', ']'},
+    'call-argument-list' : {')'},
+    'call-argument-list.1' : {')'},
+    'call-argument-list.2' : {')'},
+    'call-argument-list.3' : {')'},
+    'call-argument-list.4' : {')'},
+}
+
+predictTable = {
+    'program' : {'$': 2, 'def': 2},
+    'program.1' : {'$': 1, 'def': 0},
+    'function' : {'def': 3},
+    'argument-list' : {')': 10, 'IDENTIFIER': 10},
+    'argument-list.1' : {'IDENTIFIER': 7},
+    'argument-list.2' : {',': 4},
+    'argument-list.3' : {')': 6, ',': 5},
+    'argument-list.4' : {')': 9, 'IDENTIFIER': 8},
+    'argument' : {'IDENTIFIER': 11},
+    'type' : {'IDENTIFIER': 12},
+    'statement' : {'IDENTIFIER': 18, 'if': 13, 'let': 14, 'return': 17, 'while': 16, '{': 15},
+    'block-statement' : {'{': 21},
+    'block-statement.1' : {'IDENTIFIER': 19, 'if': 19, 'let': 19, 'return': 19, 'while': 19, '{': 19, '}': 20},
+    'return-statement' : {'return': 22},
+    'let-statement' : {'let': 23},
+    'while-statement' : {'while': 24},
+    'if-statement' : {'if': 28},
+    'if-statement.1' : {'else': 25},
+    'if-statement.2' : {'$': 27, 'IDENTIFIER': 27, 'def': 27, 'else': 26, 'if': 27, 'let': 27, 'return': 27, 'while': 27, '{': 27, '}': 27},
+    'assignment-statement' : {'IDENTIFIER': 32},
+    'assignment-statement.1' : {'[': 29},
+    'assignment-statement.2' : {'=': 31, '[': 30},
+    'expression' : {'(': 36, '@': 36, 'IDENTIFIER': 36, 'NUMBER': 36},
+    'expression.1' : {'!': 33, '<': 33, '=': 33, '>': 33},
+    'expression.2' : {'!': 34, ')': 35, ',': 35, ';': 35, '<': 34, '=': 34, '>': 34, ']': 35},
+    'expression2' : {'(': 42, '@': 42, 'IDENTIFIER': 42, 'NUMBER': 42},
+    'expression2.1' : {'+': 39, '-': 39},
+    'expression2.2' : {'+': 37, '-': 38},
+    'expression2.3' : {'!': 41, ')': 41, '+': 40, ',': 41, '-': 40, ';': 41, '<': 41, '=': 41, '>': 41, ']': 41},
+    'expression3' : {'(': 48, '@': 48, 'IDENTIFIER': 48, 'NUMBER': 48},
+    'expression3.1' : {'*': 45, '/': 45},
+    'expression3.2' : {'*': 43, '/': 44},
+    'expression3.3' : {'!': 47, ')': 47, '*': 46, '+': 47, ',': 47, '-': 47, '/': 46, ';': 47, '<': 47, '=': 47, '>': 47, ']': 47},
+    'expression4' : {'(': 51, '@': 52, 'IDENTIFIER': 50, 'NUMBER': 49},
+    'comparison-operator' : {'!': 54, '<': 57, '=': 53, '>': 60},
+    'comparison-operator.1' : {'(': 56, '=': 55, '@': 56, 'IDENTIFIER': 56, 'NUMBER': 56},
+    'comparison-operator.2' : {'(': 59, '=': 58, '@': 59, 'IDENTIFIER': 59, 'NUMBER': 59},
+    'function-call' : {'@': 61},
+    'call-argument-list' : {'(': 68, ')': 68, '@': 68, 'IDENTIFIER': 68, 'NUMBER': 68},
+    'call-argument-list.1' : {'(': 65, '@': 65, 'IDENTIFIER': 65, 'NUMBER': 65},
+    'call-argument-list.2' : {',': 62},
+    'call-argument-list.3' : {')': 64, ',': 63},
+    'call-argument-list.4' : {'(': 66, ')': 67, '@': 66, 'IDENTIFIER': 66, 'NUMBER': 66},
+}
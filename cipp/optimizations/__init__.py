@@ -0,0 +1,9 @@
+from . copy_propagation import propagateCopies, propagateCopiesInSSA
+from . coalescing import coalesceMoves
+from . constant_propagation import propagateConstants, propagateConstantsInSSA
+from . dead_code import eliminateDeadCode, removeUnreachableCode, removeDeadInstructions
+from . value_numbering import numberValues, numberValuesInModule, numberValuesInSSA
+from . loop_invariant_code_motion import hoistLoopInvariants, hoistLoopInvariantsInSSA, insertPreheaders
+from . induction_variables import reduceStrength
+from . inlining import inlineFunctions
+from . tail_calls import eliminateTailCalls
@@ -0,0 +1,91 @@
+'''
+Move coalescing with the interference test of Chaitin.
+
+Two registers interfere when one of them is written while the other one
+is live. A move `t = s` does not make t and s interfere, because both
+have the same value afterwards. When the source and the target of a move
+do not interfere, they are merged into one register and the move is
+removed. Interference sets are bitsets over the registers of the liveness
+analysis; a merged register interferes with everything its parts did.
+'''
+
+from .. import ir
+from .. cfg import ControlFlowGraph
+from .. dataflow import Liveness
+
+def coalesceMoves(functionIR):
+    '''returns the number of removed moves'''
+    cfg = ControlFlowGraph.fromFunction(functionIR)
+    liveness = Liveness(cfg)
+    bitByVReg = liveness.vregs.bitByItem
+    interference = computeInterference(cfg, liveness)
+    members = [1 << bit for bit in range(len(bitByVReg))]
+    representatives = {}
+
+    def find(vreg):
+        while vreg in representatives:
+            vreg = representatives[vreg]
+        return vreg
+
+    arguments = set(cfg.function.arguments)
+    for instruction in cfg.iterInstructions():
+        if not isinstance(instruction, ir.MoveInstr):
+            continue
+        target = find(instruction.target)
+        source = find(instruction.source)
+        if target is source:
+            continue
+        if target in arguments:
+            target, source = source, target
+            if target in arguments:
+                continue
+        t = bitByVReg[target]
+        s = bitByVReg[source]
+        if interference[t] & members[s] or interference[s] & members[t]:
+            continue
+        # the target is merged into the source, arguments stay arguments
+        representatives[target] = source
+        interference[s] |= interference[t]
+        members[s] |= members[t]
+
+    if len(representatives) == 0:
+        return 0
+
+    removedAmount = 0
+    for block in cfg.blocks:
+        instructions = []
+        for instruction in block.instructions:
+            instruction.replaceInputVRegisters(find)
+            output = instruction.getOutputVRegister()
+            if output is not None:
+                instruction.setOutputVRegister(find(output))
+            if isinstance(instruction, ir.MoveInstr) and instruction.target is instruction.source:
+                removedAmount += 1
+                continue
+            instructions.append(instruction)
+        block.instructions = instructions
+    cfg.writeBack()
+    return removedAmount
+
+def computeInterference(cfg, liveness):
+    '''interference[bit] contains the registers that are live when the register is written'''
+    bitByVReg = liveness.vregs.bitByItem
+    interference = [0] * len(bitByVReg)
+    for block in cfg.blocks:
+        for instruction, live in liveness.iterLiveAfter(block):
+            output = instruction.getOutputVRegister()
+            if output is None:
+                continue
+            if isinstance(instruction, ir.MoveInstr):
+                live &= ~(1 << bitByVReg[instruction.source])
+            interference[bitByVReg[output]] |= live & ~(1 << bitByVReg[output])
+
+    # all arguments are written at the entry
+    argumentBits = 0
+    for vreg in cfg.function.arguments:
+        argumentBits |= 1 << bitByVReg[vreg]
+    entryLive = liveness.liveIn[cfg.entry.index] | argumentBits
+    for vreg in cfg.function.arguments:
+        bit = bitByVReg[vreg]
+        interference[bit] |= entryLive & ~(1 << bit)
+    return interference
@@ -0,0 +1,251 @@
+'''
+Sparse conditional constant propagation (Wegman and Zadeck) on SSA form.
+
+Every register starts as unknown and can only move down to a constant
+and then to overdefined. Blocks are only evaluated once an edge into
+them is known to be executable, so constants that decide branches also
+remove the code on the branch that is never taken.
+
+Afterwards registers with a constant value get an InitializeInstr,
+GotoIfZero instructions with a known condition become a jump or
+disappear, and blocks that are never reached are deleted.
+'''
+
+from .. import ir
+from .. cfg import ControlFlowGraph
+from .. ssa import toSSA, fromSSA
+
+class Overdefined:
+    def __repr__(self):
+        return "overdefined"
+
+overdefined = Overdefined()
+
+def propagateConstants(functionIR):
+    '''returns the number of folded instructions and of removed blocks'''
+    cfg = ControlFlowGraph.fromFunction(functionIR)
+    toSSA(cfg)
+    result = propagateConstantsInSSA(cfg)
+    fromSSA(cfg)
+    cfg.writeBack()
+    return result
+
+def propagateConstantsInSSA(cfg):
+    values, executableBlocks, executableEdges = solveConstants(cfg)
+    foldedAmount = foldConstants(cfg, values, executableEdges)
+    removedAmount = removeUnexecutedBlocks(cfg, executableBlocks, executableEdges)
+    return foldedAmount, removedAmount
+
+
+# Solving
+####################################################
+
+def solveConstants(cfg):
+    '''
+    values maps registers to an int or overdefined, registers
+    that are missing are unknown
+    '''
+    values = {vreg : overdefined for vreg in cfg.function.arguments}
+    users = {}
+    for block in cfg.blocks:
+        for instruction in block.instructions:
+            if isinstance(instruction, ir.PhiInstr):
+                inputs = [vreg for vreg in instruction.sources.values() if vreg is not None]
+            else:
+                inputs = instruction.getInputVRegisters()
+            for vreg in inputs:
+                users.setdefault(vreg, []).append((instruction, block))
+
+    executableBlocks = set()
+    executableEdges = set()
+    edgeWorklist = [(None, cfg.entry)]
+    instructionWorklist = []
+
+    def evaluate(instruction, block):
+        if isinstance(instruction, ir.PhiInstr):
+            value = evaluatePhi(instruction, block, values, executableEdges)
+        elif isinstance(instruction, terminatorTypes):
+            for successor in getExecutableSuccessors(block, instruction, values):
+                edgeWorklist.append((block, successor))
+            return
+        else:
+            value = evaluateInstruction(instruction, values)
+        target = instruction.getOutputVRegister()
+        if target is None or value is None:
+            return
+        oldValue = values.get(target)
+        if oldValue is not value and oldValue != value:
+            values[target] = value
+            instructionWorklist.extend(users.get(target, ()))
+
+    while edgeWorklist or instructionWorklist:
+        while edgeWorklist:
+            source, block = edgeWorklist.pop()
+            if (source, block) in executableEdges:
+                continue
+            executableEdges.add((source, block))
+            if block in executableBlocks:
+                # only the phis see the new edge
+                for instruction in block.instructions:
+                    if not isinstance(instruction, ir.PhiInstr):
+                        break
+                    evaluate(instruction, block)
+                continue
+            executableBlocks.add(block)
+            for instruction in block.instructions:
+                evaluate(instruction, block)
+            if block.terminator is None and block.fallthrough is not None:
+                edgeWorklist.append((block, block.fallthrough))
+
+        while instructionWorklist:
+            instruction, block = instructionWorklist.pop()
+            if block in executableBlocks:
+                evaluate(instruction, block)
+
+    return values, executableBlocks, executableEdges
+
+terminatorTypes = (ir.GotoInstr, ir.GotoIfZero, ir.ReturnInstr)
+
+def getExecutableSuccessors(block, terminator, values):
+    if isinstance(terminator, ir.GotoInstr):
+        return [block.successors[-1]]
+    elif isinstance(terminator, ir.GotoIfZero):
+        # a condition that is still unknown can only come from undefined registers
+        condition = values.get(terminator.vreg, overdefined)
+        if condition is overdefined:
+            return block.successors
+        elif condition == 0:
+            return [block.successors[-1]]
+        elif block.fallthrough is not None:
+            return [block.fallthrough]
+    return []
+
+def evaluatePhi(phi, block, values, executableEdges):
+    result = None
+    for predecessor, vreg in phi.sources.items():
+        if vreg is None or (predecessor, block) not in executableEdges:
+            continue
+        result = meet(result, values.get(vreg))
+    return result
+
+def meet(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a is overdefined or b is overdefined or a != b:
+        return overdefined
+    return a
+
+def evaluateInstruction(instruction, values):
+    '''None means that the value is not known yet'''
+    if isinstance(instruction, ir.InitializeInstr):
+        return instruction.value
+    elif isinstance(instruction, ir.MoveInstr):
+        return values.get(instruction.source)
+    elif isinstance(instruction, (ir.TwoOpInstr, ir.CompareInstr)):
+        a = values.get(instruction.a)
+        b = values.get(instruction.b)
+        if instruction.operation == "*" and (a == 0 or b == 0):
+            return 0
+        if a is overdefined or b is overdefined:
+            return overdefined
+        if a is None or b is None:
+            return None
+        return foldOperation(instruction.operation, a, b)
+    return overdefined
+
+def foldOperation(operation, a, b):
+    if operation == "+":
+        return wrapInt64(a + b)
+    elif operation == "-":
+        return wrapInt64(a - b)
+    elif operation == "*":
+        return wrapInt64(a * b)
+    elif operation == "==":
+        return int(a == b)
+    elif operation == "!=":
+        return int(a != b)
+    elif operation == "<":
+        return int(a < b)
+    elif operation == "<=":
+        return int(a <= b)
+    elif operation == ">":
+        return int(a > b)
+    elif operation == ">=":
+        return int(a >= b)
+    # the backend has no division yet, so it is not folded either
+    return overdefined
+
+def wrapInt64(value):
+    value &= 2**64 - 1
+    return value - 2**64 if value >= 2**63 else value
+
+
+# Rewriting
+####################################################
+
+def foldConstants(cfg, values, executableEdges):
+    foldedAmount = 0
+    for block in cfg.blocks:
+        phis = []
+        constants = []
+        instructions = []
+        for instruction in block.instructions:
+            target = instruction.getOutputVRegister()
+            value = values.get(target) if target is not None else None
+            if isinstance(instruction, ir.PhiInstr):
+                if isinstance(value, int):
+                    constants.append(ir.InitializeInstr(target, value))
+                    foldedAmount += 1
+                else:
+                    phis.append(instruction)
+            elif isinstance(instruction, ir.CallInstr):
+                instructions.append(instruction)
+            elif isinstance(value, int):
+                if not isinstance(instruction, ir.InitializeInstr):
+                    foldedAmount += 1
+                instructions.append(ir.InitializeInstr(target, value))
+            elif isinstance(instruction, ir.GotoIfZero):
+                condition = values.get(instruction.vreg, overdefined)
+                if condition is not overdefined:
+                    foldedAmount += 1
+                    if condition == 0:
+                        instructions.append(ir.GotoInstr(instruction.label))
+                else:
+                    instructions.append(instruction)
+            elif isinstance(instruction, ir.TwoOpInstr):
+                simplified = simplifyIdentity(instruction, values)
+                if simplified is not instruction:
+                    foldedAmount += 1
+                instructions.append(simplified)
+            else:
+                instructions.append(instruction)
+        block.instructions = phis + constants + instructions
+    return foldedAmount
+
+def simplifyIdentity(instruction, values):
+    '''x + 0, 0 + x, x - 0, x * 1 and 1 * x become moves'''
+    a = values.get(instruction.a)
+    b = values.get(instruction.b)
+    operation = instruction.operation
+    if b == 0 and operation in "+-" or b == 1 and operation == "*":
+        return ir.MoveInstr(instruction.target, instruction.a)
+    if a == 0 and operation == "+" or a == 1 and operation == "*":
+        return ir.MoveInstr(instruction.target, instruction.b)
+    return instruction
+
+def removeUnexecutedBlocks(cfg, executableBlocks, executableEdges):
+    blocks = [block for block in cfg.blocks if block in executableBlocks]
+    removedAmount = len(cfg.blocks) - len(blocks)
+    cfg.blocks = blocks
+    cfg.updateEdges()
+    for block in blocks:
+        predecessors = set(block.predecessors)
+        for instruction in block.instructions:
+            if not isinstance(instruction, ir.PhiInstr):
+                break
+            for predecessor in list(instruction.sources):
+                if predecessor not in predecessors:
+                    del instruction.sources[predecessor]
+    return removedAmount
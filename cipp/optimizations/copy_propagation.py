@@ -0,0 +1,95 @@
+'''
+Copy propagation on SSA form.
+
+In SSA form every register is written once, so after `t = s` all reads
+of t can read s instead and the move disappears. A phi whose sources
+are all the same register (or the phi itself) is a copy as well.
+
+Leaving SSA form inserts a copy for every phi on every incoming edge, so
+propagateCopies coalesces the moves afterwards. Otherwise the function
+would often end up with more moves than before.
+'''
+
+from .. import ir
+from .. cfg import ControlFlowGraph
+from .. ssa import toSSA, fromSSA
+from . coalescing import coalesceMoves
+
+def propagateCopies(functionIR):
+    '''returns by how many moves the function became shorter'''
+    movesBefore = countMoves(functionIR)
+    cfg = ControlFlowGraph.fromFunction(functionIR)
+    toSSA(cfg)
+    propagateCopiesInSSA(cfg)
+    fromSSA(cfg)
+    cfg.writeBack()
+    coalesceMoves(functionIR)
+    return movesBefore - countMoves(functionIR)
+
+def countMoves(functionIR):
+    return sum(1 for element in functionIR.block if isinstance(element, ir.MoveInstr))
+
+def propagateCopiesInSSA(cfg):
+    '''returns the number of removed moves and phis'''
+    replacements = {}
+
+    def resolve(vreg):
+        root = vreg
+        while root in replacements:
+            root = replacements[root]
+        while vreg in replacements and replacements[vreg] is not root:
+            replacements[vreg], vreg = root, replacements[vreg]
+        return root
+
+    for instruction in cfg.iterInstructions():
+        if isinstance(instruction, ir.MoveInstr):
+            replacements[instruction.target] = instruction.source
+
+    # a phi can only become trivial after its sources have been resolved
+    phis = [instruction for instruction in cfg.iterInstructions()
+            if isinstance(instruction, ir.PhiInstr)]
+    changed = True
+    while changed:
+        changed = False
+        for phi in phis:
+            if phi.target in replacements:
+                continue
+            source = getTrivialPhiSource(phi, resolve)
+            if source is not None:
+                replacements[phi.target] = source
+                changed = True
+
+    if len(replacements) == 0:
+        return 0
+
+    removedAmount = 0
+    for block in cfg.blocks:
+        instructions = []
+        for instruction in block.instructions:
+            output = instruction.getOutputVRegister()
+            if output is not None and output in replacements:
+                removedAmount += 1
+                continue
+            if isinstance(instruction, ir.PhiInstr):
+                for predecessor, vreg in instruction.sources.items():
+                    if vreg is not None:
+                        instruction.sources[predecessor] = resolve(vreg)
+            else:
+                instruction.replaceInputVRegisters(resolve)
+            instructions.append(instruction)
+        block.instructions = instructions
+    return removedAmount
+
+def getTrivialPhiSource(phi, resolve):
+    '''undefined sources are ignored, they can take any value'''
+    source = None
+    for vreg in phi.sources.values():
+        if vreg is None:
+            continue
+        vreg = resolve(vreg)
+        if vreg is phi.target or vreg is source:
+            continue
+        if source is not None:
+            return None
+        source = vreg
+    return source
@@ -0,0 +1,78 @@
+'''
+Removal of instructions whose results are never read and of code that
+can never run.
+
+An instruction is dead when its output is not live afterwards. Removing
+it can make its inputs dead too, which the backwards walk over a block
+sees immediately; across blocks the liveness is computed again until
+nothing changes. Calls are always kept, the callee might have effects.
+'''
+
+from .. import ir
+from .. cfg import ControlFlowGraph
+from .. dataflow import Liveness
+
+def eliminateDeadCode(functionIR):
+    '''returns the number of removed instructions'''
+    return removeUnreachableCode(functionIR) + removeDeadInstructions(functionIR)
+
+def removeUnreachableCode(functionIR):
+    '''
+    Removes blocks without a path from the entry, which includes code
+    after returns and gotos, and jumps to the directly following block.
+    '''
+    cfg = ControlFlowGraph.fromFunction(functionIR)
+    reachable = set(cfg.reversePostorder())
+    blocks = [block for block in cfg.blocks if block in reachable]
+    removedAmount = sum(len(block.instructions) for block in cfg.blocks if block not in reachable)
+
+    for i, block in enumerate(blocks):
+        terminator = block.terminator
+        if isinstance(terminator, (ir.GotoInstr, ir.GotoIfZero)):
+            nextBlock = blocks[i + 1] if i + 1 < len(blocks) else None
+            if nextBlock is not None and nextBlock.label is terminator.label:
+                block.instructions.pop()
+                removedAmount += 1
+
+    cfg.blocks = blocks
+    cfg.updateEdges()
+    cfg.writeBack()
+    return removedAmount
+
+def removeDeadInstructions(functionIR):
+    cfg = ControlFlowGraph.fromFunction(functionIR)
+    removedAmount = 0
+    while True:
+        liveness = Liveness(cfg)
+        amount = sum(removeDeadInstructionsInBlock(block, liveness) for block in cfg.blocks)
+        if amount == 0:
+            break
+        removedAmount += amount
+    cfg.writeBack()
+    return removedAmount
+
+def removeDeadInstructionsInBlock(block, liveness):
+    bitByVReg = liveness.vregs.bitByItem
+    live = liveness.liveOut[block.index]
+    kept = []
+    for instruction in reversed(block.instructions):
+        output = instruction.getOutputVRegister()
+        if isDead(instruction, output, live, bitByVReg):
+            continue
+        kept.append(instruction)
+        if output is not None:
+            live &= ~(1 << bitByVReg[output])
+        for vreg in instruction.getInputVRegisters():
+            live |= 1 << bitByVReg[vreg]
+
+    removedAmount = len(block.instructions) - len(kept)
+    kept.reverse()
+    block.instructions = kept
+    return removedAmount
+
+def isDead(instruction, output, live, bitByVReg):
+    if output is None or isinstance(instruction, (ir.CallInstr, ir.PhiInstr)):
+        return False
+    if isinstance(instruction, ir.MoveInstr) and instruction.source is instruction.target:
+        return True
+    return not live & (1 << bitByVReg[output])
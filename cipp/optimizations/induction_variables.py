@@ -0,0 +1,367 @@
+'''
+Induction variables and strength reduction on SSA form.
+
+A basic induction variable is a phi in a loop header that is increased
+by the same constant in every iteration. Registers in the loop are
+described as `scale * phi + offset` when that is possible; this also sees
+through the `0 + x` chains that ast_to_ir emits for sums.
+
+Multiplications of an induction variable by a constant or by a loop
+invariant register become new induction variables that are increased by
+an addition at the end of every iteration. When the original variable is
+only used by the exit test afterwards, the test is rewritten to compare
+the new variable against a constant bound, and the original variable is
+removed. This is only done when the start and the bound of the counter
+are constants and the new variable can not wrap around between them.
+'''
+
+from .. import ir
+from .. cfg import ControlFlowGraph, LoopNest
+from .. ssa import toSSA, fromSSA, getPhis, insertBeforeTerminator
+from . constant_propagation import wrapInt64
+from . loop_invariant_code_motion import insertPreheaders
+
+flippedComparisons = {"<" : ">", ">" : "<", "<=" : ">=", ">=" : "<=", "==" : "==", "!=" : "!="}
+
+def reduceStrength(functionIR):
+    '''returns the number of reduced multiplications and of rewritten exit tests'''
+    cfg = ControlFlowGraph.fromFunction(functionIR)
+    preheaders = insertPreheaders(cfg)
+    dominatorTree = toSSA(cfg)
+    loopNest = LoopNest(cfg, dominatorTree)
+    reducedAmount = rewrittenAmount = 0
+    for loop in reversed(loopNest.loops):
+        if loop.header in preheaders:
+            reducer = LoopStrengthReducer(cfg, loop, preheaders[loop.header])
+            reducedAmount += reducer.reduceMultiplications()
+            rewrittenAmount += reducer.rewriteExitTest()
+            reducer.removeUnusedInductionVariables()
+    fromSSA(cfg)
+    cfg.writeBack()
+    return reducedAmount, rewrittenAmount
+
+class InductionVariable:
+    def __init__(self, phi, initial, step):
+        self.phi = phi
+        self.initial = initial
+        self.step = step
+
+    def __repr__(self):
+        return f"<Induction variable {self.phi.target}: {self.initial}, step {self.step}>"
+
+class LoopStrengthReducer:
+    def __init__(self, cfg, loop, preheader):
+        self.cfg = cfg
+        self.loop = loop
+        self.header = loop.header
+        self.preheader = preheader
+        self.loopBlocks = set(loop.iterBlocks())
+        latches = [block for block in self.header.predecessors if block in self.loopBlocks]
+        self.latch = latches[0] if len(latches) == 1 else None
+
+        self.definitions = {}
+        self.constants = {}
+        for instruction in cfg.iterInstructions():
+            output = instruction.getOutputVRegister()
+            if output is not None:
+                self.definitions[output] = instruction
+            if isinstance(instruction, ir.InitializeInstr):
+                self.constants[instruction.vreg] = instruction.value
+
+        order = {block : i for i, block in enumerate(cfg.reversePostorder())}
+        self.orderedBlocks = sorted(self.loopBlocks, key = order.get)
+        # registers that are written in the loop, replaced instructions stay in their block
+        self.blockByVReg = {}
+        for block in self.orderedBlocks:
+            for instruction in block.instructions:
+                output = instruction.getOutputVRegister()
+                if output is not None:
+                    self.blockByVReg[output] = block
+        self.affine = computeAffineValues(self.header, self.orderedBlocks, self.constants)
+        self.inductionVariables = self.findInductionVariables()
+        self.derived = {}
+
+    def findInductionVariables(self):
+        '''maps phi targets to basic induction variables'''
+        inductionVariables = {}
+        if self.latch is None or self.preheader not in self.header.predecessors:
+            return inductionVariables
+        for phi in getPhis(self.header):
+            initial = phi.sources.get(self.preheader)
+            value = self.getAffine(phi.sources.get(self.latch))
+            if initial is None or value is None:
+                continue
+            base, scale, offset = value
+            if base is phi.target and scale == 1 and offset != 0:
+                inductionVariables[phi.target] = InductionVariable(phi, initial, offset)
+        return inductionVariables
+
+    def getAffine(self, vreg):
+        if vreg is None:
+            return None
+        value = self.affine.get(vreg)
+        if value is None and vreg in self.constants:
+            return (None, 0, self.constants[vreg])
+        return value
+
+    def isInvariant(self, vreg):
+        return vreg not in self.blockByVReg
+
+    def isInductionValue(self, vreg):
+        value = self.getAffine(vreg)
+        return value is not None and value[0] in self.inductionVariables
+
+
+    # Strength Reduction
+    ####################################################
+
+    def reduceMultiplications(self):
+        if len(self.inductionVariables) == 0:
+            return 0
+        reducedAmount = 0
+        for block in self.orderedBlocks:
+            # new phis are inserted into the header while iterating
+            for instruction in list(block.instructions):
+                if not isinstance(instruction, ir.TwoOpInstr) or instruction.operation != "*":
+                    continue
+                replacement = self.getReplacement(instruction)
+                if replacement is not None:
+                    move = ir.MoveInstr(instruction.target, replacement)
+                    block.instructions[block.instructions.index(instruction)] = move
+                    self.definitions[instruction.target] = move
+                    reducedAmount += 1
+        return reducedAmount
+
+    def getReplacement(self, instruction):
+        '''register that has the same value as the multiplication in every iteration'''
+        if self.isInductionValue(instruction.target):
+            base, scale, offset = self.getAffine(instruction.target)
+            if scale == 1 and offset == 0:
+                return base
+            return self.getDerivedVariable(base, scale, offset, None)
+
+        if self.isInductionValue(instruction.a) and self.isInductionValue(instruction.b):
+            # the product of two induction variables does not grow by a constant
+            return None
+        for a, b in ((instruction.a, instruction.b), (instruction.b, instruction.a)):
+            if self.isInductionValue(a) and self.isInvariant(b):
+                return self.getDerivedVariable(*self.getAffine(a), b)
+        return None
+
+    def getDerivedVariable(self, base, scale, offset, factor):
+        '''
+        Creates a phi with the value (scale * base + offset) * factor. The
+        factor is a loop invariant register or None.
+        '''
+        key = (base, scale, offset, factor)
+        if key in self.derived:
+            return self.derived[key]
+        inductionVariable = self.inductionVariables[base]
+        code = []
+        initial = inductionVariable.initial
+        if scale != 1:
+            initial = emitOperation(code, "*", emitConstant(code, scale), initial)
+        if offset != 0:
+            initial = emitOperation(code, "+", initial, emitConstant(code, offset))
+        step = emitConstant(code, wrapInt64(scale * inductionVariable.step))
+        if factor is not None:
+            initial = emitOperation(code, "*", initial, factor)
+            step = emitOperation(code, "*", step, factor)
+        insertBeforeTerminator(self.preheader, code)
+
+        target = ir.VirtualRegister()
+        nextValue = ir.VirtualRegister()
+        phi = ir.PhiInstr(target, {self.preheader : initial, self.latch : nextValue})
+        increment = ir.TwoOpInstr("+", nextValue, target, step)
+        self.header.instructions.insert(0, phi)
+        insertBeforeTerminator(self.latch, [increment])
+        self.definitions[target] = phi
+        self.definitions[nextValue] = increment
+        self.blockByVReg[target] = self.header
+        self.blockByVReg[nextValue] = self.latch
+
+        self.derived[key] = target
+        if factor is None:
+            self.affine[target] = (base, scale, offset)
+        return target
+
+
+    # Exit Test
+    ####################################################
+
+    def rewriteExitTest(self):
+        '''
+        Compares a derived variable instead of a basic induction variable
+        that is not needed for anything else. The bound is computed at
+        compile time, so that it is only used when no value of the derived
+        variable in the iteration range wraps around.
+        '''
+        terminator = self.header.terminator
+        if not isinstance(terminator, ir.GotoIfZero):
+            return 0
+        compare = self.definitions.get(terminator.vreg)
+        if not isinstance(compare, ir.CompareInstr) or compare not in self.header.instructions:
+            return 0
+
+        operation, a, b = compare.operation, compare.a, compare.b
+        if not self.isInductionValue(a):
+            operation, a, b = flippedComparisons[operation], b, a
+        value = self.getAffine(a)
+        if value is None or value[0] not in self.inductionVariables or value[1] != 1:
+            return 0
+        base, _, testOffset = value
+        inductionVariable = self.inductionVariables[base]
+        if inductionVariable.phi not in self.findUnusedCycle(base, self.getUsers(), {compare}):
+            return 0
+
+        candidates = [(key, target) for key, target in self.derived.items()
+                      if key[0] is base and key[3] is None]
+        if len(candidates) == 0:
+            return 0
+        (_, scale, offset, _), derived = candidates[0]
+
+        bound = self.getBoundWithoutWrapping(operation, inductionVariable, testOffset, b, scale, offset)
+        if bound is None:
+            return 0
+        if scale < 0:
+            operation = flippedComparisons[operation]
+        code = []
+        boundVReg = emitConstant(code, bound)
+        insertBeforeTerminator(self.preheader, code)
+
+        index = self.header.instructions.index(compare)
+        self.header.instructions[index] = ir.CompareInstr(operation, compare.target, derived, boundVReg)
+        return 1
+
+    def getBoundWithoutWrapping(self, operation, inductionVariable, testOffset, b, scale, offset):
+        '''
+        The test is `phi + testOffset <operation> b`. The start and the bound
+        have to be constants and the counter has to move towards the bound.
+        Then the phi stays between its start and one step behind the bound,
+        so checking these values is enough. Returns `scale * (b - testOffset) + offset` or None.
+        '''
+        start = self.constants.get(inductionVariable.initial)
+        bound = self.constants.get(b)
+        step = inductionVariable.step
+        if start is None or bound is None:
+            return None
+        if not ((operation in ("<", "<=") and step > 0) or (operation in (">", ">=") and step < 0)):
+            return None
+
+        def fits(value):
+            return wrapInt64(value) == value
+        def scaled(phiValue):
+            return scale * phiValue + offset
+        phiValues = (start, bound - testOffset, bound - testOffset + step)
+        if not all(fits(value) and fits(value + testOffset) and fits(scaled(value)) for value in phiValues):
+            return None
+        return scaled(bound - testOffset)
+
+
+    # Cleanup
+    ####################################################
+
+    def getUsers(self):
+        users = {}
+        for block in self.cfg.blocks:
+            for instruction in block.instructions:
+                for vreg in instruction.getInputVRegisters():
+                    users.setdefault(vreg, []).append(instruction)
+        return users
+
+    def findUnusedCycle(self, base, users, ignoredUsers = ()):
+        '''
+        Instructions in the loop that compute a value of the induction
+        variable and are only read by each other or by ignoredUsers.
+        '''
+        candidates = set()
+        for block in self.orderedBlocks:
+            for instruction in block.instructions:
+                output = instruction.getOutputVRegister()
+                value = self.affine.get(output) if output is not None else None
+                if value is not None and value[0] is base and not isinstance(instruction, ir.CallInstr):
+                    candidates.add(instruction)
+        changed = True
+        while changed:
+            changed = False
+            for instruction in list(candidates):
+                for user in users.get(instruction.getOutputVRegister(), ()):
+                    if user not in candidates and user not in ignoredUsers:
+                        candidates.remove(instruction)
+                        changed = True
+                        break
+        return candidates
+
+    def removeUnusedInductionVariables(self):
+        '''
+        Removes induction variables whose instructions only feed each
+        other. Liveness based dead code elimination can not see that,
+        the value is always read in the next iteration.
+        '''
+        users = self.getUsers()
+        for base, inductionVariable in self.inductionVariables.items():
+            candidates = self.findUnusedCycle(base, users)
+            if inductionVariable.phi not in candidates:
+                continue
+            for block in self.orderedBlocks:
+                block.instructions = [i for i in block.instructions if i not in candidates]
+
+def computeAffineValues(header, orderedBlocks, constants):
+    '''maps registers to (phi target, scale, offset)'''
+    affine = {phi.target : (phi.target, 1, 0) for phi in getPhis(header)}
+
+    def get(vreg):
+        value = affine.get(vreg)
+        if value is None and vreg in constants:
+            return (None, 0, constants[vreg])
+        return value
+
+    for block in orderedBlocks:
+        for instruction in block.instructions:
+            if isinstance(instruction, ir.PhiInstr):
+                continue
+            value = None
+            if isinstance(instruction, ir.InitializeInstr):
+                value = (None, 0, instruction.value)
+            elif isinstance(instruction, ir.MoveInstr):
+                value = get(instruction.source)
+            elif isinstance(instruction, ir.TwoOpInstr):
+                value = combineAffine(instruction.operation, get(instruction.a), get(instruction.b))
+            if value is not None:
+                affine[instruction.getOutputVRegister()] = value
+    return affine
+
+def combineAffine(operation, a, b):
+    if a is None or b is None:
+        return None
+    baseA, scaleA, offsetA = a
+    baseB, scaleB, offsetB = b
+    if operation in ("+", "-"):
+        if baseA is not None and baseB is not None and baseA is not baseB:
+            return None
+        sign = 1 if operation == "+" else -1
+        base = baseA if baseA is not None else baseB
+        scale = wrapInt64(scaleA + sign * scaleB)
+        offset = wrapInt64(offsetA + sign * offsetB)
+    elif operation == "*":
+        if baseA is None:
+            base, scale, offset = baseB, wrapInt64(offsetA * scaleB), wrapInt64(offsetA * offsetB)
+        elif baseB is None:
+            base, scale, offset = baseA, wrapInt64(scaleA * offsetB), wrapInt64(offsetA * offsetB)
+        else:
+            return None
+    else:
+        return None
+    if scale == 0:
+        return (None, 0, offset)
+    return (base, scale, offset)
+
+def emitConstant(code, value):
+    vreg = ir.VirtualRegister()
+    code.append(ir.InitializeInstr(vreg, value))
+    return vreg
+
+def emitOperation(code, operation, a, b):
+    vreg = ir.VirtualRegister()
+    code.append(ir.TwoOpInstr(operation, vreg, a, b))
+    return vreg
@@ -0,0 +1,149 @@
+'''
+Inlining of calls within a module.
+
+The callee's code block is cloned into the caller with new labels and
+registers. Arguments are copied into the new registers first, because
+functions may write to their arguments. Every return becomes a move into
+the call's target and a jump to a label behind the inlined code.
+
+A callee is inlined when it is small or when it has only one call site
+in the module. Functions that are part of a cycle in the call graph are
+never inlined. Callees are processed before their callers, so that small
+functions that became larger by inlining are measured with their new
+size.
+'''
+
+import copy
+from .. import ir
+
+def inlineFunctions(moduleIR, sizeThreshold = 20):
+    '''returns the number of inlined calls'''
+    functionByName = {function.name : function for function in moduleIR.functions}
+    calleesByName = {function.name : getCallees(function, functionByName)
+                     for function in moduleIR.functions}
+    recursiveNames = findRecursiveFunctions(calleesByName)
+    callSiteAmounts = countCallSites(moduleIR)
+
+    def shouldInline(call):
+        callee = functionByName.get(call.label)
+        if callee is None or callee.name in recursiveNames:
+            return False
+        return callSiteAmounts[callee.name] == 1 or getInlineCost(callee) <= sizeThreshold
+
+    inlinedAmount = 0
+    for name in iterCalleesFirst(calleesByName):
+        inlinedAmount += inlineCalls(functionByName[name], functionByName, shouldInline)
+    return inlinedAmount
+
+def inlineCalls(function, functionByName, shouldInline):
+    '''replaces the calls for which shouldInline returns True'''
+    elements = []
+    inlinedAmount = 0
+    for element in function.block:
+        if isinstance(element, ir.CallInstr) and shouldInline(element):
+            elements.extend(cloneCallee(function.block, element, functionByName[element.label]))
+            inlinedAmount += 1
+        else:
+            elements.append(element)
+    function.block.elements = elements
+    return inlinedAmount
+
+def cloneCallee(codeBlock, call, callee):
+    '''returns the elements that replace the call'''
+    vregMap = {}
+    def rename(vreg):
+        newVReg = vregMap.get(vreg)
+        if newVReg is None:
+            newVReg = vregMap[vreg] = ir.VirtualRegister()
+        return newVReg
+
+    labelMap = {}
+    def renameLabel(label):
+        newLabel = labelMap.get(label)
+        if newLabel is None:
+            newLabel = labelMap[label] = codeBlock.newLabel(f"{label.name}_inlined")
+        return newLabel
+
+    continuation = codeBlock.newLabel("after_call")
+    elements = [ir.MoveInstr(rename(argument), source)
+                for argument, source in zip(callee.arguments, call.arguments)]
+    calleeElements = callee.block.elements
+    for i, element in enumerate(calleeElements):
+        if isinstance(element, ir.Label):
+            elements.append(renameLabel(element))
+        elif isinstance(element, ir.ReturnInstr):
+            if element.vreg is not None and call.target is not None:
+                elements.append(ir.MoveInstr(call.target, rename(element.vreg)))
+            if i < len(calleeElements) - 1:
+                elements.append(ir.GotoInstr(continuation))
+        else:
+            instruction = copy.copy(element)
+            instruction.replaceInputVRegisters(rename)
+            output = instruction.getOutputVRegister()
+            if output is not None:
+                instruction.setOutputVRegister(rename(output))
+            if isinstance(instruction, (ir.GotoInstr, ir.GotoIfZero)):
+                instruction.label = renameLabel(instruction.label)
+            elements.append(instruction)
+    elements.append(continuation)
+    return elements
+
+def getInlineCost(function):
+    '''number of instructions that the inlined code adds, the call itself is saved'''
+    size = sum(1 for element in function.block if isinstance(element, ir.Instruction))
+    return size - len(function.arguments) - 1
+
+
+# Call Graph
+####################################################
+
+def getCallees(function, functionByName):
+    '''names of the functions in the module that are called, in call order'''
+    callees = []
+    for element in function.block:
+        if isinstance(element, ir.CallInstr) and element.label in functionByName:
+            if element.label not in callees:
+                callees.append(element.label)
+    return callees
+
+def countCallSites(moduleIR):
+    amounts = {function.name : 0 for function in moduleIR.functions}
+    for function in moduleIR.functions:
+        for element in function.block:
+            if isinstance(element, ir.CallInstr) and element.label in amounts:
+                amounts[element.label] += 1
+    return amounts
+
+def findRecursiveFunctions(calleesByName):
+    '''names of the functions that can reach themselves through calls'''
+    recursiveNames = set()
+    for name in calleesByName:
+        stack = list(calleesByName[name])
+        visited = set()
+        while stack:
+            callee = stack.pop()
+            if callee == name:
+                recursiveNames.add(name)
+                break
+            if callee not in visited:
+                visited.add(callee)
+                stack.extend(calleesByName[callee])
+    return recursiveNames
+
+def iterCalleesFirst(calleesByName):
+    '''postorder of the call graph'''
+    visited = set()
+    for root in calleesByName:
+        if root in visited:
+            continue
+        visited.add(root)
+        stack = [(root, iter(calleesByName[root]))]
+        while stack:
+            name, callees = stack[-1]
+            callee = next(callees, None)
+            if callee is None:
+                stack.pop()
+                yield name
+            elif callee not in visited:
+                visited.add(callee)
+                stack.append((callee, iter(calleesByName[callee])))
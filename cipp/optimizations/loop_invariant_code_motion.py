@@ -0,0 +1,104 @@
+'''
+Loop invariant code motion on SSA form.
+
+Every loop gets a preheader, a block that runs once before the loop is
+entered. Pure instructions whose inputs are all written outside of the
+loop are moved there; the instructions they feed can follow them. Inner
+loops are handled first, so that their preheaders are part of the outer
+loop and values can move out of several loops.
+
+In SSA form every register is written once, so a hoisted instruction
+cannot overwrite a value that is needed elsewhere. The hoisted
+operations can not fail, running them when the loop is left immediately
+is harmless.
+'''
+
+from .. import ir
+from .. cfg import ControlFlowGraph, BasicBlock, DominatorTree, LoopNest
+from .. ssa import toSSA, fromSSA, insertBeforeTerminator
+
+hoistableOperations = {"+", "-", "*", "==", "!=", "<", "<=", ">", ">="}
+
+def hoistLoopInvariants(functionIR):
+    '''returns the number of hoisted instructions'''
+    cfg = ControlFlowGraph.fromFunction(functionIR)
+    preheaders = insertPreheaders(cfg)
+    dominatorTree = toSSA(cfg)
+    loopNest = LoopNest(cfg, dominatorTree)
+    hoistedAmount = hoistLoopInvariantsInSSA(cfg, loopNest, preheaders)
+    fromSSA(cfg)
+    cfg.writeBack()
+    return hoistedAmount
+
+def insertPreheaders(cfg):
+    '''
+    Returns a dict that maps loop headers to their new preheader. Jumps
+    into the loop from outside are redirected to the preheader, the
+    preheader is placed directly in front of the header.
+    '''
+    dominatorTree = DominatorTree(cfg)
+    loopNest = LoopNest(cfg, dominatorTree)
+    preheaders = {}
+    for loop in loopNest.loops:
+        header = loop.header
+        previous = cfg.blocks[header.index - 1] if header.index > 0 else None
+        if header.label is None or (previous is not None and previous.fallthrough is header
+                                    and dominatorTree.dominates(header, previous)):
+            # the back edge does not jump, there is no place for a preheader
+            continue
+        preheader = BasicBlock(cfg.function.block.newLabel("preheader"))
+        for predecessor in header.predecessors:
+            if dominatorTree.dominates(header, predecessor):
+                continue
+            terminator = predecessor.terminator
+            if isinstance(terminator, (ir.GotoInstr, ir.GotoIfZero)) and terminator.label is header.label:
+                terminator.label = preheader.label
+        preheaders[header] = preheader
+
+    if len(preheaders) > 0:
+        blocks = []
+        for block in cfg.blocks:
+            if block in preheaders:
+                blocks.append(preheaders[block])
+            blocks.append(block)
+        cfg.blocks = blocks
+        cfg.updateEdges()
+    return preheaders
+
+def hoistLoopInvariantsInSSA(cfg, loopNest, preheaders):
+    order = {block : i for i, block in enumerate(cfg.reversePostorder())}
+    definingBlocks = {}
+    for block in cfg.blocks:
+        for instruction in block.instructions:
+            output = instruction.getOutputVRegister()
+            if output is not None:
+                definingBlocks[output] = block
+
+    hoistedAmount = 0
+    for loop in reversed(loopNest.loops):
+        preheader = preheaders.get(loop.header)
+        if preheader is None:
+            continue
+        loopBlocks = set(loop.iterBlocks())
+        hoisted = []
+        # dominators come first, so invariant inputs are found before their users
+        for block in sorted(loopBlocks, key = order.get):
+            kept = []
+            for instruction in block.instructions:
+                if isHoistable(instruction) and all(definingBlocks.get(vreg) not in loopBlocks
+                                                    for vreg in instruction.getInputVRegisters()):
+                    hoisted.append(instruction)
+                    definingBlocks[instruction.getOutputVRegister()] = preheader
+                else:
+                    kept.append(instruction)
+            block.instructions = kept
+        insertBeforeTerminator(preheader, hoisted)
+        hoistedAmount += len(hoisted)
+    return hoistedAmount
+
+def isHoistable(instruction):
+    if isinstance(instruction, (ir.InitializeInstr, ir.MoveInstr)):
+        return True
+    if isinstance(instruction, (ir.TwoOpInstr, ir.CompareInstr)):
+        return instruction.operation in hoistableOperations
+    return False
@@ -0,0 +1,41 @@
+'''
+Tail calls are calls whose result is returned directly.
+
+A function that tail calls itself does not need a new stack frame. The
+call is replaced by moves into the argument registers and a jump back to
+a label at the start of the function, which turns the recursion into a
+loop. Other tail calls are left in the IR, ir_to_x64 turns them into a
+jump after the stack frame has been cleared.
+'''
+
+from .. import ir
+from .. ssa import sequentializeCopies
+from .. ir_to_x64 import isTailCall
+
+def eliminateTailCalls(functionIR):
+    '''returns the number of replaced self calls'''
+    elements = functionIR.block.elements
+    entryLabel = None
+    newElements = []
+    replacedAmount = 0
+    skipNext = False
+    for i, element in enumerate(elements):
+        if skipNext:
+            skipNext = False
+            continue
+        if isTailCall(elements, i) and element.label == functionIR.name:
+            if entryLabel is None:
+                entryLabel = functionIR.block.newLabel("tail_call_entry")
+            # all arguments are computed before any of them is overwritten
+            copies = list(zip(functionIR.arguments, element.arguments))
+            newElements.extend(sequentializeCopies(copies))
+            newElements.append(ir.GotoInstr(entryLabel))
+            replacedAmount += 1
+            skipNext = True
+        else:
+            newElements.append(element)
+
+    if entryLabel is not None:
+        newElements.insert(0, entryLabel)
+    functionIR.block.elements = newElements
+    return replacedAmount
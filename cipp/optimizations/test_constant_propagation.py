@@ -0,0 +1,99 @@
+import unittest
+from .. import ir
+from .. fused_front_end import transformToIR
+from .. test_ssa import canExecute, runFirstFunction, branchCode
+from . import propagateConstants
+from . constant_propagation import foldOperation, wrapInt64
+
+from play_with_compiler import pow_code, fib_code
+
+def optimize(source):
+    module = transformToIR(source)
+    for function in module.functions:
+        propagateConstants(function)
+    return module
+
+def getReturnedConstants(function):
+    '''values of the InitializeInstrs that write a returned register'''
+    initialized = {element.vreg : element.value for element in function.block
+                   if isinstance(element, ir.InitializeInstr)}
+    return [initialized.get(element.vreg) for element in function.block
+            if isinstance(element, ir.ReturnInstr)]
+
+def countElements(function, elementType):
+    return sum(isinstance(element, elementType) for element in function.block)
+
+class TestConstantPropagation(unittest.TestCase):
+    def testArithmetic(self):
+        function = optimize("def int @f() { return 1 + 2 * 3 - (4 - 10); }").functions[0]
+        self.assertEqual(getReturnedConstants(function), [13])
+
+    def testFoldsBranches(self):
+        function = optimize('''
+            def int @f(int x) {
+                let int debug = 0;
+                if (debug == 1) {
+                    x = @log(x);
+                }
+                return x;
+            }''').functions[0]
+        self.assertEqual(countElements(function, ir.CallInstr), 0)
+        self.assertEqual(countElements(function, ir.GotoIfZero), 0)
+
+    def testConditionalConstant(self):
+        # x is only changed on a path that is never taken
+        function = optimize('''
+            def int @f(int n) {
+                let int x = 1;
+                while (n > 0) {
+                    if (x != 1) { x = 2; }
+                    n = n - 1;
+                }
+                return x;
+            }''').functions[0]
+        self.assertEqual(getReturnedConstants(function), [1])
+        self.assertEqual(countElements(function, ir.GotoIfZero), 1)
+
+    def testLoopInvariantConstant(self):
+        function = optimize('''
+            def int @f(int n) {
+                let int c = 5;
+                let int i = 0;
+                while (i < n) {
+                    let int k = c + 1;
+                    i = i + k;
+                }
+                return c * 2;
+            }''').functions[0]
+        self.assertEqual(getReturnedConstants(function), [10])
+
+    def testIdentities(self):
+        function = optimize("def int @f(int a) { return a * 1 + 0; }").functions[0]
+        self.assertEqual(countElements(function, ir.TwoOpInstr), 0)
+
+    def testWrapsAround(self):
+        self.assertEqual(wrapInt64(2**63), -2**63)
+        self.assertEqual(foldOperation("*", 2**62, 4), 0)
+        self.assertEqual(foldOperation("<=", 3, 3), 1)
+
+@unittest.skipUnless(canExecute, "needs Linux on x86-64")
+class TestExecution(unittest.TestCase):
+    def testExamples(self):
+        self.assertEqual(runFirstFunction(optimize(pow_code), 3, 4), 81)
+        self.assertEqual(runFirstFunction(optimize(fib_code), 12), 144)
+        for x in range(8):
+            self.assertEqual(runFirstFunction(optimize(branchCode), x),
+                             runFirstFunction(transformToIR(branchCode), x))
+
+    def testMultiplication(self):
+        code = '''
+            def int @f(int a) {
+                let int scale = 3 * 4;
+                if (scale > 10) { a = a * scale; }
+                return a * (2 - 5);
+            }'''
+        self.assertEqual(runFirstFunction(transformToIR(code), 7), -252)
+        self.assertEqual(runFirstFunction(optimize(code), 7), -252)
+
+if __name__ == '__main__':
+    unittest.main()
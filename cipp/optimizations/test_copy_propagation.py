@@ -0,0 +1,90 @@
+import unittest
+from .. import ir
+from .. fused_front_end import transformToIR
+from .. test_ssa import canExecute, runFirstFunction, branchCode
+from . import propagateCopies, coalesceMoves
+
+from play_with_compiler import pow_code, fib_code
+
+swapCode = '''
+    def int @f(int a, int b, int n) {
+        while (n > 0) {
+            let int t = a;
+            a = b;
+            b = t;
+            n = n - 1;
+        }
+        return a - b - b;
+    }
+'''
+
+def countMoves(module):
+    return sum(isinstance(element, ir.MoveInstr)
+               for function in module.functions for element in function.block)
+
+def optimize(source):
+    module = transformToIR(source)
+    for function in module.functions:
+        propagateCopies(function)
+        coalesceMoves(function)
+    return module
+
+class TestCopyPropagation(unittest.TestCase):
+    def testRemovesAssignmentMoves(self):
+        module = transformToIR(pow_code)
+        before = countMoves(module)
+        removedAmount = sum(propagateCopies(function) for function in module.functions)
+        self.assertGreater(removedAmount, 0)
+        self.assertEqual(countMoves(module), before - removedAmount)
+
+    def testNeverAddsMoves(self):
+        for source in (pow_code, fib_code, branchCode, swapCode):
+            module = transformToIR(source)
+            for function in module.functions:
+                self.assertGreaterEqual(propagateCopies(function), 0)
+
+    def testStraightLineHasNoMoves(self):
+        module = optimize('''
+            def int @f(int a) {
+                let int b = a;
+                let int c = b;
+                a = c + 1;
+                return a;
+            }''')
+        self.assertEqual(countMoves(module), 0)
+
+    def testCoalescingKeepsInterferingMoves(self):
+        module = transformToIR(swapCode)
+        function = module.functions[0]
+        propagateCopies(function)
+        coalesceMoves(function)
+        # a swap needs at least one extra copy
+        self.assertGreater(countMoves(module), 0)
+
+    def testArgumentsStay(self):
+        module = optimize(pow_code)
+        for function in module.functions:
+            used = function.getUsedVRegisters()
+            for argument in function.arguments:
+                self.assertIn(argument, used)
+
+@unittest.skipUnless(canExecute, "needs Linux on x86-64")
+class TestExecution(unittest.TestCase):
+    def testPow(self):
+        self.assertEqual(runFirstFunction(optimize(pow_code), 3, 4), 81)
+
+    def testFib(self):
+        self.assertEqual(runFirstFunction(optimize(fib_code), 12), 144)
+
+    def testBranches(self):
+        for x in range(8):
+            self.assertEqual(runFirstFunction(optimize(branchCode), x),
+                             runFirstFunction(transformToIR(branchCode), x))
+
+    def testSwap(self):
+        for n in range(4):
+            self.assertEqual(runFirstFunction(optimize(swapCode), 3, 5, n),
+                             runFirstFunction(transformToIR(swapCode), 3, 5, n))
+
+if __name__ == '__main__':
+    unittest.main()
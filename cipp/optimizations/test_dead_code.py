@@ -0,0 +1,100 @@
+import unittest
+from .. import ir
+from .. fused_front_end import transformToIR
+from .. test_ssa import canExecute, runFirstFunction, branchCode
+from . import eliminateDeadCode, removeUnreachableCode, removeDeadInstructions, propagateConstants
+
+from play_with_compiler import pow_code, fib_code
+
+def optimize(source):
+    module = transformToIR(source)
+    for function in module.functions:
+        eliminateDeadCode(function)
+    return module
+
+def getInstructions(function):
+    return [element for element in function.block if isinstance(element, ir.Instruction)]
+
+class TestDeadInstructions(unittest.TestCase):
+    def testUnusedLet(self):
+        function = optimize('''
+            def int @f(int a) {
+                let int unused = a + 4;
+                return a;
+            }''').functions[0]
+        self.assertEqual(len(getInstructions(function)), 1)
+
+    def testKeepsCalls(self):
+        function = optimize('''
+            def int @f(int a) {
+                let int unused = @g(a + 1);
+                return a;
+            }''').functions[0]
+        calls = [i for i in getInstructions(function) if isinstance(i, ir.CallInstr)]
+        self.assertEqual(len(calls), 1)
+        # the argument of the call is still computed
+        self.assertEqual(len(getInstructions(function)), 6)
+
+    def testValueOverwrittenInLoop(self):
+        code = '''
+            def int @f(int n) {
+                let int x = 0;
+                let int y = 7;
+                while (n > 0) {
+                    y = n + 1;
+                    x = n;
+                    n = n - 1;
+                }
+                return x;
+            }'''
+        function = optimize(code).functions[0]
+        values = [i.value for i in getInstructions(function) if isinstance(i, ir.InitializeInstr)]
+        self.assertNotIn(7, values)
+        # y = 7 and y = n + 1 together are six instructions
+        self.assertEqual(len(getInstructions(transformToIR(code).functions[0])) - 6,
+                         len(getInstructions(function)))
+
+    def testAfterConstantPropagation(self):
+        module = transformToIR("def int @f() { let int x = 2; return x * 3 + 1; }")
+        function = module.functions[0]
+        propagateConstants(function)
+        removeDeadInstructions(function)
+        self.assertEqual(len(getInstructions(function)), 2)
+
+class TestUnreachableCode(unittest.TestCase):
+    def testAfterReturn(self):
+        function = optimize('''
+            def int @f(int a) {
+                return a;
+                a = a + 1;
+                return a;
+            }''').functions[0]
+        self.assertEqual(len(getInstructions(function)), 1)
+
+    def testAfterGoto(self):
+        function = ir.Function("f")
+        a = function.addArgument()
+        target = function.block.newLabel("target")
+        function.block.add(ir.GotoInstr(target))
+        function.block.add(ir.InitializeInstr(a, 5))
+        function.block.add(target)
+        function.block.add(ir.ReturnInstr(a))
+        self.assertEqual(removeUnreachableCode(function), 2)
+        self.assertEqual([type(i) for i in getInstructions(function)], [ir.ReturnInstr])
+
+    def testKeepsLoops(self):
+        module = optimize(pow_code)
+        self.assertEqual(len(module.functions[1].block.elements),
+                         len(transformToIR(pow_code).functions[1].block.elements))
+
+@unittest.skipUnless(canExecute, "needs Linux on x86-64")
+class TestExecution(unittest.TestCase):
+    def testExamples(self):
+        self.assertEqual(runFirstFunction(optimize(pow_code), 3, 4), 81)
+        self.assertEqual(runFirstFunction(optimize(fib_code), 12), 144)
+        for x in range(8):
+            self.assertEqual(runFirstFunction(optimize(branchCode), x),
+                             runFirstFunction(transformToIR(branchCode), x))
+
+if __name__ == '__main__':
+    unittest.main()
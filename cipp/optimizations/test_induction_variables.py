@@ -0,0 +1,186 @@
+import unittest
+from .. import ir
+from .. cfg import ControlFlowGraph, LoopNest
+from .. ssa import toSSA
+from .. fused_front_end import transformToIR
+from .. test_ssa import canExecute, runFirstFunction, branchCode
+from . import reduceStrength, insertPreheaders
+from . induction_variables import LoopStrengthReducer, combineAffine
+
+from play_with_compiler import pow_code, fib_code
+
+sumCode = '''
+    def int @f(int n, int a) {
+        let int s = 0;
+        let int i = 0;
+        while (i < n) {
+            s = s + i * 8 + i * a;
+            i = i + 1;
+        }
+        return s;
+    }
+'''
+
+countDownCode = '''
+    def int @f(int n) {
+        let int s = 0;
+        let int i = n;
+        while (i > 0) {
+            s = s + i * 3;
+            i = i - 2;
+        }
+        return s;
+    }
+'''
+
+constantCountDownCode = '''
+    def int @f(int n) {
+        let int s = n;
+        let int i = 10;
+        while (i > 0) {
+            s = s + i * 3;
+            i = i - 2;
+        }
+        return s;
+    }
+'''
+
+largeBoundCode = '''
+    def int @f(int n) {
+        let int s = 0;
+        let int i = n - 3;
+        while (i < n) {
+            s = s + i * 4;
+            s = s + i;
+            i = i + 1;
+        }
+        return s;
+    }
+'''
+
+wrappingBoundCode = '''
+    def int @f(int n) {
+        let int s = n;
+        let int i = 0;
+        while (i < 4611686018427387904) {
+            s = s + i * 4;
+            i = i + 1000000000000000000;
+        }
+        return s;
+    }
+'''
+
+productCode = '''
+    def int @f(int n) {
+        let int s = 0;
+        let int i = 0;
+        while (i < n) {
+            s = s + (i * 2) * i;
+            i = i + 1;
+        }
+        return s;
+    }
+'''
+
+def optimize(source):
+    module = transformToIR(source)
+    for function in module.functions:
+        reduceStrength(function)
+    return module
+
+def createReducer(function):
+    cfg = ControlFlowGraph.fromFunction(function)
+    preheaders = insertPreheaders(cfg)
+    loop = LoopNest(cfg, toSSA(cfg)).loops[0]
+    return LoopStrengthReducer(cfg, loop, preheaders[loop.header])
+
+def getLoopInstructions(function):
+    instructions = []
+    inLoop = False
+    for element in function.block:
+        if isinstance(element, ir.Label):
+            inLoop = element.name.startswith("while_start")
+        elif inLoop:
+            instructions.append(element)
+    return instructions
+
+class TestAffineValues(unittest.TestCase):
+    def testCombine(self):
+        p = ir.VirtualRegister()
+        self.assertEqual(combineAffine("+", (p, 1, 0), (None, 0, 4)), (p, 1, 4))
+        self.assertEqual(combineAffine("-", (None, 0, 4), (p, 1, 0)), (p, -1, 4))
+        self.assertEqual(combineAffine("*", (p, 2, 1), (None, 0, 3)), (p, 6, 3))
+        self.assertEqual(combineAffine("-", (p, 1, 2), (p, 1, 0)), (None, 0, 2))
+        self.assertIsNone(combineAffine("*", (p, 1, 0), (p, 1, 0)))
+        self.assertIsNone(combineAffine("+", (p, 1, 0), (ir.VirtualRegister(), 1, 0)))
+
+    def testFindsCounterOfMul(self):
+        reducer = createReducer(transformToIR(pow_code).functions[1])
+        steps = [variable.step for variable in reducer.inductionVariables.values()]
+        self.assertEqual(steps, [-1])
+
+    def testAccumulatorIsNoInductionVariable(self):
+        reducer = createReducer(transformToIR(sumCode).functions[0])
+        self.assertEqual(len(reducer.inductionVariables), 1)
+
+class TestStrengthReduction(unittest.TestCase):
+    def testNoMultiplicationsInLoop(self):
+        function = optimize(sumCode).functions[0]
+        instructions = getLoopInstructions(function)
+        self.assertFalse(any(isinstance(i, ir.TwoOpInstr) and i.operation == "*" for i in instructions))
+
+    def testExitTestUsesDerivedVariable(self):
+        function = transformToIR(constantCountDownCode).functions[0]
+        self.assertEqual(reduceStrength(function), (2, 1))
+        # the original counter is gone, only s and 3 * i remain
+        instructions = getLoopInstructions(function)
+        subtractions = [i for i in instructions if isinstance(i, ir.TwoOpInstr) and i.operation == "-"]
+        self.assertEqual(subtractions, [])
+
+    def testExitTestNeedsConstantBound(self):
+        function = transformToIR(countDownCode).functions[0]
+        self.assertEqual(reduceStrength(function), (2, 0))
+
+    def testExitTestKeepsUsedCounter(self):
+        function = transformToIR(largeBoundCode).functions[0]
+        self.assertEqual(reduceStrength(function)[1], 0)
+
+    def testExitTestKeepsWrappingBound(self):
+        # 4 * 2**62 does not fit into 64 bits
+        function = transformToIR(wrappingBoundCode).functions[0]
+        self.assertEqual(reduceStrength(function), (2, 0))
+
+    def testIgnoresLoopsWithoutInductionVariables(self):
+        function = transformToIR(fib_code).functions[0]
+        self.assertEqual(reduceStrength(function), (0, 0))
+
+@unittest.skipUnless(canExecute, "needs Linux on x86-64")
+class TestExecution(unittest.TestCase):
+    def testSum(self):
+        for n in (-3, 0, 1, 5, 17):
+            self.assertEqual(runFirstFunction(optimize(sumCode), n, 3),
+                             runFirstFunction(transformToIR(sumCode), n, 3))
+
+    def testCountDown(self):
+        for n in (-1, 0, 1, 2, 9, 10):
+            self.assertEqual(runFirstFunction(optimize(countDownCode), n),
+                             runFirstFunction(transformToIR(countDownCode), n))
+
+    def testProductOfInductionVariables(self):
+        self.assertEqual(runFirstFunction(optimize(productCode), 4), 28)
+        self.assertEqual(runFirstFunction(optimize(productCode), 4, registerAllocation = True), 28)
+
+    def testLargeBound(self):
+        n = 2 ** 61
+        for registerAllocation in (False, True):
+            self.assertEqual(runFirstFunction(optimize(largeBoundCode), n, registerAllocation = registerAllocation),
+                             runFirstFunction(transformToIR(largeBoundCode), n, registerAllocation = registerAllocation))
+            self.assertEqual(runFirstFunction(optimize(constantCountDownCode), n,
+                registerAllocation = registerAllocation), n + 90)
+
+    def testExamples(self):
+        self.assertEqual(runFirstFunction(optimize(pow_code), 3, 4), 81)
+        self.assertEqual(runFirstFunction(optimize(fib_code), 12), 144)
+        for x in range(8):
+            self.assertEqual(runFirstFunction(optimize(branchCode), x),
+                             runFirstFunction(transformToIR(branchCode), x))
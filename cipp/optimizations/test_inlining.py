@@ -0,0 +1,98 @@
+import unittest
+from .. import ir
+from .. fused_front_end import transformToIR
+from .. test_ssa import canExecute, runFirstFunction
+from . import inlineFunctions
+from . inlining import findRecursiveFunctions, iterCalleesFirst
+
+from play_with_compiler import pow_code, fib_code
+
+helperCode = '''
+    def int @f(int a, int b) {
+        return @max(a, b) + @max(b, 3) + @abs(a - b);
+    }
+
+    def int @max(int a, int b) {
+        if (a > b) return a;
+        return b;
+    }
+
+    def int @abs(int x) {
+        if (x < 0) return 0 - x;
+        return x;
+    }
+'''
+
+mutualRecursionCode = '''
+    def int @even(int n) {
+        if (n == 0) return 1;
+        return @odd(n - 1);
+    }
+
+    def int @odd(int n) {
+        if (n == 0) return 0;
+        return @even(n - 1);
+    }
+
+    def int @f(int n) {
+        return @even(n);
+    }
+'''
+
+def countCalls(function):
+    return sum(1 for element in function.block if isinstance(element, ir.CallInstr))
+
+class TestCallGraph(unittest.TestCase):
+    def testRecursiveFunctions(self):
+        calleesByName = {"f" : ["even"], "even" : ["odd"], "odd" : ["even"], "g" : ["g"], "h" : []}
+        self.assertEqual(findRecursiveFunctions(calleesByName), {"even", "odd", "g"})
+
+    def testCalleesFirst(self):
+        order = list(iterCalleesFirst({"a" : ["b", "c"], "b" : ["c"], "c" : []}))
+        self.assertEqual(order, ["c", "b", "a"])
+
+class TestInlining(unittest.TestCase):
+    def testInlinesSmallFunctions(self):
+        module = transformToIR(helperCode)
+        self.assertEqual(inlineFunctions(module), 3)
+        self.assertEqual(countCalls(module.functions[0]), 0)
+
+    def testThreshold(self):
+        module = transformToIR(helperCode)
+        # @abs has a single call site, @max is called twice
+        self.assertEqual(inlineFunctions(module, sizeThreshold = 0), 1)
+        self.assertEqual(countCalls(module.functions[0]), 2)
+
+    def testRenamesLabelsAndRegisters(self):
+        module = transformToIR(helperCode)
+        inlineFunctions(module)
+        function = module.functions[0]
+        labelNames = [element.name for element in function.block if isinstance(element, ir.Label)]
+        self.assertEqual(len(labelNames), len(set(labelNames)))
+        calleeVRegs = module.functions[1].getUsedVRegisters()
+        self.assertEqual(function.getUsedVRegisters() & calleeVRegs, set())
+
+    def testRecursionGuard(self):
+        module = transformToIR(mutualRecursionCode)
+        self.assertEqual(inlineFunctions(module), 0)
+        module = transformToIR(fib_code)
+        self.assertEqual(inlineFunctions(module), 0)
+
+@unittest.skipUnless(canExecute, "needs Linux on x86-64")
+class TestExecution(unittest.TestCase):
+    def testHelpers(self):
+        module = transformToIR(helperCode)
+        inlineFunctions(module)
+        for a, b in ((1, 2), (5, -3), (-4, -4), (0, 9)):
+            self.assertEqual(runFirstFunction(module, a, b),
+                             runFirstFunction(transformToIR(helperCode), a, b))
+
+    def testPow(self):
+        module = transformToIR(pow_code)
+        self.assertEqual(inlineFunctions(module), 1)
+        self.assertEqual(runFirstFunction(module, 3, 4), 81)
+
+    def testMutualRecursion(self):
+        module = transformToIR(mutualRecursionCode)
+        inlineFunctions(module)
+        self.assertEqual(runFirstFunction(module, 7), 0)
@@ -0,0 +1,101 @@
+import unittest
+from .. import ir
+from .. cfg import ControlFlowGraph
+from .. fused_front_end import transformToIR
+from .. test_ssa import canExecute, runFirstFunction, branchCode
+from . import hoistLoopInvariants, insertPreheaders, eliminateTailCalls
+
+from play_with_compiler import pow_code, fib_code
+
+nestedCode = '''
+    def int @f(int n, int a, int b) {
+        let int s = 0;
+        let int i = 0;
+        while (i < n) {
+            let int j = 0;
+            while (j < n) {
+                s = s + (a * b - a);
+                j = j + 1;
+            }
+            s = s - i * b;
+            i = i + 1;
+        }
+        return s;
+    }
+'''
+
+selfRecursionCode = '''
+    def int @sum(int n, int acc) {
+        if (n == 0) return acc;
+        return @sum(n - 1, acc + n);
+    }
+'''
+
+def optimize(source):
+    module = transformToIR(source)
+    for function in module.functions:
+        hoistLoopInvariants(function)
+    return module
+
+def getInstructionsBeforeLabel(function, prefix):
+    instructions = []
+    for element in function.block:
+        if isinstance(element, ir.Label) and element.name.startswith(prefix):
+            return instructions
+        if isinstance(element, ir.Instruction):
+            instructions.append(element)
+    raise Exception(f"no label {prefix}")
+
+class TestPreheaders(unittest.TestCase):
+    def testEveryLoopGetsOne(self):
+        cfg = ControlFlowGraph.fromFunction(transformToIR(nestedCode).functions[0])
+        preheaders = insertPreheaders(cfg)
+        self.assertEqual(len(preheaders), 2)
+        for header, preheader in preheaders.items():
+            self.assertEqual(header.predecessors[0], preheader)
+            self.assertEqual(preheader.successors, [header])
+
+    def testHeaderIsFirstBlock(self):
+        function = transformToIR(selfRecursionCode).functions[0]
+        eliminateTailCalls(function)
+        cfg = ControlFlowGraph.fromFunction(function)
+        self.assertEqual(len(insertPreheaders(cfg)), 1)
+        cfg.writeBack()
+        self.assertTrue(function.block.elements[0].name.startswith("preheader"))
+
+class TestLoopInvariantCodeMotion(unittest.TestCase):
+    def testHoistsOutOfBothLoops(self):
+        function = optimize(nestedCode).functions[0]
+        before = getInstructionsBeforeLabel(function, "while_start")
+        multiplications = [i for i in before if isinstance(i, ir.TwoOpInstr) and i.operation == "*"]
+        # 1 * a * b leaves both loops, 1 * i * b stays in the outer loop
+        self.assertEqual(len(multiplications), 2)
+        self.assertEqual(multiplications[0].b, function.arguments[1])
+        self.assertEqual(multiplications[1].b, function.arguments[2])
+
+    def testKeepsVariantInstructions(self):
+        function = optimize(pow_code).functions[1]
+        before = getInstructionsBeforeLabel(function, "while_start")
+        self.assertFalse(any(isinstance(i, ir.TwoOpInstr) and i.operation == "-" for i in before))
+
+    def testDoesNotHoistCalls(self):
+        function = optimize(pow_code).functions[0]
+        before = getInstructionsBeforeLabel(function, "while_start")
+        self.assertFalse(any(isinstance(i, ir.CallInstr) for i in before))
+
+@unittest.skipUnless(canExecute, "needs Linux on x86-64")
+class TestExecution(unittest.TestCase):
+    def testExamples(self):
+        self.assertEqual(runFirstFunction(optimize(pow_code), 3, 4), 81)
+        self.assertEqual(runFirstFunction(optimize(fib_code), 12), 144)
+        for x in range(8):
+            self.assertEqual(runFirstFunction(optimize(branchCode), x),
+                             runFirstFunction(transformToIR(branchCode), x))
+
+    def testNestedLoops(self):
+        for n in range(4):
+            self.assertEqual(runFirstFunction(optimize(nestedCode), n, 3, 5),
+                             runFirstFunction(transformToIR(nestedCode), n, 3, 5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from .. import ir
+from .. fused_front_end import transformToIR
+from .. ir_to_x64 import isTailCall
+from .. test_ssa import canExecute, runFirstFunction
+from . import eliminateTailCalls
+
+from play_with_compiler import fib_code
+
+sumCode = '''
+    def int @sum(int n, int acc) {
+        if (n == 0) return acc;
+        return @sum(n - 1, acc + n);
+    }
+'''
+
+swapCode = '''
+    def int @f(int a, int b, int n) {
+        if (n == 0) return a - b;
+        return @f(b, a, n - 1);
+    }
+'''
+
+mutualRecursionCode = '''
+    def int @even(int n) {
+        if (n == 0) return 1;
+        return @odd(n - 1);
+    }
+
+    def int @odd(int n) {
+        if (n == 0) return 0;
+        return @even(n - 1);
+    }
+'''
+
+def optimize(source):
+    module = transformToIR(source)
+    for function in module.functions:
+        eliminateTailCalls(function)
+    return module
+
+class TestTailCalls(unittest.TestCase):
+    def testDetection(self):
+        elements = transformToIR(sumCode).functions[0].block.elements
+        self.assertEqual([i for i in range(len(elements)) if isTailCall(elements, i)], [len(elements) - 2])
+
+    def testFibHasNoTailCalls(self):
+        function = transformToIR(fib_code).functions[0]
+        self.assertEqual(eliminateTailCalls(function), 0)
+
+    def testSelfCallBecomesJump(self):
+        function = optimize(sumCode).functions[0]
+        elements = function.block.elements
+        self.assertIsInstance(elements[0], ir.Label)
+        self.assertFalse(any(isinstance(element, ir.CallInstr) for element in elements))
+        self.assertEqual(elements[-1].label, elements[0])
+
+    def testOtherCallsStay(self):
+        module = optimize(mutualRecursionCode)
+        for function in module.functions:
+            self.assertEqual(sum(1 for e in function.block if isinstance(e, ir.CallInstr)), 1)
+
+@unittest.skipUnless(canExecute, "needs Linux on x86-64")
+class TestExecution(unittest.TestCase):
+    def testSum(self):
+        for registerAllocation in (False, True):
+            self.assertEqual(runFirstFunction(optimize(sumCode), 10, 0,
+                registerAllocation = registerAllocation, tailCalls = True), 55)
+
+    def testArgumentsAreSwappedAtOnce(self):
+        for n in range(4):
+            self.assertEqual(runFirstFunction(optimize(swapCode), 7, 2, n, tailCalls = True),
+                             runFirstFunction(transformToIR(swapCode), 7, 2, n))
+
+    def testDeepSelfRecursion(self):
+        n = 1000000
+        self.assertEqual(runFirstFunction(optimize(sumCode), n, 0, tailCalls = True), n * (n + 1) // 2)
+
+    def testDeepMutualRecursion(self):
+        for registerAllocation in (False, True):
+            module = transformToIR(mutualRecursionCode)
+            self.assertEqual(runFirstFunction(module, 1000001,
+                registerAllocation = registerAllocation, tailCalls = True), 0)
+            self.assertEqual(runFirstFunction(module, 1000000,
+                registerAllocation = registerAllocation, tailCalls = True), 1)
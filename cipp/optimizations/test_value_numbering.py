@@ -0,0 +1,83 @@
+import unittest
+from .. import ir
+from .. fused_front_end import transformToIR
+from .. test_ssa import canExecute, runFirstFunction, branchCode
+from . import numberValues, numberValuesInModule
+from . value_numbering import getValueKey
+
+from play_with_compiler import pow_code, fib_code
+
+def optimize(source):
+    module = transformToIR(source)
+    numberValuesInModule(module)
+    return module
+
+def countElements(function, elementType):
+    return sum(isinstance(element, elementType) for element in function.block)
+
+class TestValueNumbering(unittest.TestCase):
+    def testFib(self):
+        module = transformToIR(fib_code)
+        function = module.functions[0]
+        before = countElements(function, ir.TwoOpInstr)
+        self.assertGreater(numberValuesInModule(module)["fib"], 0)
+        # n - 1 and n - 2 both start with 0 + n
+        self.assertEqual(countElements(function, ir.TwoOpInstr), before - 1)
+
+    def testMovesAreNotCounted(self):
+        function = transformToIR('''
+            def int @f(int a, int b) {
+                let int c = a;
+                a = b;
+                b = c;
+                return a - b;
+            }''').functions[0]
+        self.assertEqual(numberValues(function), 0)
+        self.assertEqual(countElements(function, ir.MoveInstr), 0)
+
+    def testRepeatedExpressions(self):
+        function = optimize('''
+            def int @f(int a, int b) {
+                let int x = a + b;
+                let int y = a + b;
+                let int c = a < b;
+                let int d = b > a;
+                return @g(x, y, c, d);
+            }''').functions[0]
+        call = next(e for e in function.block if isinstance(e, ir.CallInstr))
+        x, y, c, d = call.arguments
+        self.assertIs(x, y)
+        self.assertIs(c, d)
+
+    def testOnlyDominatingValues(self):
+        function = optimize('''
+            def int @f(int a, int b) {
+                if (a > 0) {
+                    b = a - b;
+                } else {
+                    b = b - a;
+                }
+                return a - b;
+            }''').functions[0]
+        self.assertEqual(countElements(function, ir.TwoOpInstr), 3 * 2)
+
+    def testKeys(self):
+        a, b, t = ir.VirtualRegister(), ir.VirtualRegister(), ir.VirtualRegister()
+        self.assertEqual(getValueKey(ir.TwoOpInstr("-", t, a, b)), ("-", a, b))
+        self.assertNotEqual(getValueKey(ir.TwoOpInstr("-", t, b, a)), ("-", a, b))
+        self.assertEqual(getValueKey(ir.TwoOpInstr("*", t, a, b)), getValueKey(ir.TwoOpInstr("*", t, b, a)))
+        self.assertEqual(getValueKey(ir.CompareInstr("<=", t, a, b)), getValueKey(ir.CompareInstr(">=", t, b, a)))
+        self.assertEqual(getValueKey(ir.InitializeInstr(t, 3)), ("init", 3))
+        self.assertIsNone(getValueKey(ir.CallInstr("g", t, [a])))
+
+@unittest.skipUnless(canExecute, "needs Linux on x86-64")
+class TestExecution(unittest.TestCase):
+    def testExamples(self):
+        self.assertEqual(runFirstFunction(optimize(pow_code), 3, 4), 81)
+        self.assertEqual(runFirstFunction(optimize(fib_code), 12), 144)
+        for x in range(8):
+            self.assertEqual(runFirstFunction(optimize(branchCode), x),
+                             runFirstFunction(transformToIR(branchCode), x))
+
+if __name__ == '__main__':
+    unittest.main()
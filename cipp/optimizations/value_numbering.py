@@ -0,0 +1,95 @@
+'''
+Dominator based value numbering on SSA form.
+
+The dominator tree is walked in preorder with a scoped table of the
+computations that are available: everything in a dominating block has
+been executed on every path to the current block. When an instruction
+computes something that is in the table already, its register is
+replaced by the earlier one and the instruction is removed. Moves are
+folded into their source on the way, they are not counted as redundant
+computations.
+
+Keys are ("init", value) for InitializeInstrs and (operation, a, b) for
+TwoOpInstrs and CompareInstrs, with the operands of commutative
+operations in a fixed order.
+'''
+
+from .. import ir
+from .. cfg import ControlFlowGraph
+from .. ssa import toSSA, fromSSA
+
+commutativeOperations = {"+", "*", "==", "!="}
+swappedComparisons = {"<" : ">", ">" : "<", "<=" : ">=", ">=" : "<="}
+
+def numberValues(functionIR):
+    '''returns the number of removed redundant computations'''
+    cfg = ControlFlowGraph.fromFunction(functionIR)
+    dominatorTree = toSSA(cfg)
+    removedAmount = numberValuesInSSA(cfg, dominatorTree)
+    fromSSA(cfg)
+    cfg.writeBack()
+    return removedAmount
+
+def numberValuesInModule(moduleIR):
+    '''returns a dict with the number of removed redundant computations per function'''
+    return {function.name : numberValues(function) for function in moduleIR.functions}
+
+def numberValuesInSSA(cfg, dominatorTree):
+    replacements = {}
+    def resolve(vreg):
+        return replacements.get(vreg, vreg)
+
+    available = {}
+    removedAmount = 0
+    work = [(cfg.entry, None)]
+    while work:
+        block, addedKeys = work.pop()
+        if addedKeys is not None:
+            for key in addedKeys:
+                del available[key]
+            continue
+
+        addedKeys = []
+        instructions = []
+        for instruction in block.instructions:
+            if not isinstance(instruction, ir.PhiInstr):
+                instruction.replaceInputVRegisters(resolve)
+            if isinstance(instruction, ir.MoveInstr):
+                replacements[instruction.target] = instruction.source
+                continue
+            key = getValueKey(instruction)
+            if key is not None:
+                existing = available.get(key)
+                if existing is not None:
+                    replacements[instruction.getOutputVRegister()] = existing
+                    removedAmount += 1
+                    continue
+                available[key] = instruction.getOutputVRegister()
+                addedKeys.append(key)
+            instructions.append(instruction)
+        block.instructions = instructions
+
+        work.append((block, addedKeys))
+        for child in reversed(dominatorTree.getChildren(block)):
+            work.append((child, None))
+
+    # phis can read registers of blocks that are visited later
+    for instruction in cfg.iterInstructions():
+        if isinstance(instruction, ir.PhiInstr):
+            for predecessor, vreg in instruction.sources.items():
+                if vreg is not None:
+                    instruction.sources[predecessor] = resolve(vreg)
+    return removedAmount
+
+def getValueKey(instruction):
+    if isinstance(instruction, ir.InitializeInstr):
+        return ("init", instruction.value)
+    elif isinstance(instruction, (ir.TwoOpInstr, ir.CompareInstr)):
+        operation = instruction.operation
+        a, b = instruction.a, instruction.b
+        if operation in commutativeOperations or operation in swappedComparisons:
+            if a.name > b.name:
+                a, b = b, a
+                operation = swappedComparisons.get(operation, operation)
+        return (operation, a, b)
+    return None
@@ -0,0 +1,121 @@
+'''
+Functions are syntactically independent, so a module can be split at
+its top level 'def' keywords and the parts can be parsed in parallel.
+The order of the functions in the result is the order in the source,
+independent of the amount of workers.
+'''
+
+import gc
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from . import ir
+from . import ast
+from . parser import parse, stringToTokenStream
+from . fused_front_end import transformTokensToIR
+
+def parseParallel(source, workerAmount = None):
+    functions = runInWorkers(parseFunctions, source, workerAmount)
+    return ast.Program(functions)
+
+def transformToIRParallel(source, workerAmount = None):
+    workerAmount = workerAmount or os.cpu_count() or 1
+    functions = runInWorkers(parseFunctionsToIR, source, workerAmount)
+    if workerAmount > 1:
+        for functionIR in functions:
+            renameLabelsAndVRegisters(functionIR)
+    return ir.Module(functions)
+
+def runInWorkers(work, source, workerAmount):
+    workerAmount = workerAmount or os.cpu_count() or 1
+    if workerAmount == 1:
+        return work(source)
+
+    batches = splitIntoBatches(source, workerAmount * 4)
+
+    with ProcessPoolExecutor(workerAmount, initializer = disableGarbageCollection) as executor:
+        functionsPerBatch = executor.map(work, batches)
+        return [function for functions in functionsPerBatch for function in functions]
+
+def disableGarbageCollection():
+    # Parsing creates many objects that live until the batch is done, which
+    # triggers the garbage collector again and again. Workers exit afterwards.
+    gc.disable()
+
+def parseFunctions(source):
+    return parse(source).functions
+
+def parseFunctionsToIR(source):
+    return transformTokensToIR(stringToTokenStream(source)).functions
+
+
+# Splitting
+####################################################
+
+scanPattern = re.compile(r"#[^\n]*|[{}();]|\bdef\b|[^\s{}();#]+")
+
+def findFunctionStarts(source):
+    '''
+    Positions of the 'def' keywords that begin a top level item. Such a
+    'def' is the first token or follows a '}' or ';' outside of braces and
+    parentheses, so parameters and functions that are named 'def' are skipped.
+    '''
+    starts = []
+    depth = 0
+    atItemStart = True
+    for match in scanPattern.finditer(source):
+        text = match.group()
+        if text[0] == "#":
+            continue
+        if text == "{" or text == "(":
+            depth += 1
+            atItemStart = False
+        elif text == "}" or text == ")":
+            depth -= 1
+            atItemStart = depth == 0 and text == "}"
+        elif text == ";":
+            atItemStart = depth == 0
+        else:
+            if text == "def" and atItemStart:
+                starts.append(match.start())
+            atItemStart = False
+    return starts
+
+def splitIntoBatches(source, batchAmount):
+    '''
+    Every batch contains consecutive functions. Text in front of
+    the first function stays in the first batch.
+    '''
+    starts = findFunctionStarts(source)
+    if len(starts) == 0:
+        return [source]
+
+    functionsPerBatch = max(1, -(-len(starts) // batchAmount))
+    splitPositions = [0] + starts[functionsPerBatch::functionsPerBatch] + [len(source)]
+    return [source[start:end] for start, end in zip(splitPositions, splitPositions[1:])]
+
+
+# Merging
+####################################################
+
+def renameLabelsAndVRegisters(functionIR):
+    '''
+    Workers create names with their own counters, so they are
+    replaced with names that are unique in this process.
+    '''
+    renamedVRegisters = set()
+    def rename(vreg):
+        if vreg is not None and vreg not in renamedVRegisters:
+            vreg._name = ir.VirtualRegister.newUniqueName()
+            renamedVRegisters.add(vreg)
+
+    for vreg in functionIR.arguments:
+        rename(vreg)
+    for element in functionIR.block:
+        if isinstance(element, ir.Label):
+            prefix = element.name.rstrip("0123456789")
+            element.name = functionIR.block.newLabel(prefix).name
+        else:
+            for vreg in element.getVRegisters():
+                rename(vreg)
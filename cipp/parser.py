@@ -1,6 +1,9 @@
+import os
+import mmap
 from . import ast
 from . lexer import Lexer
-from . token_stream import TokenStream
+from . table_lexer import TableLexer
+from . token_stream import TokenStream, TokenTableStream, StreamingTokenStream
 
 from . tokens import (
     createSingleCharToken,
@@ -14,28 +17,60 @@ cippLexer = Lexer(
      SingleCharToken, WhitespaceToken], 
     ignoredTokens = [WhitespaceToken, CommentToken]
 )
+cippTableLexer = TableLexer(cippLexer)
 
-def parse(string):
+def parse(string, shareExpressions = False):
     tokens = stringToTokenStream(string)
-    return parseProgram(tokens)
+    interner = ExpressionInterner() if shareExpressions else None
+    return parseProgram(tokens, interner)
 
-def stringToTokenStream(string):
-    return TokenStream(cippLexer.tokenize(string))
+def parseFile(path):
+    '''
+    The file is memory mapped and lexed as ASCII bytes. Only the
+    values of tokens the parser asks for are decoded.
+    '''
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return parseProgram(bytesToTokenStream(b""))
+        with mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as data:
+            return parseProgram(bytesToTokenStream(data))
+
+def bytesToTokenStream(data):
+    return TokenTableStream(cippTableLexer.tokenizeToTable(data))
+
+def stringToTokenStream(string, mode = "precompiled"):
+    '''
+    The "reference" mode uses the char by char state machine of
+    the token types. It is slower but easier to debug.
+    The "streaming" mode only lexes the tokens the parser looks at.
+    '''
+    if mode == "precompiled":
+        return TokenTableStream(cippTableLexer.tokenizeToTable(string))
+    elif mode == "streaming":
+        return StreamingTokenStream(cippTableLexer.iterTokens(string), maxLookahead)
+    elif mode == "reference":
+        return TokenStream(cippLexer.tokenize(string))
+    else:
+        raise Exception(f"unknown lexer mode: '{mode}'")
 
-def parseProgram(tokens):
+def parseProgram(tokens, interner = None):
+    '''
+    Equal expressions are shared while parsing when an
+    ExpressionInterner is given, see below.
+    '''
     functions = []
     while nextIsKeyword(tokens, "def"):
-        function = parseFunction(tokens)
+        function = parseFunction(tokens, interner)
         functions.append(function)
     return ast.Program(functions)
 
-def parseFunction(tokens):
+def parseFunction(tokens, interner = None):
     acceptKeyword(tokens, "def")
     retType = parseType(tokens)
     acceptLetter(tokens, "@")
     name = acceptIdentifier(tokens)
     arguments = parseArguments(tokens)
-    statement = parseStatement(tokens)
+    statement = parseStatement(tokens, interner)
     return ast.Function(name, retType, arguments, statement)
 
 def parseArguments(tokens):
@@ -50,170 +85,188 @@ def parseType(tokens):
     dataType = acceptIdentifier(tokens)
     return ast.Type(dataType)
 
-def parseStatement(tokens):
+def parseStatement(tokens, interner = None):
     if nextIsLetter(tokens, "{"):
-        return parseStatement_Block(tokens)
+        return parseStatement_Block(tokens, interner)
     elif nextIsKeyword(tokens, "return"):
-        return parseStatement_Return(tokens)
+        return parseStatement_Return(tokens, interner)
     elif nextIsKeyword(tokens, "let"):
-        return parseStatement_Let(tokens)
+        return parseStatement_Let(tokens, interner)
     elif nextIsKeyword(tokens, "while"):
-        return parseStatement_While(tokens)
+        return parseStatement_While(tokens, interner)
     elif nextIsKeyword(tokens, "if"):
-        return parseStatement_If(tokens)
+        return parseStatement_If(tokens, interner)
     elif nextIsIdentifier(tokens):
-        return parseStatement_Assignment(tokens)
+        return parseStatement_Assignment(tokens, interner)
     else:
         raise Exception("unknown statement type")
 
-def parseStatement_Block(tokens, a = 0):
-    statements = parseList(tokens, parseStatement, "{", "}")
+def parseStatement_Block(tokens, interner = None):
+    statements = parseList(tokens, lambda tokens: parseStatement(tokens, interner), "{", "}")
     if len(statements) == 1:
         return statements[0]
     else: 
         return ast.BlockStmt(statements)
 
-def parseStatement_Return(tokens):
+def parseStatement_Return(tokens, interner = None):
     acceptKeyword(tokens, "return")
-    expression = parseExpression(tokens)
+    expression = parseExpression(tokens, interner = interner)
     acceptLetter(tokens, ";")
     return ast.ReturnStmt(expression)
 
-def parseStatement_Let(tokens):
+def parseStatement_Let(tokens, interner = None):
     acceptKeyword(tokens, "let")
     dataType = parseType(tokens)
     name = acceptIdentifier(tokens)
     acceptLetter(tokens, "=")
-    expression = parseExpression(tokens)
+    expression = parseExpression(tokens, interner = interner)
     acceptLetter(tokens, ";")
     return ast.LetStmt(name, dataType, expression)
 
-def parseStatement_Assignment(tokens):
+def parseStatement_Assignment(tokens, interner = None):
     targetName = acceptIdentifier(tokens)
     if nextIsLetter(tokens, "["):
         acceptLetter(tokens, "[")
-        offset = parseExpression(tokens)
+        offset = parseExpression(tokens, interner = interner)
         acceptLetter(tokens, "]")
         acceptLetter(tokens, "=")
-        expression = parseExpression(tokens)
+        expression = parseExpression(tokens, interner = interner)
         acceptLetter(tokens, ";")
         return ast.ArrayAssignmentStmt(targetName, offset, expression)
     else:
         acceptLetter(tokens, "=")
-        expression = parseExpression(tokens)
+        expression = parseExpression(tokens, interner = interner)
         acceptLetter(tokens, ";")
         return ast.AssignmentStmt(targetName, expression)
 
-def parseStatement_While(tokens):
+def parseStatement_While(tokens, interner = None):
     acceptKeyword(tokens, "while")
     acceptLetter(tokens, "(")
-    condition = parseExpression(tokens)
+    condition = parseExpression(tokens, interner = interner)
     acceptLetter(tokens, ")")
-    statement = parseStatement(tokens)
+    statement = parseStatement(tokens, interner)
     return ast.WhileStmt(condition, statement)
 
-def parseStatement_If(tokens):
+def parseStatement_If(tokens, interner = None):
     acceptKeyword(tokens, "if")
     acceptLetter(tokens, "(")
-    condition = parseExpression(tokens)
+    condition = parseExpression(tokens, interner = interner)
     acceptLetter(tokens, ")")
-    thenStatement = parseStatement(tokens)
+    thenStatement = parseStatement(tokens, interner)
     if nextIsKeyword(tokens, "else"):
         acceptKeyword(tokens, "else")
-        elseStatement = parseStatement(tokens)
+        elseStatement = parseStatement(tokens, interner)
         return ast.IfElseStmt(condition, thenStatement, elseStatement)
     else:
         return ast.IfStmt(condition, thenStatement)
 
-def parseExpression(tokens):
+def parseExpression(tokens, minPrecedence = 0, interner = None):
     '''
-    Expression parsing happens at different levels
-    because of operator precedence rules.
+    Precedence climbing driven by operatorGroups. Consecutive operators
+    of the same group end up in a single node, so "1 - a + 4" becomes
+    one AddSubExpr with three terms.
     '''
-    return parseExpression_ComparisonLevel(tokens)
-
-def parseExpression_ComparisonLevel(tokens):
-    expressionLeft = parseExpression_AddSubLevel(tokens)
-    if nextIsComparisonOperator(tokens):
-        operator = parseComparisonOperator(tokens)
-        expressionRight = parseExpression_AddSubLevel(tokens)
-        return ast.ComparisonExpr(operator, expressionLeft, expressionRight)
-    else:
-        return expressionLeft
+    expression = parseExpression_FactorLevel(tokens, interner)
+    while True:
+        operator = peekOperator(tokens)
+        if operator is None:
+            return expression
+        group = groupByOperator[operator]
+        if group.precedence < minPrecedence:
+            return expression
+
+        operations = []
+        while True:
+            tokens.skip(len(operator))
+            operand = parseExpression(tokens, group.precedence + 1, interner)
+            operations.append((operator, operand))
+            if not group.isChainable:
+                break
+            operator = peekOperator(tokens)
+            if operator not in group.operators:
+                break
 
-comparisonOperators = ("==", "<=", ">=", "!=", "<", ">")
-def parseComparisonOperator(tokens):
-    for operator in comparisonOperators:
-        if nextLettersAre(tokens, operator):
-            acceptLetters(tokens, operator)
-            return operator
-    raise Exception("unknown comparison operator")
-
-def parseExpression_AddSubLevel(tokens):
-    terms = []
-
-    term = parseExpression_MulDivLevel(tokens)
-    terms.append(ast.AddedTerm(term))
-
-    while nextIsOneOfLetters(tokens, "+", "-"):
-        if nextIsLetter(tokens, "+"):
-            acceptLetter(tokens, "+")
-            term = parseExpression_MulDivLevel(tokens)
-            terms.append(ast.AddedTerm(term))
-        elif nextIsLetter(tokens, "-"):
-            acceptLetter(tokens, "-")
-            term = parseExpression_MulDivLevel(tokens)
-            terms.append(ast.SubtractedTerm(term))
-
-    if len(terms) == 1 and isinstance(terms[0], ast.AddedTerm):
-        return terms[0].expr
-    else:
-        return ast.AddSubExpr(terms)
-
-def parseExpression_MulDivLevel(tokens):
-    terms = []
-
-    factor = parseExpression_FactorLevel(tokens)
-    terms.append(ast.MultipliedTerm(factor))
-
-    while nextIsOneOfLetters(tokens, "*", "/"):
-        if nextIsLetter(tokens, "*"):
-            acceptLetter(tokens, "*")
-            factor = parseExpression_FactorLevel(tokens)
-            terms.append(ast.MultipliedTerm(factor))
-        elif nextIsLetter(tokens, "/"):
-            acceptLetter(tokens, "/")
-            factor = parseExpression_FactorLevel(tokens)
-            terms.append(ast.DividedTerm(factor))
-    
-    if len(terms) == 1 and isinstance(terms[0], ast.MultipliedTerm):
-        return terms[0].expr
-    else:
-        return ast.MulDivExpr(terms)
+        expression = share(group.build(expression, operations), interner)
+        if not group.isChainable:
+            minPrecedence = group.precedence + 1
+
+class OperatorGroup:
+    def __init__(self, precedence, operators, build, isChainable = True):
+        self.precedence = precedence
+        self.operators = operators
+        self.build = build
+        self.isChainable = isChainable
+
+def buildComparisonExpr(left, operations):
+    (operator, right), = operations
+    return ast.ComparisonExpr(operator, left, right)
+
+def buildAddSubExpr(first, operations):
+    terms = [ast.AddedTerm(first)]
+    for operator, expression in operations:
+        if operator == "+":
+            terms.append(ast.AddedTerm(expression))
+        else:
+            terms.append(ast.SubtractedTerm(expression))
+    return ast.AddSubExpr(terms)
+
+def buildMulDivExpr(first, operations):
+    terms = [ast.MultipliedTerm(first)]
+    for operator, expression in operations:
+        if operator == "*":
+            terms.append(ast.MultipliedTerm(expression))
+        else:
+            terms.append(ast.DividedTerm(expression))
+    return ast.MulDivExpr(terms)
 
-def parseExpression_FactorLevel(tokens):
+comparisonOperators = ("==", "<=", ">=", "!=", "<", ">")
+operatorGroups = [
+    OperatorGroup(1, comparisonOperators, buildComparisonExpr, isChainable = False),
+    OperatorGroup(2, ("+", "-"), buildAddSubExpr),
+    OperatorGroup(3, ("*", "/"), buildMulDivExpr),
+]
+groupByOperator = {operator : group for group in operatorGroups for operator in group.operators}
+maxLookahead = max(map(len, groupByOperator))
+twoLetterOperatorStarts = {operator[0] for operator in groupByOperator if len(operator) == 2}
+
+def peekOperator(tokens):
+    '''returns the operator that starts at the next token or None'''
+    if tokens.peekType() is not SingleCharToken:
+        return None
+    letter = tokens.peekValue()
+    if letter in twoLetterOperatorStarts and tokens.peekType(1) is SingleCharToken:
+        twoLetters = letter + tokens.peekValue(1)
+        if twoLetters in groupByOperator:
+            return twoLetters
+    if letter in groupByOperator:
+        return letter
+    return None
+
+def parseExpression_FactorLevel(tokens, interner = None):
     if nextIsIdentifier(tokens):
         name = acceptIdentifier(tokens)
-        return ast.Variable(name)
+        return share(ast.Variable(name), interner)
     elif nextIsInteger(tokens):
         value = acceptInteger(tokens)
-        return ast.ConstInt(value)
+        return share(ast.ConstInt(value), interner)
     elif nextIsLetter(tokens, "("):
         acceptLetter(tokens, "(")
-        expression = parseExpression(tokens)
+        expression = parseExpression(tokens, interner = interner)
         acceptLetter(tokens, ")")
         return expression
     elif nextIsLetter(tokens, "@"):
-        return parseFunctionCall(tokens)
+        return parseFunctionCall(tokens, interner)
+    else:
+        raise Exception("expected expression")
 
-def parseFunctionCall(tokens):
+def parseFunctionCall(tokens, interner = None):
     acceptLetter(tokens, "@")
     name = acceptIdentifier(tokens)
-    arguments = parseCallArguments(tokens)
+    arguments = parseCallArguments(tokens, interner)
     return ast.FunctionCall(name, arguments)
 
-def parseCallArguments(tokens):
-    return parseList(tokens, parseExpression, "(", ")", ",")
+def parseCallArguments(tokens, interner = None):
+    return parseList(tokens, lambda tokens: parseExpression(tokens, interner = interner), "(", ")", ",")
 
 def parseList(tokens, parseElement, start, end, separator = None):
     elements = []
@@ -231,12 +284,55 @@ def parseList(tokens, parseElement, start, end, separator = None):
 
 
 
+# Interning
+####################################################
+
+class ExpressionInterner:
+    '''
+    Hash-consing for expressions. Structurally equal expressions are
+    replaced by the same object, so that identity can be used as
+    equality and as key when caching results per expression.
+
+    The parser interns every expression right after building it, when
+    its children are interned already. Duplicates are dropped
+    immediately, so the unshared tree never exists as a whole.
+
+    Function calls are never shared, because every call has to be
+    executed. Their arguments are interned nonetheless. Shared nodes
+    must not be modified afterwards.
+    '''
+
+    def __init__(self):
+        self.nodes = {}
+
+    def intern(self, node):
+        '''returns the shared expression that is equal to the given one'''
+        nodeType = type(node)
+        if nodeType is ast.FunctionCall:
+            return node
+        elif nodeType is ast.ConstInt:
+            key = (nodeType, node.value)
+        elif nodeType is ast.Variable:
+            key = (nodeType, node.name)
+        elif nodeType is ast.ComparisonExpr:
+            key = (nodeType, node.operator, node.left, node.right)
+        else:
+            key = (nodeType, *(term.operation for term in node.terms), *(term.expr for term in node.terms))
+        return self.nodes.setdefault(key, node)
+
+def share(expression, interner):
+    if interner is None:
+        return expression
+    return interner.intern(expression)
+
+
+
 # Utility Functions
 ####################################################
 
 def acceptKeyword(tokens, keyword):
     if nextIsKeyword(tokens, keyword):
-        tokens.takeNext()
+        tokens.skip()
     else:
         raise Exception(f"expected keyword '{keyword}'")
 
@@ -246,54 +342,42 @@ def acceptLetters(tokens, letters):
 
 def acceptLetter(tokens, letter):
     if nextIsLetter(tokens, letter):
-        tokens.takeNext()
+        tokens.skip()
     else:
         raise Exception(f"expected token '{letter}'")
 
 def acceptIdentifier(tokens):
     if nextIsIdentifier(tokens):
-        return tokens.takeNext().value
+        return tokens.takeNextValue()
     else:
         raise Exception("expected identifier")
 
 def acceptInteger(tokens):
     if nextIsInteger(tokens):
-        return tokens.takeNext().value
+        return tokens.takeNextValue()
     else:
         raise Exception("expected integer")
 
 
 def nextIsKeyword(tokens, keyword):
-    if len(tokens) == 0: return False
-    nextToken = tokens.peekNext()
-    if isinstance(nextToken, IdentifierToken):
-        return nextToken.value == keyword
-    return False
+    return tokens.peekType() is IdentifierToken and tokens.peekValue() == keyword
 
 def nextIsLetter(tokens, letter):
-    if len(tokens) == 0: return False
-    nextToken = tokens.peekNext()
-    if isinstance(nextToken, SingleCharToken):
-        return nextToken.value == letter
-    return False
+    return tokens.peekType() is SingleCharToken and tokens.peekValue() == letter
 
 def nextIsOneOfLetters(tokens, *letters):
-    return any(nextIsLetter(tokens, c) for c in letters)
+    return tokens.peekType() is SingleCharToken and tokens.peekValue() in letters
 
 def nextLettersAre(tokens, letters):
-    if len(tokens) < len(letters): return False
-    for token, letter in zip(tokens.getLookahead(len(letters)), letters):
-        if not isinstance(token, SingleCharToken) or token.value != letter:
+    for offset, letter in enumerate(letters):
+        if tokens.peekType(offset) is not SingleCharToken:
+            return False
+        if tokens.peekValue(offset) != letter:
             return False
     return True
 
 def nextIsIdentifier(tokens):
-    if len(tokens) == 0: return False
-    return isinstance(tokens.peekNext(), IdentifierToken)
+    return tokens.peekType() is IdentifierToken
 
 def nextIsInteger(tokens):
-    if len(tokens) == 0: return False
-    return isinstance(tokens.peekNext(), IntegerToken)
-
-def nextIsComparisonOperator(tokens):
-    return any(nextLettersAre(tokens, s) for s in comparisonOperators)
\ No newline at end of file
+    return tokens.peekType() is IntegerToken
@@ -0,0 +1,139 @@
+'''
+Linear scan register allocation (Poletto and Sarkar).
+
+Every virtual register gets one live interval that covers all positions
+between its first and its last appearance, including the blocks that it
+is live through. The intervals are visited by start position; a register
+is taken from the free pool and returned when the interval has expired.
+When no register is free, the interval that ends last is spilled.
+
+Calls clobber the caller saved registers, so intervals that are live
+across a call may only use callee saved registers.
+'''
+
+from bisect import bisect_right
+from . import ir
+from . cfg import ControlFlowGraph
+from . dataflow import Liveness, iterBits
+from . x64assembler.registers import allRegisters
+from . platform_utils import onLinux, onWindows
+
+globals().update(allRegisters)
+
+# rax and rcx stay free as scratch registers for the code generator
+if onLinux:
+    callerSavedRegisters = [rdx, rsi, rdi, r8, r9, r10, r11]
+    calleeSavedRegisters = [rbx, r12, r13, r14, r15]
+elif onWindows:
+    callerSavedRegisters = [rdx, r8, r9, r10, r11]
+    calleeSavedRegisters = [rbx, rsi, rdi, r12, r13, r14, r15]
+else:
+    raise Exception("unsupported platform")
+
+allocatableRegisters = callerSavedRegisters + calleeSavedRegisters
+
+class LiveInterval:
+    def __init__(self, vreg, start, end):
+        self.vreg = vreg
+        self.start = start
+        self.end = end
+        self.crossesCall = False
+
+    def extend(self, position):
+        if position < self.start:
+            self.start = position
+        elif position > self.end:
+            self.end = position
+
+    def overlaps(self, other):
+        return self.start <= other.end and other.start <= self.end
+
+    def __repr__(self):
+        return f"<Interval {self.vreg}: {self.start}-{self.end}>"
+
+def computeLiveIntervals(functionIR):
+    '''
+    Arguments are written at position 0 and stay alive until the entry
+    block starts at position 1. Every block takes one position for its
+    start and one for each instruction, in the layout order.
+    '''
+    cfg = ControlFlowGraph.fromFunction(functionIR)
+    liveness = Liveness(cfg)
+    vregs = liveness.vregs.items
+    intervals = {vreg : LiveInterval(vreg, 0, 1) for vreg in functionIR.arguments}
+    callPositions = []
+
+    def extend(vreg, position):
+        interval = intervals.get(vreg)
+        if interval is None:
+            intervals[vreg] = LiveInterval(vreg, position, position)
+        else:
+            interval.extend(position)
+
+    position = 0
+    for block in cfg.blocks:
+        position += 1
+        for bit in iterBits(liveness.liveIn[block.index]):
+            extend(vregs[bit], position)
+        for instruction in block.instructions:
+            position += 1
+            for vreg in instruction.getInputVRegisters():
+                extend(vreg, position)
+            output = instruction.getOutputVRegister()
+            if output is not None:
+                extend(output, position)
+            if isinstance(instruction, ir.CallInstr):
+                callPositions.append(position)
+        for bit in iterBits(liveness.liveOut[block.index]):
+            extend(vregs[bit], position)
+
+    for interval in intervals.values():
+        # arguments are read at the call position, the result is written there
+        index = bisect_right(callPositions, interval.start)
+        interval.crossesCall = index < len(callPositions) and callPositions[index] < interval.end
+    return intervals
+
+def allocateRegisters(functionIR):
+    '''
+    Returns a dict that maps every virtual register to a register
+    or to None when it has to live on the stack.
+    '''
+    intervals = sorted(computeLiveIntervals(functionIR).values(), key = lambda i: (i.start, i.end))
+    return linearScan(intervals)
+
+def linearScan(intervals):
+    registerByVReg = {}
+    freeRegisters = set(allocatableRegisters)
+    active = []
+
+    for interval in intervals:
+        # instructions read their inputs before they write the output,
+        # so an interval can take the register of one that ends at its start
+        stillActive = []
+        for other in active:
+            if other.end <= interval.start:
+                freeRegisters.add(registerByVReg[other.vreg])
+            else:
+                stillActive.append(other)
+        active = stillActive
+
+        candidates = calleeSavedRegisters if interval.crossesCall else allocatableRegisters
+        # caller saved registers come first, they do not have to be saved in the prologue
+        register = next((r for r in candidates if r in freeRegisters), None)
+        if register is not None:
+            freeRegisters.remove(register)
+            registerByVReg[interval.vreg] = register
+            active.append(interval)
+            continue
+
+        # spill the interval that ends last and holds a usable register
+        usable = [other for other in active if registerByVReg[other.vreg] in candidates]
+        victim = max(usable, key = lambda other: other.end, default = None)
+        if victim is not None and victim.end > interval.end:
+            registerByVReg[interval.vreg] = registerByVReg[victim.vreg]
+            registerByVReg[victim.vreg] = None
+            active.remove(victim)
+            active.append(interval)
+        else:
+            registerByVReg[interval.vreg] = None
+    return registerByVReg
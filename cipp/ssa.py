@@ -0,0 +1,243 @@
+'''
+Conversion of a control flow graph into static single assignment form
+and back.
+
+toSSA places phi instructions at the iterated dominance frontiers of the
+blocks that write a register (Cytron et al.). Only registers that are
+read in a block before they are written there get phis, which avoids
+most of the phis that would be dead immediately. Afterwards every write
+gets its own register while walking the dominator tree.
+
+fromSSA turns the phis of a block into one parallel copy per incoming
+edge. Critical edges are split first, so that the copies only run on
+their edge. The parallel copies are sequentialized into MoveInstrs,
+using a temporary register to break cycles.
+'''
+
+from . import ir
+from . cfg import BasicBlock, DominatorTree
+
+def toSSA(cfg):
+    dominatorTree = DominatorTree(cfg)
+    frontiers = computeDominanceFrontiers(cfg, dominatorTree)
+    phiTargets = insertPhis(cfg, dominatorTree, frontiers)
+    renameVRegisters(cfg, dominatorTree, phiTargets)
+    return dominatorTree
+
+def fromSSA(cfg):
+    splitCriticalEdges(cfg)
+    for block in list(cfg.blocks):
+        phis = getPhis(block)
+        if len(phis) == 0:
+            continue
+        del block.instructions[:len(phis)]
+        for predecessor in block.predecessors:
+            copies = [(phi.target, phi.sources.get(predecessor)) for phi in phis]
+            insertBeforeTerminator(predecessor, sequentializeCopies(copies))
+
+def computeDominanceFrontiers(cfg, dominatorTree):
+    '''frontiers[i] contains the blocks in the dominance frontier of cfg.blocks[i]'''
+    frontiers = [set() for _ in cfg.blocks]
+    for block in dominatorTree.reachableBlocks:
+        predecessors = [p for p in block.predecessors if dominatorTree.isReachable(p)]
+        if len(predecessors) < 2:
+            continue
+        idom = dominatorTree.getImmediateDominator(block)
+        for runner in predecessors:
+            while runner is not idom:
+                frontiers[runner.index].add(block)
+                runner = dominatorTree.getImmediateDominator(runner)
+    return frontiers
+
+def getPhis(block):
+    phis = []
+    for instruction in block.instructions:
+        if not isinstance(instruction, ir.PhiInstr):
+            break
+        phis.append(instruction)
+    return phis
+
+
+# Phi Placement
+####################################################
+
+def findGlobalVRegisters(cfg, dominatorTree):
+    '''
+    Returns the registers that are read in some block before they are written
+    there, and the blocks that write each of them.
+    '''
+    globalVRegisters = set()
+    writingBlocks = {}
+    for block in dominatorTree.reachableBlocks:
+        written = set()
+        for instruction in block.instructions:
+            for vreg in instruction.getInputVRegisters():
+                if vreg not in written:
+                    globalVRegisters.add(vreg)
+            output = instruction.getOutputVRegister()
+            if output is not None:
+                written.add(output)
+                writingBlocks.setdefault(output, []).append(block)
+    return globalVRegisters, writingBlocks
+
+def insertPhis(cfg, dominatorTree, frontiers):
+    '''returns a dict that maps every inserted phi to its original register'''
+    globalVRegisters, writingBlocks = findGlobalVRegisters(cfg, dominatorTree)
+    phisPerBlock = [[] for _ in cfg.blocks]
+    phiTargets = {}
+
+    # sorting by name keeps the output deterministic
+    for vreg in sorted(globalVRegisters & writingBlocks.keys(), key = lambda vreg: vreg.name):
+        hasPhi = set()
+        worklist = list(writingBlocks[vreg])
+        queued = set(worklist)
+        while worklist:
+            block = worklist.pop()
+            for frontierBlock in frontiers[block.index]:
+                if frontierBlock in hasPhi:
+                    continue
+                hasPhi.add(frontierBlock)
+                phi = ir.PhiInstr(vreg)
+                phisPerBlock[frontierBlock.index].append(phi)
+                phiTargets[phi] = vreg
+                if frontierBlock not in queued:
+                    queued.add(frontierBlock)
+                    worklist.append(frontierBlock)
+
+    for block, phis in zip(cfg.blocks, phisPerBlock):
+        block.instructions[:0] = phis
+    return phiTargets
+
+
+# Renaming
+####################################################
+
+def renameVRegisters(cfg, dominatorTree, phiTargets):
+    '''
+    Walks the dominator tree. The stack of every original register
+    contains the register that holds its current value on top.
+    Arguments keep their registers.
+    '''
+    stacks = {vreg : [vreg] for vreg in cfg.function.arguments}
+
+    def getCurrent(vreg):
+        stack = stacks.get(vreg)
+        if stack:
+            return stack[-1]
+        return vreg
+
+    work = [(cfg.entry, None)]
+    while work:
+        block, pushedVRegisters = work.pop()
+        if pushedVRegisters is not None:
+            for original in pushedVRegisters:
+                stacks[original].pop()
+            continue
+
+        pushedVRegisters = []
+        for instruction in block.instructions:
+            if isinstance(instruction, ir.PhiInstr):
+                original = phiTargets[instruction]
+            else:
+                instruction.replaceInputVRegisters(getCurrent)
+                original = instruction.getOutputVRegister()
+            if original is not None:
+                newVReg = ir.VirtualRegister()
+                instruction.setOutputVRegister(newVReg)
+                stacks.setdefault(original, []).append(newVReg)
+                pushedVRegisters.append(original)
+
+        for successor in block.successors:
+            for phi in getPhis(successor):
+                stack = stacks.get(phiTargets[phi])
+                phi.sources[block] = stack[-1] if stack else None
+
+        work.append((block, pushedVRegisters))
+        for child in reversed(dominatorTree.getChildren(block)):
+            work.append((child, None))
+
+
+# Leaving SSA
+####################################################
+
+def splitCriticalEdges(cfg):
+    '''
+    A critical edge goes from a block with several successors to a block
+    with several predecessors. A new block is placed on every such edge.
+    '''
+    newBlocks = []
+    fallthroughBlocks = {}
+    for block in cfg.blocks:
+        if len(block.successors) < 2:
+            continue
+        for successor in block.successors:
+            if len(successor.predecessors) < 2 or len(getPhis(successor)) == 0:
+                continue
+            if successor is block.fallthrough:
+                # stays on the fallthrough path, directly behind the block
+                fallthroughBlocks[block] = BasicBlock()
+            else:
+                label = cfg.function.block.newLabel("split_edge")
+                newBlock = BasicBlock(label)
+                newBlock.instructions.append(ir.GotoInstr(successor.label))
+                block.terminator.label = label
+                newBlocks.append(newBlock)
+                redirectPhiSources(successor, block, newBlock)
+
+    if len(newBlocks) == 0 and len(fallthroughBlocks) == 0:
+        return
+
+    blocks = []
+    for block in cfg.blocks:
+        blocks.append(block)
+        if block in fallthroughBlocks:
+            redirectPhiSources(block.fallthrough, block, fallthroughBlocks[block])
+            blocks.append(fallthroughBlocks[block])
+    blocks.extend(newBlocks)
+    cfg.blocks = blocks
+    cfg.updateEdges()
+
+def redirectPhiSources(block, oldPredecessor, newPredecessor):
+    for phi in getPhis(block):
+        if oldPredecessor in phi.sources:
+            phi.sources[newPredecessor] = phi.sources.pop(oldPredecessor)
+
+def insertBeforeTerminator(block, instructions):
+    if block.terminator is not None:
+        block.instructions[-1:-1] = instructions
+    else:
+        block.instructions.extend(instructions)
+
+def sequentializeCopies(copies):
+    '''
+    copies is a list of (target, source) pairs that happen at the same time.
+    Returns MoveInstrs that have the same effect when executed in order.
+    '''
+    pending = {target : source for target, source in copies
+               if source is not None and source is not target}
+    readers = {}
+    for target, source in pending.items():
+        readers[source] = readers.get(source, 0) + 1
+
+    moves = []
+    ready = [target for target in pending if readers.get(target, 0) == 0]
+    while pending:
+        while ready:
+            target = ready.pop()
+            source = pending.pop(target)
+            moves.append(ir.MoveInstr(target, source))
+            readers[source] -= 1
+            if readers[source] == 0 and source in pending:
+                ready.append(source)
+        if pending:
+            # only cycles are left, save one value to break its cycle
+            target = next(iter(pending))
+            temporary = ir.VirtualRegister()
+            moves.append(ir.MoveInstr(temporary, target))
+            for other, source in pending.items():
+                if source is target:
+                    pending[other] = temporary
+                    readers[temporary] = readers.get(temporary, 0) + 1
+            readers[target] = 0
+            ready.append(target)
+    return moves
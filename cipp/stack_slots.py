@@ -0,0 +1,45 @@
+'''
+Assignment of stack slots to virtual registers.
+
+Registers whose live intervals do not overlap can share a slot. The
+intervals are visited by start position and take the lowest free slot,
+which needs the smallest possible number of slots for intervals.
+'''
+
+import heapq
+from . register_allocation import computeLiveIntervals
+
+def assignStackSlots(functionIR, vregs = None):
+    '''
+    Returns a dict that maps every register to a slot index, and the
+    number of slots. Without vregs all registers of the function get a slot.
+    '''
+    intervals = computeLiveIntervals(functionIR)
+    if vregs is not None:
+        intervals = {vreg : intervals[vreg] for vreg in vregs}
+    return colorIntervals(sorted(intervals.values(), key = lambda i: (i.start, i.end)))
+
+def colorIntervals(intervals):
+    slotByVReg = {}
+    active = []
+    freeSlots = []
+    slotAmount = 0
+    for interval in intervals:
+        # same as in the register allocator, inputs are read before the output is written
+        while active and active[0][0] <= interval.start:
+            _, slot = heapq.heappop(active)
+            heapq.heappush(freeSlots, slot)
+        if freeSlots:
+            slot = heapq.heappop(freeSlots)
+        else:
+            slot = slotAmount
+            slotAmount += 1
+        slotByVReg[interval.vreg] = slot
+        heapq.heappush(active, (interval.end, slot))
+    return slotByVReg, slotAmount
+
+def compareFrameSizes(moduleIR):
+    '''yields (function name, bytes with one slot per register, bytes with shared slots)'''
+    for functionIR in moduleIR.functions:
+        _, slotAmount = assignStackSlots(functionIR)
+        yield functionIR.name, len(functionIR.getUsedVRegisters()) * 8, slotAmount * 8
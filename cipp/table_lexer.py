@@ -0,0 +1,161 @@
+import re
+from array import array
+
+class TableLexer:
+    '''
+    Precompiled version of a Lexer that produces the same tokens.
+
+    The token type is found with a single lookup in a table that is
+    indexed by the first char. Afterwards the complete token is matched
+    by the regular expression of that token type, so checkNext is never
+    called. Only ASCII chars can start a token.
+
+    The source can also be a bytes-like object like a mmap, which is
+    lexed without decoding it first.
+    '''
+
+    def __init__(self, lexer):
+        self.lexer = lexer
+        self.tokenTypes = list(lexer.allTokenTypes)
+        self.entryByFirstChar = {}
+        self.entryByFirstByte = {}
+
+        for code in range(128):
+            char = chr(code)
+            for kind, tokenType in enumerate(self.tokenTypes):
+                if tokenType.startswith(char):
+                    self.entryByFirstChar[char] = self.createEntry(kind, tokenType)
+                    self.entryByFirstByte[code] = self.createEntry(kind, tokenType, forBytes = True)
+                    break
+
+    def createEntry(self, kind, tokenType, forBytes = False):
+        if tokenType.pattern is None:
+            raise Exception(f"{tokenType.__name__} has no pattern")
+        pattern = tokenType.pattern
+        forbiddenNextChars = tokenType.forbiddenNextChars
+        if forBytes:
+            pattern = pattern.encode("ascii")
+            forbiddenNextChars = forbiddenNextChars.encode("ascii")
+        return (
+            kind,
+            re.compile(pattern).match,
+            tokenType in self.lexer.ignoredTokenTypes,
+            forbiddenNextChars
+        )
+
+    def tokenize(self, string):
+        return list(self.iterTokens(string))
+
+    def iterTokens(self, string):
+        tokenTypes = self.tokenTypes
+        for kind, start, end in self.iterTokenSpans(string):
+            yield tokenTypes[kind].fromString(decodeText(string[start:end]))
+
+    def tokenizeToTable(self, string):
+        kinds = array("i")
+        starts = array("i")
+        ends = array("i")
+        for kind, start, end in self.iterTokenSpans(string):
+            kinds.append(kind)
+            starts.append(start)
+            ends.append(end)
+        if isinstance(string, str):
+            return TokenTable(string, self.tokenTypes, kinds, starts, ends)
+        else:
+            return ByteTokenTable(string, self.tokenTypes, kinds, starts, ends)
+
+    def iterTokenSpans(self, string):
+        '''yields (kind, start, end) for every token that is not ignored'''
+        if isinstance(string, str):
+            entryByFirstChar = self.entryByFirstChar
+        else:
+            # indexing bytes returns an int
+            entryByFirstChar = self.entryByFirstByte
+        position = 0
+        length = len(string)
+
+        while position < length:
+            entry = entryByFirstChar.get(string[position])
+            if entry is None:
+                char = decodeText(string[position:position+1])
+                raise Exception(f"token not recognized based on first char: '{char}'")
+            kind, match, isIgnored, forbiddenNextChars = entry
+
+            end = match(string, position).end()
+            if end < length and string[end] in forbiddenNextChars:
+                token = self.tokenTypes[kind].fromString(decodeText(string[position:end]))
+                char = decodeText(string[end:end+1])
+                raise Exception(f"invalid char: '{char}' must not directly follow {token}")
+
+            if not isIgnored:
+                yield kind, position, end
+            position = end
+
+
+class TokenTable:
+    '''
+    Stores tokens in parallel arrays instead of one object per token.
+    The kind is an index into tokenTypes. Values are only sliced out of
+    the source when they are requested.
+    '''
+
+    def __init__(self, source, tokenTypes, kinds, starts, ends):
+        self.source = source
+        self.tokenTypes = tokenTypes
+        self.kinds = kinds
+        self.starts = starts
+        self.ends = ends
+        self.valueConverters = [tokenType.valueFromString for tokenType in tokenTypes]
+
+    def getType(self, index):
+        return self.tokenTypes[self.kinds[index]]
+
+    def getText(self, index):
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def getValue(self, index):
+        return self.valueConverters[self.kinds[index]](self.getText(index))
+
+    def getToken(self, index):
+        return self.getType(index).fromString(self.getText(index))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.getToken(i) for i in range(*key.indices(len(self)))]
+        return self.getToken(key)
+
+    def __len__(self):
+        return len(self.kinds)
+
+class ByteTokenTable(TokenTable):
+    '''
+    TokenTable for ASCII sources that are bytes-like objects. The parser
+    probes the next token for several keywords, so the last decoded text
+    is kept to decode and convert every token only once.
+    '''
+
+    def __init__(self, source, tokenTypes, kinds, starts, ends):
+        super().__init__(source, tokenTypes, kinds, starts, ends)
+        self.cachedIndex = -1
+        self.cachedValue = None
+
+    def getValue(self, index):
+        if index != self.cachedIndex:
+            self.cachedIndex = index
+            self.cachedValue = self.valueConverters[self.kinds[index]](self.getText(index))
+        return self.cachedValue
+
+    def getText(self, index):
+        start = self.starts[index]
+        end = self.ends[index]
+        if end - start == 1:
+            # most tokens are single chars, avoid the decode call for them
+            return charByByte[self.source[start]]
+        return self.source[start:end].decode("ascii")
+
+charByByte = [chr(i) for i in range(128)]
+
+def decodeText(text):
+    if isinstance(text, str):
+        return text
+    return text.decode("ascii", errors = "replace")
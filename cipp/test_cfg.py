@@ -0,0 +1,136 @@
+import unittest
+from . import ir
+from . import iterative_parser
+from . import iterative_ast_to_ir
+from . parser import stringToTokenStream
+from . fused_front_end import transformToIR
+from . ir_to_x64 import compileModule
+from . cfg import ControlFlowGraph, DominatorTree, LoopNest
+
+code = '''
+    def int @f(int a, int b) {
+        let int i = 0;
+        while (i < a) {
+            let int j = 0;
+            while (j < b) {
+                if (j == 3) {
+                    return i;
+                }
+                j = j + 1;
+            }
+            i = i + 1;
+        }
+        if (a > b) { a = b; } else { b = a; }
+        return a + b;
+    }
+'''
+
+def createGraph(source):
+    function = transformToIR(source).functions[0]
+    return ControlFlowGraph.fromFunction(function)
+
+def findBlock(cfg, prefix):
+    for block in cfg.blocks:
+        if block.label is not None and block.label.name.startswith(prefix):
+            return block
+    raise Exception(f"no block with label {prefix}")
+
+def findBlocks(cfg, prefix):
+    return [block for block in cfg.blocks
+            if block.label is not None and block.label.name.startswith(prefix)]
+
+class TestControlFlowGraph(unittest.TestCase):
+    def testFlattenKeepsLayout(self):
+        cfg = createGraph(code)
+        self.assertEqual(cfg.toCodeBlock().elements, cfg.function.block.elements)
+
+    def testBlocksEndAtJumps(self):
+        cfg = createGraph(code)
+        for block in cfg.blocks:
+            for instruction in block.instructions[:-1]:
+                self.assertNotIsInstance(instruction, (ir.GotoInstr, ir.GotoIfZero, ir.ReturnInstr))
+
+    def testEdges(self):
+        cfg = createGraph(code)
+        self.assertEqual(len(cfg.entry.predecessors), 0)
+        outerStart, innerStart = findBlocks(cfg, "while_start")
+        innerAfter, outerAfter = findBlocks(cfg, "while_after")
+        self.assertEqual(len(outerStart.successors), 2)
+        self.assertIn(outerAfter, outerStart.successors)
+        self.assertIn(innerAfter, outerStart.predecessors)
+        self.assertEqual(len(innerStart.predecessors), 2)
+        for block in cfg.blocks:
+            for successor in block.successors:
+                self.assertIn(block, successor.predecessors)
+
+    def testUnreachableCodeAfterReturn(self):
+        cfg = createGraph("def int @f(int a) { return a; a = 1; return a; }")
+        self.assertEqual(len(cfg.blocks), 2)
+        self.assertEqual(len(cfg.blocks[1].predecessors), 0)
+        dominators = DominatorTree(cfg)
+        self.assertFalse(dominators.isReachable(cfg.blocks[1]))
+
+    def testCompileFlattened(self):
+        function = transformToIR(code).functions[0]
+        cfg = ControlFlowGraph.fromFunction(function)
+        cfg.writeBack()
+        compileModule(ir.Module([function])).toMachineCode()
+
+class TestDominatorTree(unittest.TestCase):
+    def testDominators(self):
+        cfg = createGraph(code)
+        dominators = DominatorTree(cfg)
+        outerStart, innerStart = findBlocks(cfg, "while_start")
+        innerAfter, outerAfter = findBlocks(cfg, "while_after")
+        elseStart = findBlock(cfg, "else_start")
+        elseEnd = findBlock(cfg, "else_end")
+
+        self.assertIsNone(dominators.getImmediateDominator(cfg.entry))
+        self.assertIs(dominators.getImmediateDominator(outerStart), cfg.entry)
+        self.assertIs(dominators.getImmediateDominator(outerAfter), outerStart)
+        self.assertIs(dominators.getImmediateDominator(elseEnd), outerAfter)
+        self.assertTrue(dominators.dominates(outerStart, innerAfter))
+        self.assertFalse(dominators.dominates(innerStart, outerAfter))
+        self.assertFalse(dominators.dominates(elseStart, elseEnd))
+        self.assertTrue(dominators.dominates(elseEnd, elseEnd))
+
+    def testPreorder(self):
+        cfg = createGraph(code)
+        dominators = DominatorTree(cfg)
+        seen = set()
+        for block in dominators.iterPreorder():
+            idom = dominators.getImmediateDominator(block)
+            self.assertTrue(idom is None or idom in seen)
+            seen.add(block)
+        self.assertEqual(seen, set(dominators.reachableBlocks))
+
+class TestLoopNest(unittest.TestCase):
+    def testNestedLoops(self):
+        cfg = createGraph(code)
+        loops = LoopNest(cfg, DominatorTree(cfg))
+        outerStart, innerStart = findBlocks(cfg, "while_start")
+        self.assertEqual(len(loops.loops), 2)
+        outer, inner = loops.loops
+        self.assertIs(outer.header, outerStart)
+        self.assertIs(inner.header, innerStart)
+        self.assertIs(inner.parent, outer)
+        self.assertEqual(loops.topLevelLoops, [outer])
+        self.assertEqual(loops.getDepth(innerStart), 2)
+        self.assertEqual(loops.getDepth(findBlock(cfg, "if_after")), 2)
+        self.assertEqual(loops.getDepth(findBlock(cfg, "else_end")), 0)
+        self.assertLess(set(inner.iterBlocks()), set(outer.iterBlocks()))
+
+    def testDeepNesting(self):
+        depth = 3000
+        source = ("def int @f(int x) {" + "while (x > 0) {" * depth
+                  + "x = x - 1;" + "}" * depth + "return x; }")
+        program = iterative_parser.parseProgram(stringToTokenStream(source))
+        function = iterative_ast_to_ir.transformProgramToIR(program).functions[0]
+        cfg = ControlFlowGraph.fromFunction(function)
+        dominators = DominatorTree(cfg)
+        loops = LoopNest(cfg, dominators)
+        self.assertEqual(len(loops.loops), depth)
+        self.assertEqual(max(loop.depth for loop in loops.loops), depth)
+
+if __name__ == '__main__':
+    unittest.main()
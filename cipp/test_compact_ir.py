@@ -0,0 +1,56 @@
+import unittest
+from . import compact_ir
+from . compact_ir import CompactFunction, CompactModule
+from . fused_front_end import transformToIR
+from . test_iterative_parser import code, normalizeNames
+
+source = code.replace("x[a] = b;", "")
+
+class TestCompactIR(unittest.TestCase):
+    def testRoundTrip(self):
+        module = transformToIR(source)
+        expected = normalizeNames(module)
+        self.assertEqual(normalizeNames(CompactModule.fromModule(module).toModule()), expected)
+
+    def testDenseVRegisterIds(self):
+        for function in transformToIR(source).functions:
+            compact = CompactFunction.fromFunction(function)
+            self.assertEqual(compact.vregAmount, len(function.getUsedVRegisters()))
+            self.assertEqual(compact.argumentAmount, len(function.arguments))
+            ids = set()
+            for i in range(len(compact)):
+                ids.update(compact.getInputVRegisters(i))
+                ids.add(compact.getOutputVRegister(i))
+            ids.discard(-1)
+            ids.update(range(compact.argumentAmount))
+            self.assertEqual(ids, set(range(compact.vregAmount)))
+
+    def testColumns(self):
+        function = transformToIR("def int @f(int a) { let int b = 3; return @g(a, b) < a; }").functions[0]
+        compact = CompactFunction.fromFunction(function)
+        self.assertEqual([compact_ir.opcodeNames[opcode] for opcode in compact.opcodes],
+                         ["INITIALIZE", "CALL", "LESS", "RETURN"])
+        self.assertEqual(compact.immediates[0], 3)
+        self.assertEqual(compact.getInputVRegisters(1), [0, 1])
+        self.assertEqual(compact.calleeNames, ["g"])
+
+    def testOpcodeConstants(self):
+        for opcode, name in enumerate(compact_ir.opcodeNames):
+            self.assertEqual(getattr(compact_ir, name), opcode)
+
+    def testLiteralTooLarge(self):
+        function = transformToIR("def int @f() { return 9223372036854775808; }").functions[0]
+        with self.assertRaisesRegex(Exception, "64 bits"):
+            CompactFunction.fromFunction(function)
+        function = transformToIR("def int @f() { return 9223372036854775807; }").functions[0]
+        self.assertEqual(CompactFunction.fromFunction(function).immediates[0], 2**63 - 1)
+
+    def testLabelPositions(self):
+        function = transformToIR("def int @f(int a) { while (a) a = a - 1; return a; }").functions[0]
+        compact = CompactFunction.fromFunction(function)
+        for labelId, position in enumerate(compact.getLabelPositions()):
+            self.assertEqual(compact.opcodes[position], compact_ir.LABEL)
+            self.assertEqual(compact.immediates[position], labelId)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+from . import ir
+from . ssa import toSSA
+from . test_cfg import createGraph, findBlock
+from . dataflow import Liveness, ReachingDefinitions, AvailableExpressions, BitIndex, iterBits
+
+loopCode = '''
+    def int @f(int a, int b) {
+        let int i = 0;
+        let int s = 0;
+        while (i < a) {
+            s = s + b;
+            i = i + 1;
+        }
+        return s;
+    }
+'''
+
+def findInstructions(cfg, instructionType):
+    return [instruction for instruction in cfg.iterInstructions()
+            if isinstance(instruction, instructionType)]
+
+class TestBitIndex(unittest.TestCase):
+    def testRoundTrip(self):
+        index = BitIndex("abc")
+        self.assertEqual(index.add("b"), 1)
+        self.assertEqual(index.toList(index.getMask("a") | index.getMask("c")), ["a", "c"])
+        self.assertEqual(list(iterBits(0b10110)), [1, 2, 4])
+        self.assertEqual(index.getFullMask(), 0b111)
+
+class TestLiveness(unittest.TestCase):
+    def testLoop(self):
+        cfg = createGraph(loopCode)
+        a, b = cfg.function.arguments
+        liveness = Liveness(cfg)
+        start = findBlock(cfg, "while_start")
+        after = findBlock(cfg, "while_after")
+        self.assertIn(a, liveness.getLiveIn(start))
+        self.assertIn(b, liveness.getLiveIn(start))
+        self.assertNotIn(a, liveness.getLiveIn(after))
+        self.assertEqual(liveness.getLiveIn(cfg.entry), {a, b})
+        self.assertEqual(liveness.getLiveOut(after), set())
+
+    def testLiveAfterInstructions(self):
+        cfg = createGraph("def int @f(int a) { let int x = a + 1; return x; }")
+        liveness = Liveness(cfg)
+        ret, add, init = [instruction for instruction, _ in liveness.iterLiveAfter(cfg.entry)][:3]
+        self.assertIsInstance(ret, ir.ReturnInstr)
+        lives = {instruction : liveness.vregs.toList(live)
+                 for instruction, live in liveness.iterLiveAfter(cfg.entry)}
+        self.assertEqual(lives[ret], [])
+        self.assertEqual(lives[add], [ret.vreg])
+
+    def testPhiInputsLiveOnEdge(self):
+        cfg = createGraph(loopCode)
+        toSSA(cfg)
+        liveness = Liveness(cfg)
+        start = findBlock(cfg, "while_start")
+        for phi in start.instructions:
+            if not isinstance(phi, ir.PhiInstr):
+                break
+            for predecessor, vreg in phi.sources.items():
+                self.assertIn(vreg, liveness.getLiveOut(predecessor))
+            self.assertNotIn(phi.target, liveness.getLiveIn(start))
+
+class TestReachingDefinitions(unittest.TestCase):
+    def testLoop(self):
+        cfg = createGraph(loopCode)
+        a, b = cfg.function.arguments
+        reaching = ReachingDefinitions(cfg)
+        start = findBlock(cfg, "while_start")
+        increment = findInstructions(cfg, ir.MoveInstr)[-1]
+        i = increment.target
+        definitions = reaching.getReachingDefinitions(start, i)
+        self.assertEqual(len(definitions), 2)
+        self.assertIn(increment, definitions)
+        self.assertEqual(reaching.getReachingDefinitions(cfg.entry, a), [a])
+
+    def testRedefinedArgument(self):
+        cfg = createGraph("def int @f(int a) { a = 3; return a; }")
+        reaching = ReachingDefinitions(cfg)
+        a = cfg.function.arguments[0]
+        self.assertEqual(reaching.reachOut[0] & reaching.definitions.getMask(a), 0)
+
+class TestAvailableExpressions(unittest.TestCase):
+    def testKilledInLoop(self):
+        cfg = createGraph(loopCode)
+        available = AvailableExpressions(cfg)
+        start = findBlock(cfg, "while_start")
+        after = findBlock(cfg, "while_after")
+        compare = findInstructions(cfg, ir.CompareInstr)[0]
+        key = (ir.CompareInstr, "<", compare.a, compare.b)
+        self.assertNotIn(key, available.getAvailableIn(start))
+        self.assertIn(key, available.getAvailableIn(after))
+
+    def testIntersection(self):
+        cfg = createGraph('''
+            def int @f(int a, int b) {
+                let int x = 0;
+                if (a > b) { x = a - b; } else { x = b - a; }
+                return a - b;
+            }''')
+        available = AvailableExpressions(cfg)
+        end = findBlock(cfg, "else_end")
+        self.assertEqual(available.getAvailableIn(end), [(ir.CompareInstr, ">",) + tuple(cfg.function.arguments)])
+
+class TestConvergence(unittest.TestCase):
+    def testManyLoops(self):
+        lines = ["def int @f(int n) {", "let int s = 0;"]
+        for k in range(50):
+            lines.append(f"let int i{k} = 0; while (i{k} < n) {{ let int j{k} = 0;")
+            lines.append(f"while (j{k} < i{k}) {{ s = s + j{k}; j{k} = j{k} + 1; }}")
+            lines.append(f"i{k} = i{k} + 1; }}")
+        lines.append("return s; }")
+        cfg = createGraph("\n".join(lines))
+        for analysis in (Liveness, ReachingDefinitions, AvailableExpressions):
+            result = analysis(cfg)
+            # two nested loops need at most four passes
+            self.assertLessEqual(result.visits, 4 * len(cfg.blocks), analysis.__name__)
+
+if __name__ == '__main__':
+    unittest.main()
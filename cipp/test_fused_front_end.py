@@ -0,0 +1,41 @@
+import unittest
+from . import parser
+from . import ast_to_ir
+from . import fused_front_end
+from . test_iterative_parser import code, normalizeNames
+
+def transformInTwoPhases(source):
+    return ast_to_ir.transformProgramToIR(parser.parse(source))
+
+class TestFusedFrontEnd(unittest.TestCase):
+    def testSameInstructions(self):
+        source = code.replace("x[a] = b;", "")
+        expected = normalizeNames(transformInTwoPhases(source))
+        self.assertEqual(normalizeNames(fused_front_end.transformToIR(source)), expected)
+
+    def testSameExpressions(self):
+        for expression in ["1", "a", "1 * 2 + 3", "1 + 2 * 3", "(1 - a) * (a + 2) < 3",
+                           "a / 2 / (3 + @f(a, 1 * 2,)) - 1", "((a)) == ((1 + 2) * 3)"]:
+            source = f"def int @f(int a) return {expression};"
+            expected = normalizeNames(transformInTwoPhases(source))
+            self.assertEqual(normalizeNames(fused_front_end.transformToIR(source)), expected)
+
+    def testNestedIfElse(self):
+        source = '''
+            def int @f(int a) {
+                if (a) if (a < 2) a = 1; else { while (a) a = a - 1; }
+                else if (a > 3) return 4;
+                return a;
+            }
+        '''
+        expected = normalizeNames(transformInTwoPhases(source))
+        self.assertEqual(normalizeNames(fused_front_end.transformToIR(source)), expected)
+
+    def testErrors(self):
+        for source in ["def int @f() return 1", "def int @f() { return 1 < 2 < 3; }",
+                       "def int @f() return undefined;"]:
+            with self.assertRaises(Exception):
+                fused_front_end.transformToIR(source)
+
+if __name__ == '__main__':
+    unittest.main()
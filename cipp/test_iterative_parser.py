@@ -0,0 +1,83 @@
+import re
+import unittest
+from . import ast
+from . import parser
+from . import ast_to_ir
+from . import iterative_parser
+from . import iterative_ast_to_ir
+from . test_parser import describeNode
+
+tokenize = parser.stringToTokenStream
+
+code = '''
+    def int @fib(int n) {
+        if (n <= 2) return 1;
+        else return @fib(n-1) + @fib(n-2);
+    }
+
+    def int @test(int a, int b,) {
+        let int c = (a + 2) * b / 4 - @fib(a, b,) * (((3)));
+        while (a < b + 1) {
+            if (c) {}
+            else { c = c - 1; a = a + 1; }
+            if (@f()) c = 1 + 2 * 3 - 4 / 5 != 6;
+        }
+        { x[a] = b; }
+        return c;
+    }
+'''
+
+def createNestedCode(depth):
+    loops = "while (x > 0) {" * depth
+    expression = "(" * depth + "x - 1" + ")" * depth
+    return f"def int @f(int x) {{ {loops} x = {expression}; {'}' * depth} return x; }}"
+
+class TestIterativeParser(unittest.TestCase):
+    def testSameProgram(self):
+        expected = describeNode(parser.parse(code))
+        program = iterative_parser.parseProgram(tokenize(code))
+        self.assertEqual(describeNode(program), expected)
+
+    def testSameExpressions(self):
+        expressions = ["a", "1 + 2 * 3", "(1 + 2) * 3", "a < b + c", "@f(1, @g(2,), (3))", "a - b - c * d / e"]
+        for expression in expressions:
+            expected = describeNode(parser.parseExpression(tokenize(expression)))
+            node = iterative_parser.parseExpression(tokenize(expression))
+            self.assertEqual(describeNode(node), expected, expression)
+
+    def testErrors(self):
+        for expression in ["", "(1", "@f(1 2)", "1 +"]:
+            with self.assertRaises(Exception):
+                iterative_parser.parseExpression(tokenize(expression))
+        with self.assertRaises(Exception):
+            iterative_parser.parseStatement(tokenize("{ a = 1;"))
+
+    def testDeepNesting(self):
+        program = iterative_parser.parseProgram(tokenize(createNestedCode(20000)))
+        statement = program.functions[0].statement.statements[0]
+        for _ in range(100):
+            statement = statement.statement
+        self.assertIsNotNone(statement)
+
+        module = iterative_ast_to_ir.transformProgramToIR(program)
+        self.assertEqual(len(module.functions[0].block.elements), 20000 * 6 + 6)
+
+class TestIterativeTransformToIR(unittest.TestCase):
+    def testSameInstructions(self):
+        program = parser.parse(code.replace("x[a] = b;", ""))
+        expected = normalizeNames(ast_to_ir.transformProgramToIR(program))
+        module = iterative_ast_to_ir.transformProgramToIR(program)
+        self.assertEqual(normalizeNames(module), expected)
+
+    def testUnknownStatement(self):
+        for statement in (ast.Statement(), ast.WhileStmt(ast.ConstInt(1), ast.Statement())):
+            function = ast.Function("f", ast.Type("int"), [], ast.BlockStmt([statement]))
+            for module in (ast_to_ir, iterative_ast_to_ir):
+                with self.assertRaises(NotImplementedError):
+                    module.transformFunctionToIR(function)
+
+def normalizeNames(moduleIR):
+    '''replaces numbered register and label names by the order they appear in'''
+    text = "\n".join(map(repr, moduleIR.functions))
+    names = {}
+    return re.sub(r"#\d+|[a-z_]+\d+\b", lambda match: names.setdefault(match.group(), f"<{len(names)}>"), text)
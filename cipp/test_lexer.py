@@ -1,6 +1,8 @@
 import unittest
 from . lexer import Lexer
-from . parser import cippLexer, SingleCharToken
+from . table_lexer import TableLexer
+from . token_stream import TokenTableStream
+from . parser import cippLexer, cippTableLexer, SingleCharToken
 
 from . tokens import (
     CommentToken, WhitespaceToken, 
@@ -89,4 +91,87 @@ class TestCippLexer(unittest.TestCase):
 
     def assertSingleCharToken(self, token, char):
         self.assertIsInstance(token, SingleCharToken)
-        self.assertEqual(token.value, char)
\ No newline at end of file
+        self.assertEqual(token.value, char)
+
+class TestTableLexer(unittest.TestCase):
+    def testSameTokensAsReference(self):
+        sources = [
+            "",
+            "def int @test(int a, int b)",
+            "def int @f(int n) {\n  # comment\n  return n*2-(3/a);\n}\n",
+            "a<=b!=c  ==\td>=e\r\nf<g>h",
+            "_a1 b_2 __ x9y 0 123 45#end without newline",
+            "# only a comment\n",
+        ]
+        for source in sources:
+            expected = cippLexer.tokenize(source)
+            tokens = cippTableLexer.tokenize(source)
+            self.assertEqual(self.describe(tokens), self.describe(expected), source)
+
+    def testIgnoredTokensAreKept(self):
+        PlusToken = createSingleCharToken("+")
+        lexer = Lexer([PlusToken, WhitespaceToken, CommentToken])
+        source = "+  # my comment \n  +  # comment 2 # still\n  #test"
+        tokens = TableLexer(lexer).tokenize(source)
+        self.assertEqual(self.describe(tokens), self.describe(lexer.tokenize(source)))
+        self.assertEqual(tokens[2].value, " my comment ")
+        self.assertEqual(tokens[8].value, "test")
+
+    def testUnknownFirstChar(self):
+        with self.assertRaises(Exception):
+            cippTableLexer.tokenize("a $ b")
+
+    def testLetterDirectlyAfterInteger(self):
+        with self.assertRaises(Exception):
+            cippTableLexer.tokenize("32a")
+
+    def describe(self, tokens):
+        return [(type(token), getattr(token, "value", None)) for token in tokens]
+
+
+class TestTokenTable(unittest.TestCase):
+    source = "def int @f(int n) {\n  # comment\n  return n*23-(3/a);\n}\n"
+
+    def testSameTokensAsObjects(self):
+        table = cippTableLexer.tokenizeToTable(self.source)
+        tokens = cippTableLexer.tokenize(self.source)
+        self.assertEqual(len(table), len(tokens))
+        for i, token in enumerate(tokens):
+            self.assertIs(table.getType(i), type(token))
+            self.assertEqual(table.getValue(i), token.value)
+
+    def testIntegerValue(self):
+        table = cippTableLexer.tokenizeToTable("a 123")
+        self.assertEqual(table.getValue(1), 123)
+        self.assertEqual(table.getText(1), "123")
+
+    def testLazyTokenObjects(self):
+        table = cippTableLexer.tokenizeToTable("a + b")
+        tokens = table[1:3]
+        self.assertIsInstance(tokens[0], SingleCharToken)
+        self.assertEqual(tokens[1].value, "b")
+
+    def testStreamPeekAfterEnd(self):
+        tokens = TokenTableStream(cippTableLexer.tokenizeToTable("a"))
+        self.assertIs(tokens.peekType(), IdentifierToken)
+        self.assertIsNone(tokens.peekType(1))
+        self.assertEqual(tokens.takeNextValue(), "a")
+        self.assertIsNone(tokens.peekType())
+        self.assertEqual(len(tokens), 0)
+
+    def testBytesSource(self):
+        table = cippTableLexer.tokenizeToTable(self.source.encode("ascii"))
+        tokens = cippTableLexer.tokenize(self.source)
+        self.assertEqual(len(table), len(tokens))
+        for i, token in enumerate(tokens):
+            self.assertIs(table.getType(i), type(token))
+            self.assertEqual(table.getValue(i), token.value)
+
+    def testBytesValuesAreCached(self):
+        table = cippTableLexer.tokenizeToTable(b"while 42 return")
+        self.assertIs(table.getValue(0), table.getValue(0))
+        self.assertEqual([table.getValue(i) for i in (2, 0, 1, 1, 2)], ["return", "while", 42, 42, "return"])
+
+    def testNonAsciiBytes(self):
+        with self.assertRaises(Exception):
+            cippTableLexer.tokenizeToTable("a = ä;".encode("utf8"))
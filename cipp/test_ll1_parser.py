@@ -0,0 +1,56 @@
+import unittest
+from . import parser
+from . import ll1_parser
+from . import ll1_generator
+from . test_parser import describeNode
+from . test_iterative_parser import code
+
+class TestLL1Parser(unittest.TestCase):
+    def testSameProgram(self):
+        expected = describeNode(parser.parse(code))
+        self.assertEqual(describeNode(ll1_parser.parse(code)), expected)
+
+    def testEmptyProgram(self):
+        self.assertEqual(ll1_parser.parse("").functions, [])
+
+    def testSameExpressions(self):
+        for expression in ["1 - a + 4", "a < b + 1", "(a)", "@f(@g(1,), 2 * 3 / 4)",
+                           "a <= b", "a == b - c * d", "1 != 2", "a>=(b)"]:
+            source = f"def int @f() return {expression};"
+            expected = describeNode(parser.parse(source))
+            self.assertEqual(describeNode(ll1_parser.parse(source)), expected)
+
+    def testDanglingElse(self):
+        source = "def int @f() if (a) if (b) x = 1; else x = 2;"
+        statement = ll1_parser.parse(source).functions[0].statement
+        self.assertEqual(type(statement).__name__, "IfStmt")
+        self.assertEqual(type(statement.thenStatement).__name__, "IfElseStmt")
+
+    def testErrors(self):
+        for source in ["def int @f() { a < b < c; }", "def int @f() return 1 }",
+                       "def int @f() return 1; }", "def int @f() let int if = 1;"]:
+            with self.assertRaises(Exception):
+                ll1_parser.parse(source)
+
+class TestLL1Generator(unittest.TestCase):
+    def testTablesAreUpToDate(self):
+        with open(ll1_generator.tablesPath) as f:
+            self.assertEqual(f.read(), ll1_generator.generateTables())
+
+    def testOnlyElseConflict(self):
+        with open(ll1_generator.grammarPath) as f:
+            grammar = ll1_generator.Grammar.fromText(f.read())
+        self.assertEqual(grammar.resolvedConflicts, [("if-statement.2", "else")])
+
+    def testRejectsAmbiguousGrammar(self):
+        text = "start : a | a b\na : IDENTIFIER\nb : NUMBER"
+        with self.assertRaises(Exception):
+            ll1_generator.Grammar.fromText(text)
+
+    def testFirstAndFollow(self):
+        grammar = ll1_generator.Grammar.fromText("s : x* 'end'\nx : '(' NUMBER? ')'")
+        self.assertEqual(grammar.firstSets["s"], {"(", "end"})
+        self.assertEqual(grammar.followSets["x"], {"(", "end"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from . import parser
+from . ir_to_x64 import compileModule
+from . test_parser import describeNode
+from . parallel_front_end import (
+    findFunctionStarts, splitIntoBatches,
+    parseParallel, transformToIRParallel
+)
+
+code = '''
+    # def in a comment
+    def int @a(int x) { return x; }
+    def int @b(int x) { while (x > 0) { x = x - 1; } return x; }
+    def int @c(int x) { if (x < 1) { return 1; } else { return @a(x); } }
+    def int @d(int undef) return undef + 1;
+'''
+
+defNamesCode = '''
+    def int @b(int def) { return def; }
+    def int @c(int x) { return x; }
+'''
+
+class TestSplitting(unittest.TestCase):
+    def testFunctionStarts(self):
+        starts = findFunctionStarts(code)
+        self.assertEqual(len(starts), 4)
+        for start in starts:
+            self.assertEqual(code[start:start + 3], "def")
+
+    def testParameterNamedDef(self):
+        self.assertEqual(len(findFunctionStarts(defNamesCode)), 2)
+
+    def testBatchesContainEverything(self):
+        for batchAmount in (1, 2, 3, 10):
+            batches = splitIntoBatches(code, batchAmount)
+            self.assertEqual("".join(batches), code)
+            self.assertLessEqual(len(batches), batchAmount)
+
+class TestParallelFrontEnd(unittest.TestCase):
+    def testSameProgram(self):
+        program = parseParallel(code, workerAmount = 2)
+        self.assertEqual(describeNode(program), describeNode(parser.parse(code)))
+
+    def testParameterNamedDef(self):
+        program = parseParallel(defNamesCode, workerAmount = 2)
+        self.assertEqual(describeNode(program), describeNode(parser.parse(defNamesCode)))
+
+    def testUniqueLabels(self):
+        module = transformToIRParallel(code, workerAmount = 2)
+        self.assertEqual([f.name for f in module.functions], ["a", "b", "c", "d"])
+        # raises when a label exists twice
+        compileModule(module).toMachineCode()
@@ -1,6 +1,9 @@
+import os
+import tempfile
 import unittest
 from . import ast
 from . import parser
+from . token_stream import StreamingTokenStream
 tokenize = parser.stringToTokenStream
 
 class TestSelectStatementParser(unittest.TestCase):
@@ -108,8 +111,142 @@ class TestParseExpression(unittest.TestCase):
         self.assertEqual(len(node.terms[1].expr.arguments), 1)
         self.assertEqual(node.terms[1].expr.arguments[0].terms[0].expr.value, 12)
 
+    def testPrecedence(self):
+        node = self.parseExpression("a * b + c * d - e")
+        self.assertIsInstance(node, ast.AddSubExpr)
+        self.assertEqual([term.operation for term in node.terms], ["+", "+", "-"])
+        self.assertIsInstance(node.terms[0].expr, ast.MulDivExpr)
+        self.assertIsInstance(node.terms[1].expr, ast.MulDivExpr)
+        self.assertIsInstance(node.terms[2].expr, ast.Variable)
+
+    def testComparison(self):
+        node = self.parseExpression("a + 1 <= (b - 2) * 3")
+        self.assertIsInstance(node, ast.ComparisonExpr)
+        self.assertEqual(node.operator, "<=")
+        self.assertIsInstance(node.left, ast.AddSubExpr)
+        self.assertIsInstance(node.right, ast.MulDivExpr)
+        self.assertIsInstance(node.right.terms[0].expr, ast.AddSubExpr)
+
+    def testComparisonIsNotChained(self):
+        tokens = tokenize("a < b < c")
+        node = parser.parseExpression(tokens)
+        self.assertIsInstance(node, ast.ComparisonExpr)
+        self.assertIsInstance(node.left, ast.Variable)
+        self.assertEqual(tokens.peekValue(), "<")
+
+    def testMissingOperand(self):
+        with self.assertRaises(Exception):
+            self.parseExpression("3 + ;")
+
     def parseExpression(self, code):
         tokens = tokenize(code)
         node = parser.parseExpression(tokens)
         self.assertIsInstance(node, ast.Expression)
-        return node
\ No newline at end of file
+        return node
+
+class TestTokenStreamModes(unittest.TestCase):
+    code = '''
+        def int @pow(int base, int exponent) {
+            let int result = 1;
+            while (exponent >= 0) {
+                result = @mul(base, result);
+                exponent = exponent - 1;
+            }
+            return result;
+        }
+    '''
+
+    def testSameProgram(self):
+        expected = describeNode(parser.parseProgram(tokenize(self.code, "reference")))
+        for mode in ("precompiled", "streaming"):
+            program = parser.parseProgram(tokenize(self.code, mode))
+            self.assertEqual(describeNode(program), expected, mode)
+
+    def testStreamingIsLazy(self):
+        tokenIterator = iter(parser.cippTableLexer.tokenize("a = 1; b = 2;"))
+        tokens = StreamingTokenStream(tokenIterator, parser.maxLookahead)
+        parser.parseStatement(tokens)
+        self.assertEqual(len(list(tokenIterator)), 4)
+
+    def testStreamingLookaheadLimit(self):
+        tokens = tokenize("a b c", "streaming")
+        with self.assertRaises(Exception):
+            tokens.peekType(parser.maxLookahead)
+
+def describeNode(node):
+    if isinstance(node, list):
+        return [describeNode(element) for element in node]
+    elif isinstance(node, (str, int)) or node is None:
+        return node
+    else:
+        return (type(node).__name__, {name : describeNode(value) for name, value in ast.iterFields(node)})
+
+
+class TestParseFile(unittest.TestCase):
+    def testSameAsString(self):
+        code = TestTokenStreamModes.code
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "test.cipp")
+            with open(path, "w") as f:
+                f.write(code)
+            program = parser.parseFile(path)
+        self.assertEqual(describeNode(program), describeNode(parser.parse(code)))
+
+    def testEmptyFile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "empty.cipp")
+            open(path, "w").close()
+            program = parser.parseFile(path)
+        self.assertEqual(len(program.functions), 0)
+
+class TestCompactNodes(unittest.TestCase):
+    def testNoInstanceDicts(self):
+        program = parser.parse(TestTokenStreamModes.code)
+        stack = [program]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, list):
+                stack.extend(node)
+            elif not isinstance(node, (str, int)) and node is not None:
+                self.assertFalse(hasattr(node, "__dict__"), type(node).__name__)
+                stack.extend(value for _, value in ast.iterFields(node))
+
+    def testIterFields(self):
+        node = ast.ComparisonExpr("<", ast.Variable("a"), ast.ConstInt(1))
+        self.assertEqual([name for name, _ in ast.iterFields(node)], ["operator", "left", "right"])
+
+class TestExpressionInterner(unittest.TestCase):
+    code = '''
+        def int @f(int n) {
+            let int a = @f(n - 1) + @f(n - 1);
+            let int b = n - 1;
+            while (a < n * 2 + 1) a = a + n * 2 + 1;
+            return (n - 1) - (n + 1) + @f(n - 1);
+        }
+    '''
+
+    def testSameStructure(self):
+        expected = describeNode(parser.parse(self.code))
+        program = parser.parse(self.code, shareExpressions = True)
+        self.assertEqual(describeNode(program), expected)
+
+    def testEqualExpressionsAreShared(self):
+        statements = parser.parse(self.code, shareExpressions = True).functions[0].statement.statements
+        firstCall, secondCall = [term.expr for term in statements[0].expression.terms]
+        self.assertIsNot(firstCall, secondCall)
+        self.assertIs(firstCall.arguments[0], secondCall.arguments[0])
+        self.assertIs(firstCall.arguments[0], statements[1].expression)
+
+        loop = statements[2]
+        self.assertIs(loop.condition.right.terms[0].expr, loop.statement.expression.terms[1].expr)
+
+    def testSharedWhileParsing(self):
+        interner = parser.ExpressionInterner()
+        first = parser.parseExpression(tokenize("a * 2 + 1"), interner = interner)
+        second = parser.parseExpression(tokenize("(a * 2 + 1) < b"), interner = interner)
+        self.assertIs(second.left, first)
+
+    def testDifferentOperatorsAreNotShared(self):
+        returned = parser.parse(self.code, shareExpressions = True).functions[0].statement.statements[3]
+        first, second, _ = [term.expr for term in returned.expression.terms]
+        self.assertIsNot(first, second)
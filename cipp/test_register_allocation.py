@@ -0,0 +1,129 @@
+import unittest
+from ctypes import CFUNCTYPE, c_longlong
+from . import ir
+from . fused_front_end import transformToIR
+from . ir_to_x64 import compileModule
+from . register_allocation import (
+    computeLiveIntervals, allocateRegisters, LiveInterval, linearScan,
+    allocatableRegisters, calleeSavedRegisters
+)
+from . test_ssa import canExecute, branchCode
+
+from play_with_compiler import pow_code, fib_code
+
+def runFirstFunction(source, *arguments, registerAllocation = True):
+    from exec_utils import createFunctionFromHex
+    module = transformToIR(source)
+    hexCode = compileModule(module, registerAllocation).toMachineCode().toHex()
+    functionType = CFUNCTYPE(c_longlong, *([c_longlong] * len(arguments)))
+    return createFunctionFromHex(functionType, hexCode)(*arguments)
+
+def createPressureCode(amount):
+    '''keeps `amount` values alive at the same time'''
+    lines = ["def int @f(int x) {"]
+    for i in range(amount):
+        lines.append(f"let int v{i} = x + {i};")
+    lines.append("x = x - 1;")
+    lines.append("return " + " + ".join(f"v{i}" for i in range(amount)) + " - x;")
+    lines.append("}")
+    return "\n".join(lines)
+
+swapCode = '''
+    def int @f(int a, int b) {
+        return @g(b, a, b - a);
+    }
+    def int @g(int a, int b, int c) {
+        let int i = 0;
+        while (i < 3) {
+            let int t = @h(a, b);
+            b = a;
+            a = t;
+            i = i + 1;
+        }
+        return a - b - c;
+    }
+    def int @h(int a, int b) {
+        return a - b;
+    }
+'''
+
+class TestLiveIntervals(unittest.TestCase):
+    def testLoopCarriedValue(self):
+        function = transformToIR(pow_code).functions[1]
+        intervals = computeLiveIntervals(function)
+        x, y = function.arguments
+        # x is decremented at the end of the loop and read at its start
+        self.assertGreater(intervals[x].end, intervals[y].start)
+        self.assertFalse(intervals[x].crossesCall)
+
+    def testCrossesCall(self):
+        function = transformToIR(pow_code).functions[0]
+        intervals = computeLiveIntervals(function)
+        base, exponent = function.arguments
+        self.assertTrue(intervals[base].crossesCall)
+        self.assertTrue(intervals[exponent].crossesCall)
+        call = next(i for i in function.block if isinstance(i, ir.CallInstr))
+        self.assertFalse(intervals[call.target].crossesCall)
+
+class TestLinearScan(unittest.TestCase):
+    def testReusesRegisters(self):
+        vregs = [ir.VirtualRegister() for _ in range(3)]
+        intervals = [LiveInterval(vregs[0], 0, 2), LiveInterval(vregs[1], 2, 4), LiveInterval(vregs[2], 3, 5)]
+        registers = linearScan(intervals)
+        self.assertIs(registers[vregs[0]], registers[vregs[1]])
+        self.assertIsNot(registers[vregs[1]], registers[vregs[2]])
+
+    def testSpillsLongestInterval(self):
+        amount = len(allocatableRegisters)
+        vregs = [ir.VirtualRegister() for _ in range(amount + 1)]
+        intervals = [LiveInterval(vreg, i, 100 + i) for i, vreg in enumerate(vregs[:-1])]
+        intervals.append(LiveInterval(vregs[-1], amount, amount + 1))
+        registers = linearScan(intervals)
+        self.assertIsNone(registers[vregs[amount - 1]])
+        self.assertIsNotNone(registers[vregs[-1]])
+
+    def testCallCrossingUsesCalleeSaved(self):
+        interval = LiveInterval(ir.VirtualRegister(), 0, 5)
+        interval.crossesCall = True
+        registers = linearScan([interval])
+        self.assertIn(registers[interval.vreg], calleeSavedRegisters)
+
+    def testNoSharedRegisterWhileLive(self):
+        function = transformToIR(createPressureCode(30)).functions[0]
+        intervals = computeLiveIntervals(function)
+        registers = allocateRegisters(function)
+        spilled = [vreg for vreg, register in registers.items() if register is None]
+        self.assertGreater(len(spilled), 0)
+        live = sorted(intervals.values(), key = lambda i: i.start)
+        for i, a in enumerate(live):
+            for b in live[i + 1:]:
+                if b.start >= a.end:
+                    break
+                if registers[a.vreg] is not None:
+                    self.assertIsNot(registers[a.vreg], registers[b.vreg])
+
+@unittest.skipUnless(canExecute, "needs Linux on x86-64")
+class TestExecution(unittest.TestCase):
+    def testPow(self):
+        self.assertEqual(runFirstFunction(pow_code, 3, 4), 81)
+        self.assertEqual(runFirstFunction(pow_code, 2, 10), 1024)
+
+    def testFib(self):
+        self.assertEqual(runFirstFunction(fib_code, 15), 610)
+
+    def testBranches(self):
+        for x in range(8):
+            self.assertEqual(runFirstFunction(branchCode, x),
+                             runFirstFunction(branchCode, x, registerAllocation = False))
+
+    def testSpilling(self):
+        code = createPressureCode(30)
+        self.assertEqual(runFirstFunction(code, 7), sum(7 + i for i in range(30)) - 6)
+
+    def testArgumentShuffle(self):
+        for a, b in ((1, 2), (5, 3), (-4, 9)):
+            self.assertEqual(runFirstFunction(swapCode, a, b),
+                             runFirstFunction(swapCode, a, b, registerAllocation = False))
+
+if __name__ == '__main__':
+    unittest.main()
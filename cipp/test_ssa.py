@@ -0,0 +1,112 @@
+import unittest
+import platform
+from ctypes import CFUNCTYPE, c_longlong
+from . import ir
+from . cfg import ControlFlowGraph
+from . ssa import toSSA, fromSSA, sequentializeCopies
+from . fused_front_end import transformToIR
+from . ir_to_x64 import compileModule
+
+from play_with_compiler import pow_code, fib_code
+
+canExecute = platform.system() == "Linux" and platform.machine() == "x86_64"
+
+def runFirstFunction(module, *arguments, registerAllocation = False, tailCalls = False):
+    from exec_utils import createFunctionFromHex
+    hexCode = compileModule(module, registerAllocation, tailCalls = tailCalls).toMachineCode().toHex()
+    functionType = CFUNCTYPE(c_longlong, *([c_longlong] * len(arguments)))
+    return createFunctionFromHex(functionType, hexCode)(*arguments)
+
+def transformThroughSSA(source):
+    module = transformToIR(source)
+    for function in module.functions:
+        cfg = ControlFlowGraph.fromFunction(function)
+        toSSA(cfg)
+        fromSSA(cfg)
+        cfg.writeBack()
+    return module
+
+branchCode = '''
+    def int @f(int x) {
+        let int y = 0;
+        let int z = 1;
+        while (x > 0) {
+            if (x == 5) y = y + 10;
+            let int t = y + 0;
+            y = z;
+            z = t;
+            x = x - 1;
+        }
+        return y - z - z;
+    }
+'''
+
+class TestSSAForm(unittest.TestCase):
+    def testSingleAssignment(self):
+        for source in (pow_code, fib_code, branchCode):
+            for function in transformToIR(source).functions:
+                cfg = ControlFlowGraph.fromFunction(function)
+                toSSA(cfg)
+                outputs = [instruction.getOutputVRegister() for instruction in cfg.iterInstructions()]
+                outputs = [vreg for vreg in outputs if vreg is not None]
+                self.assertEqual(len(outputs), len(set(outputs)))
+                self.assertFalse(set(outputs) & set(function.arguments))
+
+    def testPhisAtLoopHeader(self):
+        function = transformToIR(pow_code).functions[0]
+        cfg = ControlFlowGraph.fromFunction(function)
+        toSSA(cfg)
+        header = cfg.blocks[1]
+        self.assertTrue(header.label.name.startswith("while_start"))
+        phis = [i for i in header.instructions if isinstance(i, ir.PhiInstr)]
+        # result and exponent change in the loop
+        self.assertEqual(len(phis), 2)
+        for phi in phis:
+            self.assertEqual(set(phi.sources), set(header.predecessors))
+
+    def testNoPhisRemain(self):
+        module = transformThroughSSA(branchCode)
+        for element in module.functions[0].block:
+            self.assertNotIsInstance(element, ir.PhiInstr)
+
+class TestSequentializeCopies(unittest.TestCase):
+    def check(self, copies):
+        values = {vreg : i for i, vreg in enumerate({vreg for copy in copies for vreg in copy})}
+        expected = dict(values)
+        for target, source in copies:
+            expected[target] = values[source]
+        for move in sequentializeCopies(copies):
+            values[move.target] = values[move.source]
+        for vreg in expected:
+            self.assertEqual(values[vreg], expected[vreg])
+
+    def testChain(self):
+        a, b, c = ir.VirtualRegister(), ir.VirtualRegister(), ir.VirtualRegister()
+        self.check([(b, a), (c, b)])
+
+    def testSwap(self):
+        a, b = ir.VirtualRegister(), ir.VirtualRegister()
+        self.check([(a, b), (b, a)])
+        self.assertEqual(len(sequentializeCopies([(a, b), (b, a)])), 3)
+
+    def testCycleWithBranches(self):
+        a, b, c, d, e = [ir.VirtualRegister() for _ in range(5)]
+        self.check([(a, b), (b, c), (c, a), (d, a), (e, e)])
+
+@unittest.skipUnless(canExecute, "needs Linux on x86-64")
+class TestRoundTripExecution(unittest.TestCase):
+    def testPow(self):
+        module = transformThroughSSA(pow_code)
+        self.assertEqual(runFirstFunction(module, 2, 10), 1024)
+        self.assertEqual(runFirstFunction(module, 3, 4), 81)
+
+    def testFib(self):
+        module = transformThroughSSA(fib_code)
+        self.assertEqual(runFirstFunction(module, 10), 55)
+
+    def testSwapInLoop(self):
+        expected = runFirstFunction(transformToIR(branchCode), 7)
+        self.assertEqual(runFirstFunction(transformThroughSSA(branchCode), 7), expected)
+
+if __name__ == '__main__':
+    unittest.main()
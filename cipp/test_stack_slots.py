@@ -0,0 +1,61 @@
+import unittest
+from ctypes import CFUNCTYPE, c_longlong
+from . import ir
+from . fused_front_end import transformToIR
+from . ir_to_x64 import compileModule
+from . register_allocation import LiveInterval, computeLiveIntervals
+from . stack_slots import assignStackSlots, colorIntervals, compareFrameSizes
+from . test_ssa import canExecute, branchCode
+from . test_register_allocation import createPressureCode
+
+from play_with_compiler import pow_code, fib_code
+
+def runFirstFunction(source, *arguments, **options):
+    from exec_utils import createFunctionFromHex
+    hexCode = compileModule(transformToIR(source), **options).toMachineCode().toHex()
+    functionType = CFUNCTYPE(c_longlong, *([c_longlong] * len(arguments)))
+    return createFunctionFromHex(functionType, hexCode)(*arguments)
+
+class TestStackSlots(unittest.TestCase):
+    def testColorIntervals(self):
+        vregs = [ir.VirtualRegister() for _ in range(4)]
+        intervals = [LiveInterval(vregs[0], 0, 3), LiveInterval(vregs[1], 1, 2),
+                     LiveInterval(vregs[2], 2, 5), LiveInterval(vregs[3], 3, 4)]
+        slots, slotAmount = colorIntervals(intervals)
+        self.assertEqual(slotAmount, 2)
+        self.assertEqual(slots[vregs[1]], slots[vregs[2]])
+        self.assertEqual(slots[vregs[0]], slots[vregs[3]])
+
+    def testNoSharedSlotWhileLive(self):
+        function = transformToIR(branchCode).functions[0]
+        intervals = computeLiveIntervals(function)
+        slots, slotAmount = assignStackSlots(function)
+        self.assertEqual(set(slots), function.getUsedVRegisters())
+        for a in intervals.values():
+            for b in intervals.values():
+                if a is not b and slots[a.vreg] == slots[b.vreg]:
+                    self.assertTrue(a.end <= b.start or b.end <= a.start)
+
+    def testFramesGetSmaller(self):
+        for name, before, after in compareFrameSizes(transformToIR(pow_code)):
+            self.assertLess(after, before, name)
+
+@unittest.skipUnless(canExecute, "needs Linux on x86-64")
+class TestExecution(unittest.TestCase):
+    def testExamples(self):
+        for registerAllocation in (False, True):
+            options = dict(registerAllocation = registerAllocation, reuseStackSlots = True)
+            self.assertEqual(runFirstFunction(pow_code, 3, 4, **options), 81)
+            self.assertEqual(runFirstFunction(fib_code, 12, **options), 144)
+            for x in range(8):
+                self.assertEqual(runFirstFunction(branchCode, x, **options),
+                                 runFirstFunction(branchCode, x))
+
+    def testSpilledRegisters(self):
+        code = createPressureCode(30)
+        expected = sum(7 + i for i in range(30)) - 6
+        self.assertEqual(runFirstFunction(code, 7, reuseStackSlots = True), expected)
+        self.assertEqual(runFirstFunction(code, 7, registerAllocation = True, reuseStackSlots = True), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,13 +13,116 @@ class TokenStream:
         self.position += n
         return tokens
 
+    def takeNextValue(self):
+        value = self.peekValue()
+        self.position += 1
+        return value
+
+    def skip(self, n = 1):
+        self.position += n
+
     def peekNext(self):
         return self.getLookahead(1)[0]
 
+    def peekType(self, offset = 0):
+        '''returns None when there are not enough tokens left'''
+        position = self.position + offset
+        if position < len(self.tokens):
+            return type(self.tokens[position])
+        return None
+
+    def peekValue(self, offset = 0):
+        return self.tokens[self.position + offset].value
+
     def getLookahead(self, n):
         if len(self) < n:
             raise Exception(f"cannot look ahead {n} tokens, only {len(self)} available")
         return self.tokens[self.position:self.position+n]
 
     def __len__(self):
-        return len(self.tokens) - self.position
\ No newline at end of file
+        return len(self.tokens) - self.position
+
+class TokenTableStream(TokenStream):
+    '''
+    Reads from a TokenTable. Peeking the type or the value
+    does not create token objects.
+    '''
+
+    def __init__(self, table):
+        super().__init__(table)
+        self.tokenTypes = table.tokenTypes
+        self.kinds = table.kinds
+
+    def peekType(self, offset = 0):
+        position = self.position + offset
+        if position < len(self.kinds):
+            return self.tokenTypes[self.kinds[position]]
+        return None
+
+    def peekValue(self, offset = 0):
+        return self.tokens.getValue(self.position + offset)
+
+class StreamingTokenStream:
+    '''
+    Pulls tokens from an iterator only when the parser needs them.
+    At most `lookahead` tokens are kept in a ring buffer, so the
+    memory usage does not grow with the length of the source.
+    '''
+
+    def __init__(self, tokenIterator, lookahead):
+        self.tokenIterator = tokenIterator
+        self.buffer = [None] * lookahead
+        self.start = 0
+        self.bufferedAmount = 0
+
+    def takeNext(self):
+        token = self.peekNext()
+        self.skip()
+        return token
+
+    def takeNextValue(self):
+        return self.takeNext().value
+
+    def skip(self, n = 1):
+        if not self.fill(n):
+            raise Exception(f"cannot skip {n} tokens, the stream ended")
+        for i in range(n):
+            self.buffer[(self.start + i) % len(self.buffer)] = None
+        self.start = (self.start + n) % len(self.buffer)
+        self.bufferedAmount -= n
+
+    def peekNext(self):
+        token = self.peekToken(0)
+        if token is None:
+            raise Exception("cannot look ahead, the stream ended")
+        return token
+
+    def peekType(self, offset = 0):
+        '''returns None when there are not enough tokens left'''
+        token = self.peekToken(offset)
+        return None if token is None else type(token)
+
+    def peekValue(self, offset = 0):
+        return self.peekToken(offset).value
+
+    def peekToken(self, offset):
+        if offset >= self.bufferedAmount and not self.fill(offset + 1):
+            return None
+        return self.buffer[(self.start + offset) % len(self.buffer)]
+
+    def getLookahead(self, n):
+        if not self.fill(n):
+            raise Exception(f"cannot look ahead {n} tokens, the stream ended")
+        return [self.peekToken(i) for i in range(n)]
+
+    def fill(self, amount):
+        '''returns False when the stream ends before `amount` tokens are buffered'''
+        if amount > len(self.buffer):
+            raise Exception(f"cannot look ahead {amount} tokens, the limit is {len(self.buffer)}")
+        while self.bufferedAmount < amount:
+            token = next(self.tokenIterator, None)
+            if token is None:
+                return False
+            self.buffer[(self.start + self.bufferedAmount) % len(self.buffer)] = token
+            self.bufferedAmount += 1
+        return True
@@ -1,12 +1,24 @@
+import re
 from . lexer import Token, CharState
 
+asciiLowerCase = "abcdefghijklmnopqrstuvwxyz"
+asciiUpperCase = asciiLowerCase.upper()
+asciiLetters = asciiLowerCase + asciiUpperCase
+digits = "0123456789"
+
+
 class WhitespaceToken(Token):
     whitespaceChars = tuple(" \t\n\r")
+    pattern = "[ \t\n\r]+"
 
     @classmethod
     def startswith(cls, char):
         return char in cls.whitespaceChars
 
+    @classmethod
+    def fromString(cls, string):
+        return cls(string[0])
+
     def checkNext(self, char):
         if char in self.whitespaceChars:
             return CharState.CONSUMED
@@ -15,10 +27,20 @@ class WhitespaceToken(Token):
 
 
 class IdentifierToken(Token):
+    pattern = "[a-zA-Z_][a-zA-Z0-9_]*"
+
     @classmethod
     def startswith(cls, char):
         return char in asciiLetters or char == "_"
 
+    @classmethod
+    def fromString(cls, string):
+        return cls(string)
+
+    @classmethod
+    def valueFromString(cls, string):
+        return string
+
     def __init__(self, firstChar):
         self.value = firstChar
 
@@ -34,10 +56,21 @@ class IdentifierToken(Token):
 
 
 class IntegerToken(Token):
+    pattern = "[0-9]+"
+    forbiddenNextChars = asciiLetters
+
     @classmethod
     def startswith(cls, char):
         return char in digits
 
+    @classmethod
+    def fromString(cls, string):
+        return cls(string)
+
+    @classmethod
+    def valueFromString(cls, string):
+        return int(string)
+
     def __init__(self, firstChar):
         self.content = firstChar
 
@@ -59,10 +92,19 @@ class IntegerToken(Token):
 
 
 class CommentToken(Token):
+    pattern = "#[^\n]*\n?"
+
     @classmethod
     def startswith(cls, char):
         return char == "#"
 
+    @classmethod
+    def fromString(cls, string):
+        token = cls(string[0])
+        token.commentFinished = string.endswith("\n")
+        token.value = string[1:-1] if token.commentFinished else string[1:]
+        return token
+
     def __init__(self, firstChar):
         self.commentFinished = False
         self.value = ""
@@ -82,10 +124,20 @@ class CommentToken(Token):
 
 def createSingleCharToken(allowedChars):
     class SingleCharToken(Token):
+        pattern = "[" + re.escape(allowedChars) + "]"
+
         @classmethod
         def startswith(cls, char):
             return char in allowedChars
 
+        @classmethod
+        def fromString(cls, string):
+            return cls(string)
+
+        @classmethod
+        def valueFromString(cls, string):
+            return string
+
         def __init__(self, firstChar):
             self.value = firstChar
 
@@ -96,8 +148,3 @@ def createSingleCharToken(allowedChars):
             return f"<Token: {self.value}>"
 
     return SingleCharToken
-
-asciiLowerCase = "abcdefghijklmnopqrstuvwxyz"
-asciiUpperCase = asciiLowerCase.upper()
-asciiLetters = asciiLowerCase + asciiUpperCase
-digits = "0123456789"
\ No newline at end of file
@@ -14,7 +14,7 @@ from . jumps import (
 )
 
 from . simple_two_reg import (
-    AddRegToRegInstr, SubRegFromRegInstr, CompareInstr
+    AddRegToRegInstr, SubRegFromRegInstr, MulRegToRegInstr, CompareInstr
 )
 
 from . set_byte_on_condition import (
@@ -51,4 +51,22 @@ class SubRegFromRegInstr(SimpleTwoRegInstr):
 
 class CompareInstr(SimpleTwoRegInstr):
     opcodeHex = "39"
-    intelSyntaxName = "cmp"
\ No newline at end of file
+    intelSyntaxName = "cmp"
+
+class MulRegToRegInstr(SimpleTwoRegInstr):
+    '''signed multiplication, the destination is encoded in the reg field'''
+    opcodeHex = "0faf"
+    intelSyntaxName = "imul"
+
+    def toMachineCode_64(self):
+        prefix = getRegGroupPrefix_64(self.srcReg, self.dstReg)
+        return prefix + self.getBaseMachineCode()
+
+    def toMachineCode_32(self):
+        prefix = getRegGroupPrefix_32(self.srcReg, self.dstReg)
+        return prefix + self.getBaseMachineCode()
+
+    def getBaseMachineCode(self):
+        opcode = Bits.fromHex(self.opcodeHex)
+        arguments = Bits("11") + self.dstReg.bits + self.srcReg.bits
+        return opcode + arguments
@@ -19,7 +19,7 @@ from . pop_reg import PopRegInstr
 from . ret import RetInstr
 
 from . simple_two_reg import (
-    AddRegToRegInstr, SubRegFromRegInstr
+    AddRegToRegInstr, SubRegFromRegInstr, MulRegToRegInstr
 )
 
 from . set_byte_on_condition import (
@@ -302,6 +302,25 @@ class TestSubRegFromRegInstruction(TestInstruction):
         ([sp, r8w], "664429c4", "sub sp, r8w")
     ]
 
+class TestMulRegToRegInstruction(TestInstruction):
+    instruction = MulRegToRegInstr
+    simpleTestCases = [
+        # 64 bit
+        ([rax, rbx], "480fafc3", "imul rax, rbx"),
+        ([r12, r14], "4d0fafe6", "imul r12, r14"),
+        ([rsp, r9], "490fafe1", "imul rsp, r9"),
+        ([r8, rdx], "4c0fafc2", "imul r8, rdx"),
+
+        # 32 bit
+        ([eax, edx], "0fafc2", "imul eax, edx"),
+        ([r12d, r15d], "450fafe7", "imul r12d, r15d"),
+        ([r10d, edi], "440fafd7", "imul r10d, edi"),
+        ([ebp, r11d], "410fafeb", "imul ebp, r11d"),
+
+        # 16 bit
+        ([ax, cx], "660fafc1", "imul ax, cx")
+    ]
+
 class TestSetIfNotEqualInstruction(TestInstruction):
     instruction = SetIfNotEqualInstr
     simpleTestCases = [
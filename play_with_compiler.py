@@ -35,16 +35,17 @@ pow_code = '''
     }
 '''
 
-ast = parse(pow_code)
-module = transformProgramToIR(ast)
-# print(module.functions[0].block)
+if __name__ == "__main__":
+    ast = parse(pow_code)
+    module = transformProgramToIR(ast)
+    # print(module.functions[0].block)
 
-block = compileModule(module)
-print(block.toIntelSyntax())
+    block = compileModule(module)
+    print(block.toIntelSyntax())
 
-hexCode = block.toMachineCode().toHex()
-# print(hexCode)
-f = createFunctionFromHex(CFUNCTYPE(c_longlong, c_longlong), hexCode)
+    hexCode = block.toMachineCode().toHex()
+    # print(hexCode)
+    f = createFunctionFromHex(CFUNCTYPE(c_longlong, c_longlong), hexCode)
 
-print()
-print(f(2, 10))
+    print()
+    print(f(2, 10))